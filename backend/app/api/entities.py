@@ -61,6 +61,12 @@ def extract_entities(completion_id: int, db: Session = Depends(get_db)):
     extractor.process_completion(completion_id)
     return {"status": "entities extracted"}
 
+@router.post("/extract")
+def extract_entities_bulk(completion_ids: List[int], db: Session = Depends(get_db)):
+    extractor = EntityExtractor(db)
+    extractor.process_completions(completion_ids)
+    return {"status": "entities extracted", "completions": len(completion_ids)}
+
 @router.get("/", response_model=List[EntityResponse])
 def list_entities(db: Session = Depends(get_db)):
     return db.query(Entity).all()
\ No newline at end of file
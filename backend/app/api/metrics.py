@@ -28,6 +28,11 @@ class ScoreRequest(BaseModel):
     brand_id: int
     concept_id: Optional[int] = None
 
+class BulkScoreRequest(BaseModel):
+    run_id: int
+    brand_ids: List[int]
+    concept_id: Optional[int] = None
+
 @router.post("/calculate")
 def calculate_metrics(request: ScoreRequest, db: Session = Depends(get_db)):
     scorer = Scorer(db)
@@ -38,6 +43,15 @@ def calculate_metrics(request: ScoreRequest, db: Session = Depends(get_db)):
     )
     return MetricResponse.from_orm(metric)
 
+@router.post("/calculate/bulk", response_model=List[MetricResponse])
+def calculate_metrics_bulk(request: BulkScoreRequest, db: Session = Depends(get_db)):
+    scorer = Scorer(db)
+    return scorer.save_metrics_bulk(
+        run_id=request.run_id,
+        brand_ids=request.brand_ids,
+        concept_id=request.concept_id
+    )
+
 @router.get("/run/{run_id}", response_model=List[MetricResponse])
 def get_run_metrics(run_id: int, db: Session = Depends(get_db)):
     metrics = db.query(Metric).filter(Metric.run_id == run_id).all()
@@ -1,12 +1,17 @@
 from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, AsyncIterator
 from pydantic import BaseModel
 import json
 import re
 import asyncio
+import logging
+from collections import Counter
+from app.services.brand_matching import matches_brand
 from app.llm.langchain_adapter import LangChainAdapter
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 class RealAnalysisRequest(BaseModel):
@@ -19,6 +24,74 @@ class RealAnalysisResponse(BaseModel):
     competitor_brands: List[str]
     analysis_results: List[Dict[str, Any]]
 
+# Common entities in the space, paired with their lowercase form for matching
+ENTITY_KEYWORDS = tuple((keyword, keyword.lower()) for keyword in (
+    "supplements", "vitamins", "health", "wellness", "longevity", 
+    "anti-aging", "NMN", "NAD+", "resveratrol", "collagen",
+    "nutrition", "biohacking", "cellular", "mitochondria",
+    "antioxidants", "probiotics", "omega-3", "protein"
+))
+
+# The prompt asks for the top 5-7 brands, so stop reading once we have 7
+MAX_BRANDS = 7
+
+# Match patterns like "1. Brand" or "- Brand" or "* Brand" or "• Brand"
+# Also handle two-space indentation that Google sometimes uses
+BRAND_LINE_RE = re.compile(r'^(?:\s*)?(?:\d+\.|\-|\*|•)\s+(.+?)(?:\s*[-–].*)?$')
+TRAILING_PARENTHETICAL_RE = re.compile(r'\s*\([^)]*\)$')
+
+def _parse_brand_line(line: str) -> Optional[str]:
+    """Return the brand name from a list item line, or None if it isn't one"""
+    match = BRAND_LINE_RE.match(line.strip())
+    if not match:
+        return None
+    
+    brand = match.group(1).strip()
+    # Clean up the brand name - remove trailing punctuation
+    brand = brand.rstrip('.,;:')
+    # Remove any parenthetical notes but keep the brand name
+    brand = TRAILING_PARENTHETICAL_RE.sub('', brand)
+    
+    # Check if this looks like a brand name (not a sentence)
+    if (brand and 
+        len(brand) > 2 and 
+        len(brand) < 50 and 
+        not brand.lower().startswith(('the ', 'it ', 'this ', 'that ', 'there '))):
+        return brand
+    return None
+
+async def _parse_brand_stream(stream: AsyncIterator[str]) -> List[str]:
+    """
+    Extract brand names from a streamed response one line at a time,
+    closing the stream early once MAX_BRANDS have been found
+    """
+    brands_found = []
+    buf = ""
+    try:
+        async for chunk in stream:
+            buf += chunk
+            if '\n' not in chunk:
+                continue
+            *lines, buf = buf.splitlines(keepends=True)
+            # splitlines keeps an unfinished last line; carry it to the next chunk
+            if buf.endswith(('\n', '\r')):
+                lines.append(buf)
+                buf = ""
+            for line in lines:
+                brand = _parse_brand_line(line)
+                if brand:
+                    brands_found.append(brand)
+                    if len(brands_found) >= MAX_BRANDS:
+                        return brands_found
+        
+        # Last line may not end with a newline
+        brand = _parse_brand_line(buf)
+        if brand:
+            brands_found.append(brand)
+        return brands_found
+    finally:
+        await stream.aclose()
+
 @router.post("/real-analysis", response_model=RealAnalysisResponse)
 async def run_real_analysis(request: RealAnalysisRequest):
     """
@@ -38,10 +111,13 @@ async def run_real_analysis(request: RealAnalysisRequest):
     results = {
         "brand": brand_name,
         "entities": [],
-        "competitor_brands": set(),
+        "competitor_brands": [],
         "analysis_results": []
     }
     
+    # Count how often each brand is returned so the top 10 is by frequency
+    competitor_counts = Counter()
+    
     # Determine available vendors based on API keys
     available_vendors = []
     if settings.openai_api_key:
@@ -75,58 +151,27 @@ Return your response as a simple numbered list with just the brand names, like:
 
 Keep your response concise and just list the brands."""
 
-                # Query the AI model
-                # Google doesn't support max_tokens parameter
-                if vendor == "google":
-                    response = await adapter.generate(
-                        vendor=vendor,
-                        prompt=prompt,
-                        temperature=0.3  # Lower temperature for more consistent results
-                    )
-                else:
-                    response = await adapter.generate(
+                # Stream the AI model response and parse brands as lines arrive
+                # (generate_stream skips max_tokens for Google, which doesn't support it)
+                brands_found = await _parse_brand_stream(
+                    adapter.generate_stream(
                         vendor=vendor,
                         prompt=prompt,
                         temperature=0.3,  # Lower temperature for more consistent results
                         max_tokens=200
                     )
-                
-                # Parse the response to extract brand names
-                text = response["text"]
-                brands_found = []
-                
-                # Extract numbered list items (e.g., "1. Brand Name")
-                lines = text.split('\n')
-                for line in lines:
-                    # Match patterns like "1. Brand" or "- Brand" or "* Brand" or "• Brand"
-                    # Also handle two-space indentation that Google sometimes uses
-                    match = re.match(r'^(?:\s*)?(?:\d+\.|\-|\*|•)\s+(.+?)(?:\s*[-–].*)?$', line.strip())
-                    if match:
-                        brand = match.group(1).strip()
-                        # Clean up the brand name - remove trailing punctuation
-                        brand = brand.rstrip('.,;:')
-                        # Remove any parenthetical notes but keep the brand name
-                        brand = re.sub(r'\s*\([^)]*\)$', '', brand)
-                        
-                        # Check if this looks like a brand name (not a sentence)
-                        if (brand and 
-                            len(brand) > 2 and 
-                            len(brand) < 50 and 
-                            not brand.lower().startswith(('the ', 'it ', 'this ', 'that ', 'there '))):
-                            brands_found.append(brand)
+                )
                 
                 # Check if user's brand was mentioned
-                brand_mentioned = False
-                position = None
-                
-                for i, found_brand in enumerate(brands_found):
-                    if brand_name.lower() in found_brand.lower():
-                        brand_mentioned = True
-                        position = i + 1
-                        break
+                # Fuzzy match so variants like "Brand, Inc." still count
+                position = next(
+                    (i for i, found_brand in enumerate(brands_found, 1) if matches_brand(found_brand, (brand_name,))),
+                    None
+                )
+                brand_mentioned = position is not None
                 
-                # Add all found brands to competitor list
-                results["competitor_brands"].update(brands_found)
+                # Add all found brands to competitor counts
+                competitor_counts.update(brands_found)
                 
                 # Store the result
                 results["analysis_results"].append({
@@ -141,7 +186,7 @@ Keep your response concise and just list the brands."""
                 await asyncio.sleep(0.5)
                 
             except Exception as e:
-                print(f"Error querying {vendor} for '{phrase}': {str(e)}")
+                logger.warning("Error querying %s for %r", vendor, phrase, exc_info=True)
                 # Add a failed result
                 results["analysis_results"].append({
                     "phrase": phrase,
@@ -155,20 +200,13 @@ Keep your response concise and just list the brands."""
     # Extract entities from the phrases and responses
     entities = set()
     
-    # Common entities in the space
-    entity_keywords = {
-        "supplements", "vitamins", "health", "wellness", "longevity", 
-        "anti-aging", "NMN", "NAD+", "resveratrol", "collagen",
-        "nutrition", "biohacking", "cellular", "mitochondria",
-        "antioxidants", "probiotics", "omega-3", "protein"
-    }
-    
     # Extract entities from phrases
     for phrase in phrases:
         phrase_lower = phrase.lower()
-        for keyword in entity_keywords:
-            if keyword.lower() in phrase_lower:
-                entities.add(keyword)
+        entities.update(
+            keyword for keyword, keyword_lower in ENTITY_KEYWORDS
+            if keyword_lower in phrase_lower
+        )
     
     # Add some entities based on brand category
     if "longevity" in brand_name.lower() or "life" in brand_name.lower():
@@ -177,6 +215,6 @@ Keep your response concise and just list the brands."""
         entities.update(["supplements", "nutrition", "wellness"])
     
     results["entities"] = list(entities)[:10]
-    results["competitor_brands"] = list(results["competitor_brands"])[:10]
+    results["competitor_brands"] = [b for b, _ in competitor_counts.most_common(10)]
     
     return results
\ No newline at end of file
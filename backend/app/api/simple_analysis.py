@@ -4,6 +4,8 @@ from pydantic import BaseModel
 
 router = APIRouter()
 
+VENDORS = ("openai", "google", "anthropic")
+
 class AnalysisRequest(BaseModel):
     brand_name: str
     phrases: List[str]
@@ -63,47 +65,56 @@ async def run_simple_analysis(request: AnalysisRequest):
             "technology"
         ]
     
-    # Add analysis results for each phrase and each vendor
-    vendors = ["openai", "google", "anthropic"]
+    # Simulate finding brands in AI responses with slight variation per vendor.
+    # The slices only depend on the competitor list, so compute them once.
+    competitors = results["competitor_brands"]
+    vendor_brands = {
+        "openai": competitors[:5],
+        # Google might return slightly different order
+        "google": competitors[1:6] if len(competitors) > 5 else competitors[:5],
+        # Anthropic might emphasize different brands
+        "anthropic": competitors[2:7] if len(competitors) > 6 else competitors[:5],
+    }
+    brand_name_lower = brand_name.lower()
     
+    # Add analysis results for each phrase and each vendor
+    analysis_results = []
     for phrase in phrases[:5]:  # Limit to first 5
-        for vendor in vendors:
-            # Simulate finding brands in AI responses with slight variation per vendor
-            if vendor == "openai":
-                brands_found = results["competitor_brands"][:5]
-            elif vendor == "google":
-                # Google might return slightly different order
-                brands_found = results["competitor_brands"][1:6] if len(results["competitor_brands"]) > 5 else results["competitor_brands"][:5]
-            else:  # anthropic
-                # Anthropic might emphasize different brands
-                brands_found = results["competitor_brands"][2:7] if len(results["competitor_brands"]) > 6 else results["competitor_brands"][:5]
+        phrase_lower = phrase.lower()
+        is_best_query = "best" in phrase_lower
+        is_supplement_query = "supplement" in phrase_lower
+        has_brand = brand_name_lower in phrase_lower
+        has_nmn = "NMN" in phrase
+        
+        for vendor in VENDORS:
+            brands_found = vendor_brands[vendor]
             
             # Sometimes include the user's brand based on phrase
             brand_included = False
             position = None
             
-            if "best" in phrase.lower():
+            if is_best_query:
                 # More likely to include for "best" queries
                 if vendor == "openai":
                     brands_found = brands_found[:4] + [brand_name]
                     position = 5
                     brand_included = True
-                elif vendor == "google" and "supplement" in phrase.lower():
+                elif vendor == "google" and is_supplement_query:
                     brands_found = brands_found[:3] + [brand_name] + brands_found[3:4]
                     position = 4
                     brand_included = True
-            elif brand_name.lower() in phrase.lower():
+            elif has_brand:
                 # Always include if brand name is in phrase
                 brands_found = [brand_name] + brands_found[:4]
                 position = 1
                 brand_included = True
-            elif "NMN" in phrase and vendor == "anthropic":
+            elif has_nmn and vendor == "anthropic":
                 # Anthropic might mention for NMN
-                brands_found.append(brand_name)
+                brands_found = brands_found + [brand_name]
                 position = len(brands_found)
                 brand_included = True
                 
-            results["analysis_results"].append({
+            analysis_results.append({
                 "phrase": phrase,
                 "vendor": vendor,
                 "brands_found": brands_found[:6],  # Limit to 6 brands max
@@ -111,4 +122,6 @@ async def run_simple_analysis(request: AnalysisRequest):
                 "position": position
             })
     
+    results["analysis_results"] = analysis_results
+    
     return results
\ No newline at end of file
@@ -1,15 +1,23 @@
+import logging
+import re
+import orjson
+from app.services.brand_matching import matches_brand
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
 from typing import List, Optional
 from datetime import datetime, timedelta
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
 
-from app.database import get_db
+from app.database import get_db, get_async_db, AsyncSessionLocal
 from app.models import Brand, TrackedPhrase, WeeklyMetric, PhraseResult
 from app.core.prompt_runner import PromptRunner
 from app.llm.langchain_adapter import LangChainAdapter
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Pydantic models for API
@@ -34,6 +42,20 @@ class TrackedPhraseResponse(BaseModel):
     class Config:
         from_attributes = True
 
+E2B_TEMPLATES = (
+    "List the top 10 {phrase} brands",
+    "What are the best {phrase} companies?",
+    "Recommend {phrase} products from different brands",
+    "Who are the leading {phrase} providers?",
+    "Name the most popular {phrase} solutions",
+    "Which brands offer the best {phrase}?",
+    "What companies specialize in {phrase}?",
+    "List established {phrase} manufacturers"
+)
+
+# Built once so the list schema isn't rebuilt on every request
+_TRACKED_PHRASE_LIST = TypeAdapter(List[TrackedPhraseResponse])
+
 class PhraseRankingResponse(BaseModel):
     phrase: str
     brand_name: str
@@ -43,13 +65,13 @@ class PhraseRankingResponse(BaseModel):
     week_starting: str
 
 @router.post("/brands/{brand_id}/tracked-phrases", response_model=TrackedPhraseResponse)
-def create_tracked_phrase(
+async def create_tracked_phrase(
     brand_id: int,
     phrase_data: TrackedPhraseCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a single tracked phrase for a brand"""
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
@@ -61,172 +83,208 @@ def create_tracked_phrase(
     )
     
     db.add(tracked_phrase)
-    db.commit()
-    db.refresh(tracked_phrase)
+    await db.commit()
+    await db.refresh(tracked_phrase)
     
     return tracked_phrase
 
 @router.post("/brands/{brand_id}/tracked-phrases/bulk", response_model=List[TrackedPhraseResponse])
-def create_tracked_phrases_bulk(
+async def create_tracked_phrases_bulk(
     brand_id: int,
     bulk_data: TrackedPhraseBulkCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Bulk create tracked phrases for a brand"""
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
+    stripped_phrases = [phrase.strip() for phrase in bulk_data.phrases]
+    
+    # Fetch the phrases that already exist in one query instead of one per phrase
+    existing = set((await db.execute(
+        select(TrackedPhrase.phrase).where(
+            TrackedPhrase.brand_id == brand_id,
+            TrackedPhrase.phrase.in_(stripped_phrases)
+        )
+    )).scalars())
+    
     tracked_phrases = []
-    for phrase in bulk_data.phrases:
+    for phrase in stripped_phrases:
         # Skip if phrase already exists
-        existing = db.query(TrackedPhrase).filter(
-            TrackedPhrase.brand_id == brand_id,
-            TrackedPhrase.phrase == phrase.strip()
-        ).first()
-        
-        if not existing:
+        if phrase not in existing:
             tracked_phrase = TrackedPhrase(
                 brand_id=brand_id,
-                phrase=phrase.strip(),
+                phrase=phrase,
                 category=bulk_data.category,
                 priority=1
             )
             db.add(tracked_phrase)
             tracked_phrases.append(tracked_phrase)
+            existing.add(phrase)
     
-    db.commit()
+    await db.commit()
     for tp in tracked_phrases:
-        db.refresh(tp)
+        await db.refresh(tp)
     
     return tracked_phrases
 
 @router.get("/brands/{brand_id}/tracked-phrases", response_model=List[TrackedPhraseResponse])
-def get_tracked_phrases(
+async def get_tracked_phrases(
     brand_id: int,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all tracked phrases for a brand"""
-    query = db.query(TrackedPhrase).filter(TrackedPhrase.brand_id == brand_id)
+    query = select(TrackedPhrase).where(TrackedPhrase.brand_id == brand_id)
     
     if active_only:
-        query = query.filter(TrackedPhrase.is_active == True)
+        query = query.where(TrackedPhrase.is_active == True)
+    
+    rows = (await db.execute(
+        query.order_by(TrackedPhrase.priority, TrackedPhrase.phrase)
+    )).scalars().all()
     
-    return query.order_by(TrackedPhrase.priority, TrackedPhrase.phrase).all()
+    # Validate and serialize the rows in one pass; returning a Response
+    # skips FastAPI's second per-row validation against response_model
+    return Response(
+        content=_TRACKED_PHRASE_LIST.dump_json(_TRACKED_PHRASE_LIST.validate_python(rows)),
+        media_type="application/json"
+    )
 
 @router.delete("/tracked-phrases/{phrase_id}")
-def delete_tracked_phrase(phrase_id: int, db: Session = Depends(get_db)):
+async def delete_tracked_phrase(phrase_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a tracked phrase"""
-    tracked_phrase = db.query(TrackedPhrase).filter(TrackedPhrase.id == phrase_id).first()
+    tracked_phrase = await db.get(TrackedPhrase, phrase_id)
     if not tracked_phrase:
         raise HTTPException(status_code=404, detail="Tracked phrase not found")
     
-    db.delete(tracked_phrase)
-    db.commit()
+    await db.delete(tracked_phrase)
+    await db.commit()
     
     return {"message": "Tracked phrase deleted"}
 
 @router.put("/tracked-phrases/{phrase_id}/toggle")
-def toggle_tracked_phrase(phrase_id: int, db: Session = Depends(get_db)):
+async def toggle_tracked_phrase(phrase_id: int, db: AsyncSession = Depends(get_async_db)):
     """Toggle active status of a tracked phrase"""
-    tracked_phrase = db.query(TrackedPhrase).filter(TrackedPhrase.id == phrase_id).first()
+    tracked_phrase = await db.get(TrackedPhrase, phrase_id)
     if not tracked_phrase:
         raise HTTPException(status_code=404, detail="Tracked phrase not found")
     
     tracked_phrase.is_active = not tracked_phrase.is_active
-    db.commit()
-    db.refresh(tracked_phrase)
+    await db.commit()
+    await db.refresh(tracked_phrase)
     
     return {"id": phrase_id, "is_active": tracked_phrase.is_active}
 
 @router.get("/brands/{brand_id}/phrase-rankings/{vendor}")
-def get_phrase_rankings(
+async def get_phrase_rankings(
     brand_id: int,
     vendor: str,  # "openai", "google", "anthropic"
     weeks: int = 8,
-    db: Session = Depends(get_db)
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get rankings for all tracked phrases over time"""
+    """
+    Get rankings for all tracked phrases over time
+    
+    With stream=true the response is newline-delimited JSON, one phrase
+    object per line, so large brands don't have to be built in memory at once
+    """
     # Calculate week starting dates
     today = datetime.now().date()
     start_date = today - timedelta(weeks=weeks)
     
     # Get tracked phrases
-    phrases = db.query(TrackedPhrase).filter(
-        TrackedPhrase.brand_id == brand_id,
-        TrackedPhrase.is_active == True
-    ).all()
+    phrases = (await db.execute(
+        select(TrackedPhrase).where(
+            TrackedPhrase.brand_id == brand_id,
+            TrackedPhrase.is_active == True
+        )
+    )).scalars().all()
+    
+    if stream:
+        # The request session is closed before the body is sent, so the
+        # generator opens its own
+        async def generate():
+            async with AsyncSessionLocal() as stream_db:
+                for phrase in phrases:
+                    phrase_data = await _build_phrase_rankings(stream_db, phrase, start_date)
+                    yield orjson.dumps(phrase_data, default=float) + b"\n"
+        
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
     
     results = {}
     for phrase in phrases:
-        # Get weekly metrics for this phrase
-        metrics = db.query(WeeklyMetric).filter(
-            WeeklyMetric.tracked_phrase_id == phrase.id,
-            WeeklyMetric.week_starting >= start_date
-        ).order_by(WeeklyMetric.week_starting).all()
-        
-        # Get competitor brands that appear for this phrase
-        competitor_metrics = db.query(
+        results[phrase.phrase] = await _build_phrase_rankings(db, phrase, start_date)
+    
+    return results
+
+async def _build_phrase_rankings(db: AsyncSession, phrase: TrackedPhrase, start_date) -> dict:
+    """Build the weekly competitor data and top competitors for one phrase"""
+    # Get competitor brands that appear for this phrase
+    competitor_metrics = (await db.execute(
+        select(
             WeeklyMetric,
             Brand.name
         ).join(
             Brand, WeeklyMetric.competitor_brand_id == Brand.id
-        ).filter(
+        ).where(
             WeeklyMetric.tracked_phrase_id == phrase.id,
             WeeklyMetric.week_starting >= start_date
         ).order_by(
             WeeklyMetric.week_starting,
             WeeklyMetric.rank_position
-        ).all()
-        
-        phrase_data = {
-            "phrase": phrase.phrase,
-            "weekly_data": [],
-            "top_competitors": []
-        }
-        
-        # Group by week
-        weeks_data = {}
-        for metric, brand_name in competitor_metrics:
-            week_str = metric.week_starting.isoformat()
-            if week_str not in weeks_data:
-                weeks_data[week_str] = []
-            
-            weeks_data[week_str].append({
-                "brand": brand_name,
-                "rank": metric.rank_position,
-                "frequency": metric.frequency,
-                "weighted_score": metric.weighted_score
-            })
-        
-        phrase_data["weekly_data"] = weeks_data
+        )
+    )).all()
+    
+    phrase_data = {
+        "phrase": phrase.phrase,
+        "weekly_data": [],
+        "top_competitors": []
+    }
+    
+    # Group by week
+    weeks_data = {}
+    for metric, brand_name in competitor_metrics:
+        week_str = metric.week_starting.isoformat()
+        if week_str not in weeks_data:
+            weeks_data[week_str] = []
         
-        # Get top 10 competitors by frequency
-        top_competitors = db.query(
+        weeks_data[week_str].append({
+            "brand": brand_name,
+            "rank": metric.rank_position,
+            "frequency": metric.frequency,
+            "weighted_score": metric.weighted_score
+        })
+    
+    phrase_data["weekly_data"] = weeks_data
+    
+    # Get top 10 competitors by frequency
+    top_competitors = (await db.execute(
+        select(
             Brand.name,
             func.sum(WeeklyMetric.frequency).label('total_frequency'),
             func.avg(WeeklyMetric.rank_position).label('avg_rank')
         ).join(
             WeeklyMetric, WeeklyMetric.competitor_brand_id == Brand.id
-        ).filter(
+        ).where(
             WeeklyMetric.tracked_phrase_id == phrase.id
         ).group_by(Brand.name).order_by(
             desc('total_frequency')
-        ).limit(10).all()
-        
-        phrase_data["top_competitors"] = [
-            {
-                "brand": comp.name,
-                "total_frequency": comp.total_frequency,
-                "avg_rank": round(comp.avg_rank, 2) if comp.avg_rank else None
-            }
-            for comp in top_competitors
-        ]
-        
-        results[phrase.phrase] = phrase_data
+        ).limit(10)
+    )).all()
     
-    return results
+    phrase_data["top_competitors"] = [
+        {
+            "brand": comp.name,
+            "total_frequency": comp.total_frequency,
+            "avg_rank": round(comp.avg_rank, 2) if comp.avg_rank else None
+        }
+        for comp in top_competitors
+    ]
+    
+    return phrase_data
 
 @router.post("/brands/{brand_id}/run-phrase-analysis")
 async def run_phrase_analysis(
@@ -251,6 +309,10 @@ async def run_phrase_analysis(
     runner = PromptRunner(db)
     llm = LangChainAdapter()
     
+    # One case-insensitive matcher for the brand name and all of its aliases
+    brand_names = [alias for alias in [brand.name] + (brand.aliases or []) if alias]
+    alias_re = re.compile('|'.join(re.escape(alias) for alias in brand_names), re.IGNORECASE)
+    
     results = []
     for phrase in phrases:
         # Generate E→B prompts
@@ -269,20 +331,19 @@ async def run_phrase_analysis(
                 # Extract brands from response
                 brands_found = extract_brands_from_response(response['text'])
                 
+                # Find our brand in the list, tolerating variants like "Brand, Inc."
+                our_brand_position = None
+                for i, found_brand in enumerate(brands_found, 1):
+                    if alias_re.search(found_brand) or matches_brand(found_brand, brand_names):
+                        our_brand_position = i
+                        break
+                
                 # Check if our brand is mentioned
-                our_brand_mentioned = any(
-                    alias.lower() in response['text'].lower() 
-                    for alias in [brand.name] + brand.aliases
+                our_brand_mentioned = (
+                    our_brand_position is not None
+                    or alias_re.search(response['text']) is not None
                 )
                 
-                our_brand_position = None
-                if our_brand_mentioned:
-                    for i, found_brand in enumerate(brands_found, 1):
-                        if any(alias.lower() in found_brand.lower() 
-                               for alias in [brand.name] + brand.aliases):
-                            our_brand_position = i
-                            break
-                
                 # Store result
                 result = PhraseResult(
                     tracked_phrase_id=phrase.id,
@@ -303,7 +364,7 @@ async def run_phrase_analysis(
                 })
                 
             except Exception as e:
-                print(f"Error processing prompt: {e}")
+                logger.warning("Error processing prompt %r for %s", prompt_text, vendor, exc_info=True)
     
     db.commit()
     
@@ -315,24 +376,13 @@ async def run_phrase_analysis(
 
 def generate_e2b_prompts(phrase: str) -> List[str]:
     """Generate Entity-to-Brand prompts for a tracked phrase"""
-    templates = [
-        f"List the top 10 {phrase} brands",
-        f"What are the best {phrase} companies?",
-        f"Recommend {phrase} products from different brands",
-        f"Who are the leading {phrase} providers?",
-        f"Name the most popular {phrase} solutions",
-        f"Which brands offer the best {phrase}?",
-        f"What companies specialize in {phrase}?",
-        f"List established {phrase} manufacturers"
-    ]
-    return templates
+    return [template.format(phrase=phrase) for template in E2B_TEMPLATES]
 
 def extract_brands_from_response(text: str) -> List[str]:
     """Extract brand names from LLM response"""
     brands = []
     
     # Look for numbered lists
-    import re
     patterns = [
         r'\d+\.\s*([^:\n]+)',  # 1. Brand Name
         r'-\s*([^:\n]+)',       # - Brand Name
@@ -3,24 +3,45 @@ Weekly Tracking System for BEEB Analysis
 Stores and retrieves time-series data for entity and brand rankings
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
-from datetime import datetime, timedelta
-import json
-import os
-from pathlib import Path
+from pydantic import BaseModel, conint
+from collections import OrderedDict
+from datetime import datetime, date
+from functools import lru_cache
+import time
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models import WeeklyTrackingPoint
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 router = APIRouter()
 
-# Create data directory if it doesn't exist
-DATA_DIR = Path("data/weekly_tracking")
-DATA_DIR.mkdir(parents=True, exist_ok=True)
+# Computed GET responses per (brand, vendor), with the stamp they were built from
+TRACKING_CACHE_SIZE = 128
+_tracking_cache: OrderedDict = OrderedDict()
+
+# Columns of uq_weekly_tracking_point, the upsert conflict target
+TRACKING_POINT_KEY = ("brand_name", "vendor", "scope", "phrase", "key", "week_start")
+
+# Ranks are aggregated as uint8, so anything outside 1-255 is rejected on ingest
+Rank = conint(ge=1, le=255)
 
 class WeeklyDataPoint(BaseModel):
     week_start: str  # ISO date string
-    rank: int  # 1-10, where 1 is best
-    frequency: int  # Number of mentions
+    rank: Rank  # 1-10, where 1 is best
+    frequency: conint(ge=0)  # Number of mentions
     variance: Optional[float] = None
 
 class EntityTracking(BaseModel):
@@ -40,8 +61,8 @@ class BrandTracking(BaseModel):
 class WeeklyTrackingRequest(BaseModel):
     brand_name: str
     vendor: str
-    entity_rankings: Dict[str, int]  # entity -> rank
-    brand_rankings: Dict[str, Dict[str, int]]  # phrase -> {brand -> rank}
+    entity_rankings: Dict[str, Rank]  # entity -> rank
+    brand_rankings: Dict[str, Dict[str, Rank]]  # phrase -> {brand -> rank}
 
 class WeeklyTrackingResponse(BaseModel):
     brand_name: str
@@ -49,175 +70,240 @@ class WeeklyTrackingResponse(BaseModel):
     entity_tracking: List[EntityTracking]
     phrase_tracking: Dict[str, List[BrandTracking]]
 
-def get_week_start(date: datetime = None) -> str:
-    """Get the Monday of the current week"""
-    if date is None:
-        date = datetime.now()
-    days_since_monday = date.weekday()
-    monday = date - timedelta(days=days_since_monday)
-    return monday.strftime("%Y-%m-%d")
+@lru_cache(maxsize=1)
+def _current_week_start(minute: int) -> str:
+    # Keyed on the wall-clock minute, so it recomputes shortly after a week rolls over
+    today = date.today()
+    return date.fromordinal(today.toordinal() - today.weekday()).isoformat()
 
-def load_tracking_data(brand_name: str, vendor: str) -> Dict:
-    """Load existing tracking data from file"""
-    file_path = DATA_DIR / f"{brand_name.replace(' ', '_')}_{vendor}.json"
-    if file_path.exists():
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    return {
-        "brand_name": brand_name,
-        "vendor": vendor,
-        "entity_tracking": {},
-        "phrase_tracking": {}
-    }
+def get_week_start(day: datetime = None) -> str:
+    """Get the Monday of the current week (or of the week containing day)"""
+    if day is None:
+        return _current_week_start(int(time.time() // 60))
+    return date.fromordinal(day.toordinal() - day.weekday()).isoformat()
 
-def save_tracking_data(brand_name: str, vendor: str, data: Dict):
-    """Save tracking data to file"""
-    file_path = DATA_DIR / f"{brand_name.replace(' ', '_')}_{vendor}.json"
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=2)
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def welford_grouped(values, gids, ngroups):
+        """Single-pass (Welford) per-group mean and population variance"""
+        means = np.zeros(ngroups)
+        m2 = np.zeros(ngroups)
+        counts = np.zeros(ngroups, np.int64)
+        for i in range(values.size):
+            g = gids[i]
+            counts[g] += 1
+            d = values[i] - means[g]
+            means[g] += d / counts[g]
+            m2[g] += d * (values[i] - means[g])
+        return means, m2 / np.maximum(counts, 1)
+
+def grouped_rank_stats(ranks: np.ndarray, starts: np.ndarray, counts: np.ndarray):
+    """Mean and population variance of ranks for each contiguous group"""
+    if NUMBA_AVAILABLE:
+        gids = np.repeat(np.arange(len(starts)), counts)
+        return welford_grouped(ranks, gids, len(starts))
+    means = np.add.reduceat(ranks, starts, dtype=np.float64) / counts
+    variances = np.maximum(np.add.reduceat(np.square(ranks, dtype=np.float64), starts) / counts - means ** 2, 0)
+    return means, variances
+
+def upsert_tracking_points_stmt(dialect_name: str, rows: List[Dict[str, Any]]):
+    """
+    Insert tracking points, or for a (brand, vendor, scope, phrase, key, week)
+    that already exists, overwrite the rank and bump the frequency
+    """
+    # One row per key: Postgres refuses an ON CONFLICT batch that hits the
+    # same row twice. Last occurrence wins, as sequential updates would.
+    rows = list({tuple(row[col] for col in TRACKING_POINT_KEY): row for row in rows}.values())
+    
+    insert = pg_insert if dialect_name == "postgresql" else sqlite_insert
+    stmt = insert(WeeklyTrackingPoint).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=list(TRACKING_POINT_KEY),
+        set_={
+            "rank": stmt.excluded.rank,
+            "frequency": WeeklyTrackingPoint.frequency + 1
+        }
+    )
+
+async def upsert_tracking_points(db: AsyncSession, rows: List[Dict[str, Any]]):
+    if rows:
+        await db.execute(upsert_tracking_points_stmt(db.bind.dialect.name, rows))
 
 @router.post("/weekly-tracking/update")
-async def update_weekly_tracking(request: WeeklyTrackingRequest):
+async def update_weekly_tracking(request: WeeklyTrackingRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Update weekly tracking data with new rankings
     """
     week_start = get_week_start()
+    week_date = date.fromisoformat(week_start)
+    base = {"brand_name": request.brand_name, "vendor": request.vendor, "week_start": week_date, "frequency": 1}
     
-    # Load existing data
-    tracking_data = load_tracking_data(request.brand_name, request.vendor)
-    
-    # Update entity tracking
-    if "entity_tracking" not in tracking_data:
-        tracking_data["entity_tracking"] = {}
-    
-    for entity, rank in request.entity_rankings.items():
-        if entity not in tracking_data["entity_tracking"]:
-            tracking_data["entity_tracking"][entity] = []
-        
-        # Check if we already have data for this week
-        existing_week = False
-        for point in tracking_data["entity_tracking"][entity]:
-            if point["week_start"] == week_start:
-                point["rank"] = rank
-                point["frequency"] = point.get("frequency", 0) + 1
-                existing_week = True
-                break
-        
-        if not existing_week:
-            tracking_data["entity_tracking"][entity].append({
-                "week_start": week_start,
-                "rank": rank,
-                "frequency": 1
-            })
-    
-    # Update phrase/brand tracking
-    if "phrase_tracking" not in tracking_data:
-        tracking_data["phrase_tracking"] = {}
-    
-    for phrase, brand_rankings in request.brand_rankings.items():
-        if phrase not in tracking_data["phrase_tracking"]:
-            tracking_data["phrase_tracking"][phrase] = {}
-        
-        for brand, rank in brand_rankings.items():
-            if brand not in tracking_data["phrase_tracking"][phrase]:
-                tracking_data["phrase_tracking"][phrase][brand] = []
-            
-            # Check if we already have data for this week
-            existing_week = False
-            for point in tracking_data["phrase_tracking"][phrase][brand]:
-                if point["week_start"] == week_start:
-                    point["rank"] = rank
-                    point["frequency"] = point.get("frequency", 0) + 1
-                    existing_week = True
-                    break
-            
-            if not existing_week:
-                tracking_data["phrase_tracking"][phrase][brand].append({
-                    "week_start": week_start,
-                    "rank": rank,
-                    "frequency": 1
-                })
+    rows = [
+        {**base, "scope": "entity", "phrase": "", "key": entity, "rank": rank}
+        for entity, rank in request.entity_rankings.items()
+    ]
+    rows.extend(
+        {**base, "scope": "phrase", "phrase": phrase, "key": brand, "rank": rank}
+        for phrase, brand_rankings in request.brand_rankings.items()
+        for brand, rank in brand_rankings.items()
+    )
     
-    # Save updated data
-    save_tracking_data(request.brand_name, request.vendor, tracking_data)
+    await upsert_tracking_points(db, rows)
+    await db.commit()
+    _tracking_cache.pop((request.brand_name, request.vendor), None)
     
     return {"status": "success", "week": week_start}
 
-@router.get("/weekly-tracking/{brand_name}/{vendor}", response_model=WeeklyTrackingResponse)
-async def get_weekly_tracking(brand_name: str, vendor: str):
+@router.get("/weekly-tracking/{brand_name}/{vendor}", response_model=WeeklyTrackingResponse, response_class=ORJSONResponse)
+async def get_weekly_tracking(brand_name: str, vendor: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get weekly tracking data for visualization
     """
-    tracking_data = load_tracking_data(brand_name, vendor)
+    # Any upsert changes the row count or the frequency sum, so this stamp
+    # tells us whether a cached response is still current
+    owner = (
+        WeeklyTrackingPoint.brand_name == brand_name,
+        WeeklyTrackingPoint.vendor == vendor
+    )
+    stamp = tuple((await db.execute(
+        select(
+            func.count(),
+            func.sum(WeeklyTrackingPoint.frequency),
+            func.max(WeeklyTrackingPoint.week_start)
+        ).where(*owner)
+    )).one())
     
-    # Process entity tracking
-    entity_tracking = []
-    for entity, data_points in tracking_data.get("entity_tracking", {}).items():
-        if data_points:
-            total_freq = sum(p.get("frequency", 1) for p in data_points)
-            ranks = [p["rank"] for p in data_points]
-            avg_rank = sum(ranks) / len(ranks) if ranks else 0
-            
-            # Calculate variance
-            if len(ranks) > 1:
-                mean = avg_rank
-                variance = sum((r - mean) ** 2 for r in ranks) / len(ranks)
-            else:
-                variance = 0
-            
-            entity_tracking.append(EntityTracking(
-                entity=entity,
-                data_points=[WeeklyDataPoint(**p) for p in data_points],
-                total_frequency=total_freq,
-                avg_rank=round(avg_rank, 2),
-                variance=round(variance, 2)
-            ))
+    cache_key = (brand_name, vendor)
+    cached = _tracking_cache.get(cache_key)
+    if cached is not None and cached[0] == stamp:
+        _tracking_cache.move_to_end(cache_key)
+        return cached[1]
     
-    # Sort by average rank (best first)
-    entity_tracking.sort(key=lambda x: x.avg_rank)
+    points = (await db.execute(
+        select(
+            WeeklyTrackingPoint.scope,
+            WeeklyTrackingPoint.phrase,
+            WeeklyTrackingPoint.key,
+            WeeklyTrackingPoint.week_start,
+            WeeklyTrackingPoint.rank,
+            WeeklyTrackingPoint.frequency
+        ).where(*owner).order_by(
+            WeeklyTrackingPoint.scope,
+            WeeklyTrackingPoint.phrase,
+            WeeklyTrackingPoint.key,
+            WeeklyTrackingPoint.week_start
+        )
+    )).all()
     
-    # Process phrase tracking
-    phrase_tracking = {}
-    for phrase, brands_data in tracking_data.get("phrase_tracking", {}).items():
-        brand_tracking = []
-        for brand, data_points in brands_data.items():
-            if data_points:
-                total_freq = sum(p.get("frequency", 1) for p in data_points)
-                ranks = [p["rank"] for p in data_points]
-                avg_rank = sum(ranks) / len(ranks) if ranks else 0
-                
-                # Calculate variance
-                if len(ranks) > 1:
-                    mean = avg_rank
-                    variance = sum((r - mean) ** 2 for r in ranks) / len(ranks)
-                else:
-                    variance = 0
-                
-                brand_tracking.append(BrandTracking(
-                    brand=brand,
-                    data_points=[WeeklyDataPoint(**p) for p in data_points],
-                    total_frequency=total_freq,
-                    avg_rank=round(avg_rank, 2),
-                    variance=round(variance, 2)
-                ))
-        
-        # Sort by average rank (best first)
-        brand_tracking.sort(key=lambda x: x.avg_rank)
-        phrase_tracking[phrase] = brand_tracking[:10]  # Top 10 brands per phrase
+    if not points:
+        return WeeklyTrackingResponse(brand_name=brand_name, vendor=vendor, entity_tracking=[], phrase_tracking={})
     
-    return WeeklyTrackingResponse(
+    # Rows arrive sorted, so each (scope, phrase, key) is a contiguous slice
+    # starting at group_starts[g]
+    group_keys = []
+    group_starts = []
+    for i, (scope, phrase, key, *_) in enumerate(points):
+        if not group_keys or group_keys[-1] != (scope, phrase, key):
+            group_keys.append((scope, phrase, key))
+            group_starts.append(i)
+    
+    # Per-group totals, mean and (population) variance in one vectorized pass
+    ranks = np.fromiter((p.rank for p in points), dtype=np.uint8, count=len(points))
+    freqs = np.fromiter((p.frequency for p in points), dtype=np.int64, count=len(points))
+    starts = np.asarray(group_starts)
+    counts = np.diff(np.append(starts, len(points)))
+    total_freqs = np.add.reduceat(freqs, starts)
+    avg_ranks, variances = grouped_rank_stats(ranks, starts, counts)
+    avg_ranks = np.round(avg_ranks, 2)
+    variances = np.round(variances, 2)
+    
+    def data_points(g: int) -> List[WeeklyDataPoint]:
+        end = group_starts[g + 1] if g + 1 < len(group_starts) else len(points)
+        return [
+            WeeklyDataPoint(week_start=p.week_start.isoformat(), rank=p.rank, frequency=p.frequency)
+            for p in points[group_starts[g]:end]
+        ]
+    
+    def top_groups(group_ids: List[int]) -> List[int]:
+        # Best (lowest) average rank first; stable so ties keep key order
+        ids = np.asarray(group_ids)
+        return ids[np.argsort(avg_ranks[ids], kind="stable")[:10]].tolist()
+    
+    # Split groups into entities and per-phrase brands
+    entity_groups = []
+    phrase_groups = {}
+    for g, (scope, phrase, key) in enumerate(group_keys):
+        if scope == "entity":
+            entity_groups.append(g)
+        else:
+            phrase_groups.setdefault(phrase, []).append(g)
+    
+    # Top 10 entities
+    entity_tracking = [
+        EntityTracking(
+            entity=group_keys[g][2],
+            data_points=data_points(g),
+            total_frequency=int(total_freqs[g]),
+            avg_rank=float(avg_ranks[g]),
+            variance=float(variances[g])
+        )
+        for g in (top_groups(entity_groups) if entity_groups else [])
+    ]
+    
+    # Top 10 brands per phrase
+    phrase_tracking = {
+        phrase: [
+            BrandTracking(
+                brand=group_keys[g][2],
+                data_points=data_points(g),
+                total_frequency=int(total_freqs[g]),
+                avg_rank=float(avg_ranks[g]),
+                variance=float(variances[g])
+            )
+            for g in top_groups(group_ids)
+        ]
+        for phrase, group_ids in phrase_groups.items()
+    }
+    
+    response = WeeklyTrackingResponse(
         brand_name=brand_name,
         vendor=vendor,
-        entity_tracking=entity_tracking[:10],  # Top 10 entities
+        entity_tracking=entity_tracking,
         phrase_tracking=phrase_tracking
     )
+    
+    _tracking_cache[cache_key] = (stamp, response)
+    if len(_tracking_cache) > TRACKING_CACHE_SIZE:
+        _tracking_cache.popitem(last=False)
+    
+    return response
+
+def sample_rows(brand_name: str, vendor: str, scope: str, series: Dict[tuple, List[int]],
+                weeks: np.ndarray, frequency) -> List[Dict[str, Any]]:
+    """
+    Tracking rows for {(phrase, key): ranks per week}, built as flat columns
+    (series-major, one entry per week) and zipped into dicts once
+    """
+    ranks = np.array(list(series.values()), dtype=np.uint8)
+    series_idx = np.repeat(np.arange(len(series)), len(weeks))
+    week_col = np.tile(weeks, len(series))
+    frequencies = frequency(ranks.astype(np.int64))
+    
+    keys = list(series)
+    return [
+        {"brand_name": brand_name, "vendor": vendor, "scope": scope, "phrase": keys[i][0], "key": keys[i][1],
+         "week_start": week, "rank": rank, "frequency": freq}
+        for i, week, rank, freq in zip(
+            series_idx.tolist(), week_col.tolist(), ranks.ravel().tolist(), frequencies.ravel().tolist()
+        )
+    ]
 
 class GenerateSampleRequest(BaseModel):
     brand_name: str
     vendor: str = "openai"
 
 @router.post("/weekly-tracking/generate-sample")
-async def generate_sample_data(request: GenerateSampleRequest):
+async def generate_sample_data(request: GenerateSampleRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Generate sample weekly tracking data for testing
     """
@@ -227,19 +313,8 @@ async def generate_sample_data(request: GenerateSampleRequest):
     if not brand_name:
         brand_name = "AVEA Life"
     
-    # Generate 4 weeks of sample data
-    weeks = []
-    current_date = datetime.now()
-    for i in range(4):
-        week_date = current_date - timedelta(weeks=3-i)
-        weeks.append(get_week_start(week_date))
-    
-    tracking_data = {
-        "brand_name": brand_name,
-        "vendor": vendor,
-        "entity_tracking": {},
-        "phrase_tracking": {}
-    }
+    # 4 weeks of sample data, ending with the current week
+    weeks = np.datetime64(get_week_start(), "D") - 7 * np.arange(3, -1, -1)
     
     # Generate sample entities based on brand name
     if "avea" in brand_name.lower():
@@ -266,15 +341,6 @@ async def generate_sample_data(request: GenerateSampleRequest):
             "support": [9, 9, 9, 8]
         }
     
-    for entity, ranks in entities.items():
-        tracking_data["entity_tracking"][entity] = []
-        for week, rank in zip(weeks, ranks):
-            tracking_data["entity_tracking"][entity].append({
-                "week_start": week,
-                "rank": rank,
-                "frequency": 5 - rank // 2  # Higher rank = more frequency
-            })
-    
     # Sample phrase tracking - use dynamic brand name
     if "avea" in brand_name.lower():
         phrases = {
@@ -310,18 +376,19 @@ async def generate_sample_data(request: GenerateSampleRequest):
             }
         }
     
-    for phrase, brands in phrases.items():
-        tracking_data["phrase_tracking"][phrase] = {}
-        for brand, ranks in brands.items():
-            tracking_data["phrase_tracking"][phrase][brand] = []
-            for week, rank in zip(weeks, ranks):
-                tracking_data["phrase_tracking"][phrase][brand].append({
-                    "week_start": week,
-                    "rank": rank,
-                    "frequency": 10 - rank  # Higher rank = more frequency
-                })
-    
-    # Save the sample data
-    save_tracking_data(brand_name, vendor, tracking_data)
+    # Replace any existing data for this brand/vendor with the sample
+    await db.execute(delete(WeeklyTrackingPoint).where(
+        WeeklyTrackingPoint.brand_name == brand_name,
+        WeeklyTrackingPoint.vendor == vendor
+    ))
+    # Higher rank = more frequency
+    rows = sample_rows(brand_name, vendor, "entity", {("", entity): ranks for entity, ranks in entities.items()},
+                       weeks, lambda ranks: 5 - ranks // 2)
+    rows.extend(sample_rows(brand_name, vendor, "phrase",
+                            {(phrase, brand): ranks for phrase, brands in phrases.items() for brand, ranks in brands.items()},
+                            weeks, lambda ranks: 10 - ranks))
+    await upsert_tracking_points(db, rows)
+    await db.commit()
+    _tracking_cache.pop((brand_name, vendor), None)
     
     return {"status": "success", "message": f"Generated sample data for {brand_name} ({vendor})"}
\ No newline at end of file
@@ -1,37 +1,105 @@
+import asyncio
 import re
-from typing import List, Dict, Set, Optional
+from functools import lru_cache
+from typing import Iterator, List, Dict, Set, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.models import Entity, Mention, Completion, Brand
 import spacy
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Numbered / bulleted list items, captured up to the first comma
+LIST_ITEM_RE = re.compile(r'(?:^|\n)\s*(?:\d+\.?|\-|\*)\s*([^,\n]+)')
+
+# Only NER is used; skip the components that don't feed it
+SPACY_EXCLUDE = ["parser", "lemmatizer", "attribute_ruler", "tagger"]
+
+@lru_cache(maxsize=1)
+def load_nlp():
+    """Load the spaCy pipeline once per process"""
+    try:
+        nlp = spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDE)
+    except:
+        import subprocess
+        subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
+        nlp = spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDE)
+    nlp.max_length = 2_000_000
+    return nlp
+
 class EntityExtractor:
     def __init__(self, db: Session):
         self.db = db
-        self.nlp = None
-        self._load_nlp()
+        self.nlp = load_nlp()
         self.brand_cache = self._build_brand_cache()
-    
-    def _load_nlp(self):
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except:
-            import subprocess
-            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-            self.nlp = spacy.load("en_core_web_sm")
+        self.brand_matcher = self._build_brand_matcher()
+        self._brand_regex_ci = None  # see _brand_spans
     
     def _build_brand_cache(self) -> Dict[str, int]:
         cache = {}
-        brands = self.db.query(Brand).all()
-        for brand in brands:
-            cache[brand.name.lower()] = brand.id
-            for alias in brand.aliases or []:
-                cache[alias.lower()] = brand.id
+        brands = self.db.query(Brand.id, Brand.name, Brand.aliases).all()
+        for brand_id, name, aliases in brands:
+            cache[name.lower()] = brand_id
+            for alias in aliases or []:
+                cache[alias.lower()] = brand_id
         return cache
     
+    def _build_brand_matcher(self):
+        """
+        Matcher over all brand names/aliases (already lowercase), built once:
+        an Aho-Corasick automaton, or a longest-first regex alternation
+        when pyahocorasick isn't installed
+        """
+        names = [name for name in self.brand_cache if name]
+        if not names:
+            return None
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for name in names:
+                automaton.add_word(name, name)
+            automaton.make_automaton()
+            return automaton
+        return re.compile(self._brand_alternation(names))
+    
+    @staticmethod
+    def _brand_alternation(names: List[str]) -> str:
+        return "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+    
+    def _brand_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(start, end) of longest non-overlapping brand matches in text"""
+        if self.brand_matcher is None:
+            return
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Lowercasing changed the length (e.g. 'İ' -> 'i̇'), so offsets into
+            # lowered wouldn't line up with text: match text case-insensitively
+            if self._brand_regex_ci is None:
+                self._brand_regex_ci = re.compile(
+                    self._brand_alternation([name for name in self.brand_cache if name]), re.IGNORECASE
+                )
+            for match in self._brand_regex_ci.finditer(text):
+                yield match.span()
+            return
+        if isinstance(self.brand_matcher, re.Pattern):
+            for match in self.brand_matcher.finditer(lowered):
+                yield match.span()
+        else:
+            for end_idx, name in self.brand_matcher.iter_long(lowered):
+                yield end_idx - len(name) + 1, end_idx + 1
+    
     def extract_entities(self, text: str) -> List[Dict]:
+        return self._extract_from_doc(text, self.nlp(text))
+    
+    async def extract_entities_async(self, text: str) -> List[Dict]:
+        """extract_entities on the default executor, keeping NER off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.extract_entities, text)
+    
+    def _extract_from_doc(self, text: str, doc) -> List[Dict]:
         entities = []
         
-        doc = self.nlp(text)
         for ent in doc.ents:
             if ent.label_ in ["ORG", "PRODUCT", "PERSON"]:
                 entities.append({
@@ -41,19 +109,17 @@ class EntityExtractor:
                     "end": ent.end_char
                 })
         
-        brand_pattern = "|".join(re.escape(brand) for brand in self.brand_cache.keys())
-        if brand_pattern:
-            for match in re.finditer(brand_pattern, text, re.IGNORECASE):
-                entities.append({
-                    "text": match.group(),
-                    "label": "BRAND",
-                    "start": match.start(),
-                    "end": match.end()
-                })
+        # Single pass over the text for all brands: longest non-overlapping matches
+        for start, end in self._brand_spans(text):
+            entities.append({
+                "text": text[start:end],
+                "label": "BRAND",
+                "start": start,
+                "end": end
+            })
         
-        list_pattern = r'(?:^|\n)\s*(?:\d+\.?|\-|\*)\s*([^,\n]+)'
         rank = 1
-        for match in re.finditer(list_pattern, text):
+        for match in LIST_ITEM_RE.finditer(text):
             item_text = match.group(1).strip()
             if item_text:
                 entities.append({
@@ -68,40 +134,70 @@ class EntityExtractor:
         return entities
     
     def canonicalize_entity(self, entity_text: str) -> Optional[int]:
-        normalized = entity_text.lower().strip()
-        
-        if normalized in self.brand_cache:
-            return self.brand_cache[normalized]
-        
-        existing = self.db.query(Entity).filter(
-            Entity.label == entity_text
-        ).first()
+        return self.canonicalize_entities([entity_text])[entity_text]
+    
+    def canonicalize_entities(self, entity_texts: List[str]) -> Dict[str, int]:
+        """Resolve many entity texts with one lookup query and one insert flush"""
+        resolved = {}
+        unresolved = {}
+        for text in entity_texts:
+            brand_id = self.brand_cache.get(text.lower().strip())
+            if brand_id is not None:
+                resolved[text] = brand_id
+            else:
+                unresolved[text] = None
         
-        if existing:
-            return existing.id if existing.canonical_id else existing.id
+        if unresolved:
+            existing = self.db.query(Entity.id, Entity.label).filter(
+                Entity.label.in_(list(unresolved))
+            ).order_by(Entity.id).all()
+            for entity_id, label in existing:
+                resolved.setdefault(label, entity_id)
+            
+            new_entities = [
+                Entity(label=text, type="UNKNOWN")
+                for text in unresolved if text not in resolved
+            ]
+            if new_entities:
+                self.db.add_all(new_entities)
+                self.db.flush()
+                resolved.update((entity.label, entity.id) for entity in new_entities)
         
-        new_entity = Entity(label=entity_text, type="UNKNOWN")
-        self.db.add(new_entity)
-        self.db.flush()
-        return new_entity.id
+        return resolved
     
     def process_completion(self, completion_id: int):
-        completion = self.db.query(Completion).get(completion_id)
-        if not completion:
+        self.process_completions([completion_id])
+    
+    def process_completions(self, completion_ids: List[int], batch_size: int = 64):
+        """Extract and store mentions for many completions, batching spaCy NER with nlp.pipe"""
+        # Only id and text are needed; skip hydrating Completion (and its raw_json)
+        completions = self.db.query(Completion.id, Completion.text).filter(
+            Completion.id.in_(completion_ids)
+        ).all()
+        if not completions:
             return
         
-        entities = self.extract_entities(completion.text)
+        texts = [text for _, text in completions]
+        docs = self.nlp.pipe(texts, batch_size=batch_size)
         
-        for ent in entities:
-            entity_id = self.canonicalize_entity(ent["text"])
-            
-            mention = Mention(
+        extracted = [
+            (completion_id, self._extract_from_doc(text, doc))
+            for (completion_id, text), doc in zip(completions, docs)
+        ]
+        entity_ids = self.canonicalize_entities([
+            ent["text"] for _, entities in extracted for ent in entities
+        ])
+        
+        self.db.add_all([
+            Mention(
                 completion_id=completion_id,
-                entity_id=entity_id,
+                entity_id=entity_ids[ent["text"]],
                 start_idx=ent.get("start"),
                 rank_pos=ent.get("rank"),
                 confidence=0.8
             )
-            self.db.add(mention)
+            for completion_id, entities in extracted
+            for ent in entities
+        ])
         
-        self.db.commit()
\ No newline at end of file
+        self.db.commit()
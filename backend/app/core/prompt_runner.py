@@ -6,6 +6,26 @@ from app.llm.langchain_adapter import LangChainAdapter
 from app.models import Run, Prompt, Completion, Model
 from app.cache.upstash_cache import cache
 
+# Upper bound on concurrent LLM calls per experiment run
+MAX_CONCURRENT_GENERATIONS = 8
+
+async def _cache_get_many(keys: List[str]) -> List[Any]:
+    """Pipelined MGET when the cache supports it, otherwise concurrent GETs"""
+    if not keys:
+        return []
+    if hasattr(cache, "mget"):
+        return list(await cache.mget(keys))
+    return list(await asyncio.gather(*(cache.get(key) for key in keys)))
+
+async def _cache_set_many(items: Dict[str, Any], ttl: int):
+    """Pipelined MSET when the cache supports it, otherwise concurrent SETs"""
+    if not items:
+        return
+    if hasattr(cache, "mset"):
+        await cache.mset(items, ttl=ttl)
+    else:
+        await asyncio.gather(*(cache.set(key, value, ttl=ttl) for key, value in items.items()))
+
 class PromptRunner:
     def __init__(self, db: Session):
         self.db = db
@@ -46,39 +66,55 @@ class PromptRunner:
         self.db.add(run)
         self.db.commit()
         
+        # Hash the per-run settings and each prompt once; only the rep suffix varies
+        key_base = hashlib.blake2b(f"{model_vendor}:{temperature}:{grounded}:".encode(), digest_size=16)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+        
+        async def generate(prompt_text: str, rep: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.adapter.generate(
+                    vendor=model_vendor,
+                    prompt=prompt_text,
+                    temperature=temperature,
+                    grounded=grounded,
+                    seed=seed + rep if seed else None
+                )
+        
+        jobs = []
+        prompt_types = {}
         for prompt_text in prompts:
+            prompt_types[prompt_text] = "B2E" if "associated with" in prompt_text else "E2B"
+            prompt_key = key_base.copy()
+            prompt_key.update(prompt_text.encode())
+            
             for rep in range(repetitions):
-                cache_key = f"prompt:{hashlib.md5(f'{prompt_text}:{model_vendor}:{temperature}:{grounded}:{seed+rep if seed else rep}'.encode()).hexdigest()}"
-                
-                cached_response = await cache.get(cache_key)
-                if cached_response:
-                    response = cached_response
-                else:
-                    response = await self.adapter.generate(
-                        vendor=model_vendor,
-                        prompt=prompt_text,
-                        temperature=temperature,
-                        grounded=grounded,
-                        seed=seed + rep if seed else None
-                    )
-                    await cache.set(cache_key, response, ttl=86400)
-                
-                prompt = Prompt(
-                    run_id=run.id,
-                    type="B2E" if "associated with" in prompt_text else "E2B",
-                    input_text=prompt_text,
-                    variant_id=rep
-                )
-                self.db.add(prompt)
-                self.db.flush()
-                
-                completion = Completion(
-                    prompt_id=prompt.id,
+                rep_key = prompt_key.copy()
+                rep_key.update(f":{seed + rep if seed else rep}".encode())
+                jobs.append((f"prompt:{rep_key.hexdigest()}", prompt_text, rep))
+        
+        # One batched cache read up front, LLM calls only for the misses
+        responses = await _cache_get_many([cache_key for cache_key, _, _ in jobs])
+        misses = [i for i, response in enumerate(responses) if not response]
+        generated = await asyncio.gather(*(generate(*jobs[i][1:]) for i in misses))
+        for i, response in zip(misses, generated):
+            responses[i] = response
+        await _cache_set_many({jobs[i][0]: responses[i] for i in misses}, ttl=86400)
+        
+        # Prompts and their completions go in one flush at the end
+        self.db.add_all([
+            Prompt(
+                run_id=run.id,
+                type=prompt_types[prompt_text],
+                input_text=prompt_text,
+                variant_id=rep,
+                completions=[Completion(
                     text=response["text"],
                     tokens=response.get("tokens"),
                     raw_json=response.get("raw")
-                )
-                self.db.add(completion)
+                )]
+            )
+            for (_, prompt_text, rep), response in zip(jobs, responses)
+        ])
         
         self.db.commit()
         return run
@@ -1,62 +1,109 @@
+from functools import lru_cache
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, and_
 from scipy import stats
 from app.models import Run, Prompt, Completion, Mention, Entity, Brand, Metric
 
+# Two-sided 95% normal quantile, stats.norm.ppf(0.975)
+_Z95 = 1.959963984540054
+
+@lru_cache(maxsize=8)
+def _z_score(confidence: float) -> float:
+    if confidence == 0.95:
+        return _Z95
+    return float(stats.norm.ppf((1 + confidence) / 2))
+
+def wilson_ci_vec(successes: np.ndarray, trials: np.ndarray, z: float = _Z95) -> Tuple[np.ndarray, np.ndarray]:
+    """Wilson score intervals for many (successes, trials) pairs at once; (0, 0) where trials == 0"""
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+    n = np.where(trials > 0, trials, 1)
+    
+    p_hat = successes / n
+    denominator = 1 + z**2 / n
+    center = (p_hat + z**2 / (2 * n)) / denominator
+    margin = z * np.sqrt((p_hat * (1 - p_hat) + z**2 / (4 * n)) / n) / denominator
+    
+    empty = trials == 0
+    low = np.where(empty, 0.0, np.maximum(0, center - margin))
+    high = np.where(empty, 0.0, np.minimum(1, center + margin))
+    return low, high
+
 class Scorer:
     def __init__(self, db: Session):
         self.db = db
     
-    def calculate_mention_rate(self, brand_id: int, run_id: int) -> Tuple[float, float, float]:
-        prompts = self.db.query(Prompt).filter(Prompt.run_id == run_id).all()
-        total_completions = 0
-        mentions = 0
-        
-        for prompt in prompts:
-            completions = self.db.query(Completion).filter(
-                Completion.prompt_id == prompt.id
-            ).all()
-            
-            for completion in completions:
-                total_completions += 1
-                has_mention = self.db.query(Mention).join(Entity).filter(
-                    Mention.completion_id == completion.id,
-                    Entity.canonical_id == brand_id
-                ).first() is not None
-                
-                if has_mention:
-                    mentions += 1
-        
-        if total_completions == 0:
+    def _aggregate(self, brand_id: int, run_id: int) -> Dict:
+        """
+        Mention counts and rank sums for a brand in a run, in one round trip.
+        Returns totals plus per-prompt-text groups (for stability).
+        """
+        # One row per completion: does it mention the brand, and its best rank
+        brand_entity = and_(Entity.id == Mention.entity_id, Entity.canonical_id == brand_id)
+        per_completion = self.db.query(
+            Prompt.input_text.label("input_text"),
+            func.count(Entity.id).label("brand_mentions"),
+            func.min(case((Entity.id.isnot(None), Mention.rank_pos))).label("best_rank")
+        ).join(
+            Completion, Completion.prompt_id == Prompt.id
+        ).outerjoin(
+            Mention, Mention.completion_id == Completion.id
+        ).outerjoin(
+            Entity, brand_entity
+        ).filter(
+            Prompt.run_id == run_id
+        ).group_by(Completion.id, Prompt.input_text).subquery()
+        
+        # Roll completions up per prompt text
+        groups = self.db.query(
+            func.count().label("completions"),
+            func.sum(case((per_completion.c.brand_mentions > 0, 1), else_=0)).label("mentions"),
+            func.sum(per_completion.c.best_rank).label("rank_sum"),
+            func.count(per_completion.c.best_rank).label("ranked")
+        ).group_by(per_completion.c.input_text).all()
+        
+        completions = np.array([g.completions for g in groups], dtype=np.int64)
+        mentions = np.array([g.mentions or 0 for g in groups], dtype=np.int64)
+        
+        return {
+            "completions": int(completions.sum()),
+            "mentions": int(mentions.sum()),
+            "rank_sum": float(sum(g.rank_sum or 0 for g in groups)),
+            "ranked": int(sum(g.ranked for g in groups)),
+            "group_rates": (mentions / completions).tolist() if groups else []
+        }
+    
+    def _mention_rate(self, agg: Dict) -> Tuple[float, float, float]:
+        if agg["completions"] == 0:
             return 0.0, 0.0, 0.0
         
-        rate = mentions / total_completions
-        ci_low, ci_high = self._wilson_confidence_interval(mentions, total_completions)
+        rate = agg["mentions"] / agg["completions"]
+        ci_low, ci_high = self._wilson_confidence_interval(agg["mentions"], agg["completions"])
         
         return rate, ci_low, ci_high
     
+    def _avg_rank(self, agg: Dict) -> float:
+        return agg["rank_sum"] / agg["ranked"] if agg["ranked"] else float('inf')
+    
+    def _stability(self, agg: Dict) -> float:
+        mention_rates = agg["group_rates"]
+        if len(mention_rates) < 2:
+            return 1.0
+        
+        mean_rate = np.mean(mention_rates)
+        if mean_rate == 0:
+            return 1.0
+        
+        cv = np.std(mention_rates) / mean_rate
+        return 1 - min(cv, 1)
+    
+    def calculate_mention_rate(self, brand_id: int, run_id: int) -> Tuple[float, float, float]:
+        return self._mention_rate(self._aggregate(brand_id, run_id))
+    
     def calculate_avg_rank(self, brand_id: int, run_id: int) -> float:
-        ranks = []
-        
-        prompts = self.db.query(Prompt).filter(Prompt.run_id == run_id).all()
-        for prompt in prompts:
-            completions = self.db.query(Completion).filter(
-                Completion.prompt_id == prompt.id
-            ).all()
-            
-            for completion in completions:
-                mention = self.db.query(Mention).join(Entity).filter(
-                    Mention.completion_id == completion.id,
-                    Entity.canonical_id == brand_id,
-                    Mention.rank_pos.isnot(None)
-                ).first()
-                
-                if mention:
-                    ranks.append(mention.rank_pos)
-        
-        return np.mean(ranks) if ranks else float('inf')
+        return self._avg_rank(self._aggregate(brand_id, run_id))
     
     def calculate_weighted_score(
         self, 
@@ -80,7 +127,7 @@ class Scorer:
             return 0.0, 0.0
         
         p_hat = successes / trials
-        z = stats.norm.ppf((1 + confidence) / 2)
+        z = _z_score(confidence)
         
         denominator = 1 + z**2 / trials
         center = (p_hat + z**2 / (2 * trials)) / denominator
@@ -89,51 +136,12 @@ class Scorer:
         return max(0, center - margin), min(1, center + margin)
     
     def calculate_stability(self, brand_id: int, run_id: int) -> float:
-        mention_rates = []
-        
-        prompts = self.db.query(Prompt).filter(Prompt.run_id == run_id).all()
-        grouped_prompts = {}
-        for prompt in prompts:
-            key = prompt.input_text
-            if key not in grouped_prompts:
-                grouped_prompts[key] = []
-            grouped_prompts[key].append(prompt)
-        
-        for prompt_group in grouped_prompts.values():
-            group_mentions = 0
-            group_total = 0
-            
-            for prompt in prompt_group:
-                completions = self.db.query(Completion).filter(
-                    Completion.prompt_id == prompt.id
-                ).all()
-                
-                for completion in completions:
-                    group_total += 1
-                    has_mention = self.db.query(Mention).join(Entity).filter(
-                        Mention.completion_id == completion.id,
-                        Entity.canonical_id == brand_id
-                    ).first() is not None
-                    
-                    if has_mention:
-                        group_mentions += 1
-            
-            if group_total > 0:
-                mention_rates.append(group_mentions / group_total)
-        
-        if len(mention_rates) < 2:
-            return 1.0
-        
-        mean_rate = np.mean(mention_rates)
-        if mean_rate == 0:
-            return 1.0
-        
-        cv = np.std(mention_rates) / mean_rate
-        return 1 - min(cv, 1)
+        return self._stability(self._aggregate(brand_id, run_id))
     
     def save_metrics(self, run_id: int, brand_id: int, concept_id: Optional[int] = None):
-        mention_rate, ci_low, ci_high = self.calculate_mention_rate(brand_id, run_id)
-        avg_rank = self.calculate_avg_rank(brand_id, run_id)
+        agg = self._aggregate(brand_id, run_id)
+        mention_rate, ci_low, ci_high = self._mention_rate(agg)
+        avg_rank = self._avg_rank(agg)
         weighted_score = self.calculate_weighted_score(mention_rate, avg_rank)
         
         metric = Metric(
@@ -150,4 +158,31 @@ class Scorer:
         self.db.add(metric)
         self.db.commit()
         
-        return metric
\ No newline at end of file
+        return metric
+    
+    def save_metrics_bulk(self, run_id: int, brand_ids: List[int], concept_id: Optional[int] = None) -> List[Metric]:
+        aggs = [self._aggregate(brand_id, run_id) for brand_id in brand_ids]
+        mentions = np.array([agg["mentions"] for agg in aggs], dtype=np.int64)
+        completions = np.array([agg["completions"] for agg in aggs], dtype=np.int64)
+        ci_low, ci_high = wilson_ci_vec(mentions, completions)
+        mention_rates = mentions / np.where(completions > 0, completions, 1)
+        
+        metrics = []
+        for i, (brand_id, agg) in enumerate(zip(brand_ids, aggs)):
+            avg_rank = self._avg_rank(agg)
+            mention_rate = float(mention_rates[i])
+            metrics.append(Metric(
+                run_id=run_id,
+                brand_id=brand_id,
+                concept_id=concept_id,
+                mention_rate=mention_rate,
+                avg_rank=avg_rank if avg_rank != float('inf') else None,
+                weighted_score=self.calculate_weighted_score(mention_rate, avg_rank),
+                ci_low=float(ci_low[i]),
+                ci_high=float(ci_high[i])
+            ))
+        
+        self.db.add_all(metrics)
+        self.db.commit()
+        
+        return metrics
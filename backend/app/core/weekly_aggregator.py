@@ -1,169 +1,305 @@
-from datetime import datetime, timedelta, date
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, date, timezone
+from typing import Dict, List, Optional
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from collections import defaultdict
+from sqlalchemy import func, and_, or_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from app.database import SessionLocal
 from app.models import (
-    Brand, TrackedPhrase, WeeklyMetric, PhraseResult,
+    Brand, TrackedPhrase, WeeklyMetric,
     Entity, Mention, Completion, Prompt, Run
 )
 
+# Aggregated rows fetched (and upserted) per round-trip
+STREAM_BATCH_SIZE = 1000
+
+# Concurrent brand aggregations; stays within the engine's pool_size
+AGGREGATION_WORKERS = 5
+
+# E→B aggregation: expand each result's brands_found with its 1-based
+# position, resolve names through brand_map (exact lowercase name, else
+# alias; one brand per key, names first), then count and average positions
+# per (phrase, week, competitor). brands_found/aliases are JSON columns, so
+# the expansion differs per dialect.
+PHRASE_METRICS_SQL = {
+    "postgresql": """
+        WITH candidates AS (
+            SELECT id, lower(name) AS key, 0 AS priority FROM brands
+            UNION ALL
+            SELECT b.id, lower(a.value), 1
+            FROM brands b
+            CROSS JOIN LATERAL json_array_elements_text(
+                CASE WHEN json_typeof(b.aliases) = 'array' THEN b.aliases ELSE '[]'::json END
+            ) AS a(value)
+        ), brand_map AS (
+            SELECT key, id FROM (
+                SELECT key, id, ROW_NUMBER() OVER (PARTITION BY key ORDER BY priority, id) AS rn
+                FROM candidates
+            ) ranked WHERE rn = 1
+        )
+        SELECT pr.tracked_phrase_id, date_trunc('week', pr.created_at) AS week,
+               bm.id AS competitor_id, COUNT(*) AS frequency, AVG(t.ord) AS avg_position
+        FROM phrase_results pr
+        JOIN tracked_phrases tp ON tp.id = pr.tracked_phrase_id
+        CROSS JOIN LATERAL json_array_elements_text(
+            CASE WHEN json_typeof(pr.brands_found) = 'array' THEN pr.brands_found ELSE '[]'::json END
+        ) WITH ORDINALITY AS t(brand_name, ord)
+        JOIN brand_map bm ON bm.key = lower(t.brand_name)
+        WHERE tp.brand_id = :brand_id AND tp.is_active AND pr.created_at >= :start_date
+        GROUP BY 1, 2, 3
+    """,
+    "sqlite": """
+        WITH candidates AS (
+            SELECT id, lower(name) AS key, 0 AS priority FROM brands
+            UNION ALL
+            SELECT b.id, lower(a.value), 1
+            FROM brands b, json_each(CASE WHEN json_type(b.aliases) = 'array' THEN b.aliases ELSE '[]' END) a
+        ), brand_map AS (
+            SELECT key, id FROM (
+                SELECT key, id, ROW_NUMBER() OVER (PARTITION BY key ORDER BY priority, id) AS rn
+                FROM candidates
+            ) WHERE rn = 1
+        )
+        SELECT pr.tracked_phrase_id, date(pr.created_at, 'weekday 0', '-6 days') AS week,
+               bm.id AS competitor_id, COUNT(*) AS frequency, AVG(t.key + 1) AS avg_position
+        FROM phrase_results pr
+        JOIN tracked_phrases tp ON tp.id = pr.tracked_phrase_id
+        JOIN json_each(CASE WHEN json_type(pr.brands_found) = 'array' THEN pr.brands_found ELSE '[]' END) t
+        JOIN brand_map bm ON bm.key = lower(t.value)
+        WHERE tp.brand_id = :brand_id AND tp.is_active AND pr.created_at >= :start_date
+        GROUP BY 1, 2, 3
+    """
+}
+
+# Postgres-only rollups behind the dashboard "top" reads, refreshed after
+# each aggregation (create them with migrate_top_metrics_views.py). The
+# brands view keeps rank sum/count rather than an average so per-phrase rows
+# can be recombined exactly for any set of active phrases.
+TOP_METRICS_VIEWS = {
+    "mv_top_entities_by_brand": """
+        SELECT wm.brand_id, wm.entity_id, e.label,
+               SUM(wm.entity_frequency) AS total_frequency,
+               AVG(wm.entity_rank) AS avg_position
+        FROM weekly_metrics wm
+        JOIN entities e ON e.id = wm.entity_id
+        WHERE wm.entity_frequency IS NOT NULL
+        GROUP BY wm.brand_id, wm.entity_id, e.label
+    """,
+    "mv_top_brands_by_phrase": """
+        SELECT wm.tracked_phrase_id, wm.competitor_brand_id, b.name,
+               SUM(wm.frequency) AS total_frequency,
+               SUM(wm.rank_position) AS rank_sum,
+               COUNT(wm.rank_position) AS rank_count
+        FROM weekly_metrics wm
+        JOIN brands b ON b.id = wm.competitor_brand_id
+        WHERE wm.tracked_phrase_id IS NOT NULL
+        GROUP BY wm.tracked_phrase_id, wm.competitor_brand_id, b.name
+    """
+}
+
+# Unique keys, required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+TOP_METRICS_VIEW_KEYS = {
+    "mv_top_entities_by_brand": ("brand_id", "entity_id"),
+    "mv_top_brands_by_phrase": ("tracked_phrase_id", "competitor_brand_id")
+}
+
+# Ordered covering indexes for the per-brand top-N reads
+TOP_METRICS_VIEW_INDEXES = {
+    "mv_top_entities_by_brand": "(brand_id, total_frequency DESC) INCLUDE (label, avg_position)"
+}
+
+TOP_ENTITIES_VIEW_SQL = """
+    SELECT label, total_frequency::bigint AS total_frequency, avg_position::float AS avg_position
+    FROM mv_top_entities_by_brand
+    WHERE brand_id = :brand_id
+    ORDER BY total_frequency DESC
+    LIMIT :limit
+"""
+
+TOP_BRANDS_VIEW_SQL = """
+    SELECT mv.name,
+           SUM(mv.total_frequency)::bigint AS total_frequency,
+           (SUM(mv.rank_sum)::float / NULLIF(SUM(mv.rank_count), 0)) AS avg_position
+    FROM mv_top_brands_by_phrase mv
+    JOIN tracked_phrases tp ON tp.id = mv.tracked_phrase_id
+    WHERE tp.brand_id = :brand_id AND tp.is_active
+    GROUP BY mv.competitor_brand_id, mv.name
+    ORDER BY SUM(mv.total_frequency) DESC
+    LIMIT :limit
+"""
+
+# Set of TOP_METRICS_VIEWS present in the database, looked up once per process
+_top_metrics_views = None
+
 class WeeklyAggregator:
     """Aggregates metrics into weekly summaries for trend tracking"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, as_of: Optional[datetime] = None):
         self.db = db
+        # One "now" for every aggregation on this instance (pass as_of to backfill)
+        self._as_of = as_of or datetime.now(timezone.utc)
     
     def get_week_start(self, date_obj: date) -> date:
         """Get the Monday of the week for a given date"""
-        days_since_monday = date_obj.weekday()
-        return date_obj - timedelta(days=days_since_monday)
+        return date.fromordinal(date_obj.toordinal() - date_obj.weekday())
+    
+    def week_bucket(self, column):
+        """SQL expression for the Monday of column's week"""
+        if self.db.bind.dialect.name == "postgresql":
+            return func.date_trunc("week", column)
+        # SQLite: forward to Sunday (same day if already Sunday), back to its Monday
+        return func.date(column, "weekday 0", "-6 days")
+    
+    def as_week_start(self, value) -> date:
+        """Normalize a week_bucket value (timestamp or ISO string) to a date"""
+        # Already a Monday - the bucketing happened in SQL
+        if isinstance(value, str):
+            return date.fromisoformat(value[:10])
+        if isinstance(value, datetime):
+            return value.date()
+        return value
     
-    def aggregate_phrase_metrics(self, brand_id: int, weeks_back: int = 8):
-        """Aggregate E→B metrics for tracked phrases"""
-        end_date = datetime.now().date()
+    def aggregate_phrase_metrics(self, brand_id: int, weeks_back: int = 8, refresh_views: bool = True) -> int:
+        """Aggregate E→B metrics for tracked phrases, returns the rows written"""
+        end_date = self._as_of.date()
         start_date = end_date - timedelta(weeks=weeks_back * 7)
         
-        # Get tracked phrases
-        phrases = self.db.query(TrackedPhrase).filter(
-            TrackedPhrase.brand_id == brand_id,
-            TrackedPhrase.is_active == True
-        ).all()
+        # Frequency and average position per (phrase, week, competitor), all in
+        # SQL; streamed so only one batch of rows is held in Python at a time
+        metrics = self.db.execute(
+            text(PHRASE_METRICS_SQL[self.db.bind.dialect.name]),
+            {"brand_id": brand_id, "start_date": start_date},
+            execution_options={"yield_per": STREAM_BATCH_SIZE}
+        )
         
-        for phrase in phrases:
-            # Get all phrase results within date range
-            results = self.db.query(PhraseResult).filter(
-                PhraseResult.tracked_phrase_id == phrase.id,
-                PhraseResult.created_at >= start_date
-            ).all()
-            
-            # Group by week and brand
-            weekly_data = defaultdict(lambda: defaultdict(list))
-            
-            for result in results:
-                week_start = self.get_week_start(result.created_at.date())
-                
-                # Process each brand found
-                for i, brand_name in enumerate(result.brands_found or [], 1):
-                    # Try to match to existing brand
-                    competitor = self.db.query(Brand).filter(
-                        func.lower(Brand.name) == func.lower(brand_name)
-                    ).first()
-                    
-                    if not competitor:
-                        # Check aliases
-                        competitor = self.db.query(Brand).filter(
-                            func.lower(func.unnest(Brand.aliases)).contains(func.lower(brand_name))
-                        ).first()
-                    
-                    if competitor:
-                        weekly_data[week_start][competitor.id].append(i)
+        written = 0
+        for batch in metrics.partitions(STREAM_BATCH_SIZE):
+            scores = self.calculate_weighted_scores(
+                [row[3] for row in batch], [row[4] for row in batch]
+            )
+            rows = []
+            for (phrase_id, week, competitor_id, frequency, avg_position), score in zip(batch, scores):
+                rows.append({
+                    "brand_id": brand_id,
+                    "tracked_phrase_id": phrase_id,
+                    "competitor_brand_id": competitor_id,
+                    "week_starting": self.as_week_start(week),
+                    "frequency": frequency,
+                    "rank_position": int(avg_position),
+                    "weighted_score": score
+                })
             
-            # Create or update weekly metrics
-            for week_start, brands_data in weekly_data.items():
-                for competitor_id, positions in brands_data.items():
-                    # Calculate metrics
-                    frequency = len(positions)
-                    avg_position = sum(positions) / len(positions)
-                    weighted_score = self.calculate_weighted_score(frequency, avg_position)
-                    
-                    # Check if metric exists
-                    metric = self.db.query(WeeklyMetric).filter(
-                        WeeklyMetric.brand_id == brand_id,
-                        WeeklyMetric.tracked_phrase_id == phrase.id,
-                        WeeklyMetric.competitor_brand_id == competitor_id,
-                        WeeklyMetric.week_starting == week_start
-                    ).first()
-                    
-                    if metric:
-                        # Update existing
-                        metric.frequency = frequency
-                        metric.rank_position = int(avg_position)
-                        metric.weighted_score = weighted_score
-                    else:
-                        # Create new
-                        metric = WeeklyMetric(
-                            brand_id=brand_id,
-                            tracked_phrase_id=phrase.id,
-                            competitor_brand_id=competitor_id,
-                            week_starting=week_start,
-                            frequency=frequency,
-                            rank_position=int(avg_position),
-                            weighted_score=weighted_score
-                        )
-                        self.db.add(metric)
+            # Create or update the whole batch at once
+            self.upsert_weekly_metrics(
+                rows,
+                index_elements=["brand_id", "tracked_phrase_id", "competitor_brand_id", "week_starting"],
+                index_where=WeeklyMetric.competitor_brand_id.isnot(None),
+                update_columns=["frequency", "rank_position", "weighted_score"]
+            )
+            written += len(rows)
         
+        # Dormant phrases / no results in the window: nothing to commit or refresh
+        if not written:
+            return 0
         self.db.commit()
+        
+        if refresh_views:
+            self.refresh_top_metrics_view("mv_top_brands_by_phrase")
+        return written
     
     def aggregate_brand_associations(self, brand_id: int, weeks_back: int = 8):
         """Aggregate B→E metrics for brand associations"""
-        end_date = datetime.now().date()
+        end_date = self._as_of.date()
         start_date = end_date - timedelta(weeks=weeks_back * 7)
         
-        brand = self.db.query(Brand).filter(Brand.id == brand_id).first()
+        # Served from the session's identity map when already loaded
+        brand = self.db.get(Brand, brand_id)
         if not brand:
             return
         
-        # Get all runs for this brand within date range
-        runs = self.db.query(Run).filter(
+        # Mentions of other entities in this brand's runs, counted per week in SQL
+        week = self.week_bucket(Run.started_at)
+        counts = self.db.query(
+            week.label("week"),
+            Entity.id.label("entity_id"),
+            func.count().label("frequency")
+        ).select_from(Mention).join(
+            Entity, Mention.entity_id == Entity.id
+        ).join(
+            Completion, Mention.completion_id == Completion.id
+        ).join(
+            Prompt, Completion.prompt_id == Prompt.id
+        ).join(
+            Run, Prompt.run_id == Run.id
+        ).filter(
             Run.brand_id == brand_id,
-            Run.started_at >= start_date
-        ).all()
-        
-        # Group entities by week
-        weekly_entities = defaultdict(lambda: defaultdict(int))
-        
-        for run in runs:
-            # Get all mentions from this run
-            mentions = self.db.query(
-                Mention,
-                Entity,
-                Completion,
-                Prompt
-            ).join(
-                Entity, Mention.entity_id == Entity.id
-            ).join(
-                Completion, Mention.completion_id == Completion.id
-            ).join(
-                Prompt, Completion.prompt_id == Prompt.id
-            ).filter(
-                Prompt.run_id == run.id
-            ).all()
-            
-            week_start = self.get_week_start(run.started_at.date())
-            
-            for mention, entity, completion, prompt in mentions:
-                # Skip if it's the brand itself
-                if entity.canonical_id == brand_id:
-                    continue
-                
-                weekly_entities[week_start][entity.id] += 1
-        
-        # Create or update weekly metrics
-        for week_start, entities_data in weekly_entities.items():
-            for entity_id, frequency in entities_data.items():
-                # Check if metric exists
-                metric = self.db.query(WeeklyMetric).filter(
-                    WeeklyMetric.brand_id == brand_id,
-                    WeeklyMetric.entity_id == entity_id,
-                    WeeklyMetric.week_starting == week_start,
-                    WeeklyMetric.tracked_phrase_id.is_(None)
-                ).first()
-                
-                if metric:
-                    metric.entity_frequency = frequency
-                else:
-                    metric = WeeklyMetric(
-                        brand_id=brand_id,
-                        entity_id=entity_id,
-                        week_starting=week_start,
-                        entity_frequency=frequency
-                    )
-                    self.db.add(metric)
+            Run.started_at >= start_date,
+            # Skip the brand itself
+            or_(Entity.canonical_id.is_(None), Entity.canonical_id != brand_id)
+        ).group_by(week, Entity.id).all()
+        if not counts:
+            return
         
+        # Create or update weekly metrics in one statement
+        rows = [
+            {
+                "brand_id": brand_id,
+                "entity_id": entity_id,
+                "week_starting": self.as_week_start(week_start),
+                "entity_frequency": frequency
+            }
+            for week_start, entity_id, frequency in counts
+        ]
+        self.upsert_weekly_metrics(
+            rows,
+            index_elements=["brand_id", "entity_id", "week_starting"],
+            index_where=and_(WeeklyMetric.tracked_phrase_id.is_(None), WeeklyMetric.entity_id.isnot(None)),
+            update_columns=["entity_frequency"]
+        )
+        self.db.commit()
+        self.refresh_top_metrics_view("mv_top_entities_by_brand")
+    
+    def top_metrics_views(self) -> set:
+        """Names of the TOP_METRICS_VIEWS that exist (always empty off Postgres)"""
+        global _top_metrics_views
+        if self.db.bind.dialect.name != "postgresql":
+            return set()
+        if _top_metrics_views is None:
+            _top_metrics_views = set(self.db.execute(
+                text("SELECT matviewname FROM pg_matviews WHERE matviewname = ANY(:names)"),
+                {"names": list(TOP_METRICS_VIEWS)}
+            ).scalars())
+        return _top_metrics_views
+    
+    def refresh_top_metrics_view(self, name: str):
+        """Recompute one rollup without blocking readers, then commit"""
+        if name not in self.top_metrics_views():
+            return
+        self.db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
         self.db.commit()
     
+    def upsert_weekly_metrics(self, rows: List[Dict], index_elements: List[str], index_where, update_columns: List[str]):
+        """
+        INSERT ... ON CONFLICT DO UPDATE against one of the partial unique
+        indexes on weekly_metrics (ux_weekly_metric_phrase_key / _entity_key)
+        """
+        if not rows:
+            return
+        # Rows go in as executemany parameters rather than inline VALUES, so the
+        # statement is the same on every call and compiles once into
+        # SQLAlchemy's statement cache; the driver layer pages the batch
+        insert = pg_insert if self.db.bind.dialect.name == "postgresql" else sqlite_insert
+        stmt = insert(WeeklyMetric)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            index_where=index_where,
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+        self.db.execute(stmt, rows)
+    
     def calculate_weighted_score(
         self, 
         frequency: int, 
@@ -183,12 +319,32 @@ class WeeklyAggregator:
         # Combined weighted score (0-1 scale, multiply by 100 for percentage)
         return freq_weight * pos_weight
     
+    def calculate_weighted_scores(
+        self,
+        frequencies: List[int],
+        avg_positions: List[float],
+        max_position: int = 10
+    ) -> List[float]:
+        """calculate_weighted_score over whole columns at once"""
+        freq = np.asarray(frequencies, dtype=np.float64)
+        pos = np.asarray(avg_positions, dtype=np.float64)
+        pos_weight = np.maximum(0.0, 1 - (pos - 1) / max_position)
+        freq_weight = np.minimum(freq / 10, 1.0)
+        scores = np.where(pos > max_position, 0.0, freq_weight * pos_weight)
+        return scores.tolist()
+    
     def get_top_entities_for_brand(
         self, 
         brand_id: int, 
         limit: int = 20
     ) -> List[Dict]:
         """Get top entities associated with a brand (B→E)"""
+        if "mv_top_entities_by_brand" in self.top_metrics_views():
+            results = self.db.execute(
+                text(TOP_ENTITIES_VIEW_SQL), {"brand_id": brand_id, "limit": limit}
+            ).all()
+            return self._top_rows(results, "entity")
+        
         # Get aggregated entity frequencies
         results = self.db.query(
             Entity.label,
@@ -205,21 +361,7 @@ class WeeklyAggregator:
             func.sum(WeeklyMetric.entity_frequency).desc()
         ).limit(limit).all()
         
-        entities = []
-        for result in results:
-            weighted_score = self.calculate_weighted_score(
-                result.total_frequency,
-                result.avg_position or 5.0
-            )
-            
-            entities.append({
-                "entity": result.label,
-                "frequency": result.total_frequency,
-                "avg_position": round(result.avg_position, 2) if result.avg_position else None,
-                "weighted_score": round(weighted_score, 3)
-            })
-        
-        return entities
+        return self._top_rows(results, "entity")
     
     def get_top_brands_for_phrases(
         self, 
@@ -227,6 +369,12 @@ class WeeklyAggregator:
         limit: int = 20
     ) -> List[Dict]:
         """Get top brands appearing for tracked phrases (E→B)"""
+        if "mv_top_brands_by_phrase" in self.top_metrics_views():
+            results = self.db.execute(
+                text(TOP_BRANDS_VIEW_SQL), {"brand_id": brand_id, "limit": limit}
+            ).all()
+            return self._top_rows(results, "brand")
+        
         # Get all tracked phrases for this brand
         phrase_ids = self.db.query(TrackedPhrase.id).filter(
             TrackedPhrase.brand_id == brand_id,
@@ -248,18 +396,55 @@ class WeeklyAggregator:
             func.sum(WeeklyMetric.frequency).desc()
         ).limit(limit).all()
         
-        brands = []
-        for result in results:
-            weighted_score = self.calculate_weighted_score(
-                result.total_frequency,
-                result.avg_position or 5.0
-            )
-            
-            brands.append({
-                "brand": result.name,
-                "frequency": result.total_frequency,
-                "avg_position": round(result.avg_position, 2) if result.avg_position else None,
-                "weighted_score": round(weighted_score, 3)
-            })
+        return self._top_rows(results, "brand")
+    
+    def _top_rows(self, results, key: str) -> List[Dict]:
+        """Shape (name, total_frequency, avg_position) rows for the dashboard"""
+        scores = self.calculate_weighted_scores(
+            [row[1] for row in results],
+            [row[2] or 5.0 for row in results]
+        )
         
-        return brands
\ No newline at end of file
+        return [
+            {
+                key: name,
+                "frequency": total_frequency,
+                "avg_position": round(avg_position, 2) if avg_position else None,
+                "weighted_score": round(weighted_score, 3)
+            }
+            for (name, total_frequency, avg_position), weighted_score in zip(results, scores)
+        ]
+
+def _aggregate_brand_phrases(brand_id: int, weeks_back: int, as_of: datetime) -> int:
+    # Sessions are not thread-safe, so every worker opens its own
+    db = SessionLocal()
+    try:
+        return WeeklyAggregator(db, as_of).aggregate_phrase_metrics(brand_id, weeks_back, refresh_views=False)
+    finally:
+        db.close()
+
+def aggregate_phrase_metrics_for_brands(
+    brand_ids: List[int],
+    weeks_back: int = 8,
+    max_workers: int = AGGREGATION_WORKERS,
+    as_of: Optional[datetime] = None
+):
+    """Run aggregate_phrase_metrics for several brands concurrently"""
+    # Every brand sees the same window
+    as_of = as_of or datetime.now(timezone.utc)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_aggregate_brand_phrases, brand_id, weeks_back, as_of)
+            for brand_id in brand_ids
+        ]
+        # Surface the first worker error, if any
+        written = sum(future.result() for future in futures)
+    if not written:
+        return
+    
+    # One rollup refresh for the whole batch instead of one per brand
+    db = SessionLocal()
+    try:
+        WeeklyAggregator(db).refresh_top_metrics_view("mv_top_brands_by_phrase")
+    finally:
+        db.close()
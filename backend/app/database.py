@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -8,10 +12,74 @@ from app.config import settings
 database_url = settings.database_url
 if database_url.startswith("postgres://"):
     database_url = database_url.replace("postgres://", "postgresql://", 1)
+db_url = make_url(database_url)
+
+# Async driver per backend, for async handlers (see async_url_for)
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
 
-engine = create_engine(database_url)
+def async_url_for(url: URL) -> Optional[URL]:
+    """
+    The same database through its async driver: postgresql[+psycopg2] ->
+    postgresql+asyncpg, sqlite[+pysqlite] -> sqlite+aiosqlite. URLs already
+    naming an async driver are returned as-is; other backends give None.
+    """
+    if url.get_dialect().is_async:
+        return url
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        return None
+    async_url = url.set(drivername=f"{url.get_backend_name()}+{driver}")
+    if driver == "asyncpg" and "sslmode" in url.query:
+        # asyncpg spells libpq's sslmode as ssl
+        async_url = async_url.difference_update_query(["sslmode"]).update_query_dict({"ssl": url.query["sslmode"]})
+    return async_url
+
+if db_url.get_backend_name() == "postgresql" and db_url.get_driver_name() == "psycopg2":
+    # psycopg2: INSERT executemany goes out as multi-row VALUES pages and
+    # UPDATE/DELETE executemany through execute_batch, instead of a
+    # round-trip per row
+    engine = create_engine(
+        database_url,
+        executemany_mode="values_plus_batch",
+        insertmanyvalues_page_size=1000,
+        executemany_batch_page_size=500,
+        pool_size=5,
+        max_overflow=10,
+        pool_pre_ping=True,
+        # Recycle before server/proxy idle timeouts; LIFO keeps the few hot
+        # connections in use and lets the rest go idle
+        pool_recycle=1800,
+        pool_use_lifo=True
+    )
+else:
+    engine = create_engine(database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for handlers that should not hold a threadpool worker on DB I/O
+async_database_url = async_url_for(db_url)
+if async_database_url is not None:
+    async_engine = create_async_engine(async_database_url)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+else:
+    # Sync sessions still work; only the async handlers fail, when used
+    async_engine = None
+    
+    def AsyncSessionLocal():
+        raise RuntimeError(f"No async driver for {db_url.drivername} URLs; async endpoints need postgresql or sqlite")
+
+def _sqlite_wal(dbapi_connection, connection_record):
+    # Writers append to the WAL instead of rewriting pages in place, and
+    # readers are not blocked while a write is in progress
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+if db_url.get_backend_name() == "sqlite":
+    event.listen(engine, "connect", _sqlite_wal)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "connect", _sqlite_wal)
+
 Base = declarative_base()
 
 def get_db():
@@ -19,4 +87,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -14,12 +14,17 @@ Now also:
 
 from __future__ import annotations
 from typing import Optional, Literal, Dict, Any, List, Tuple
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from functools import lru_cache
+from datetime import date
 import re, time, os, hashlib
 
 GroundingMode = Literal["UNGROUNDED", "PREFERRED", "REQUIRED"]
 _GPT5_ALIAS_RE = re.compile(r"^gpt-5", re.I)   # broadened matcher
 
+# Pinned tool list so every grounded call sends a byte-identical prefix (prompt caching)
+_WEB_SEARCH_TOOLS = [{"type": "web_search"}]
+
 # NEW: minimal search-first directive for GPT-5 + tools
 _SEARCH_FIRST_DIRECTIVE = (
     "Policy for stable facts: When a hosted web_search tool is available, "
@@ -27,19 +32,27 @@ _SEARCH_FIRST_DIRECTIVE = (
     "After the tool call, answer concisely (max 2 sentences) and include one official citation."
 )
 
+@lru_cache(maxsize=32)
 def _is_gpt5(model: str) -> bool:
     return bool(_GPT5_ALIAS_RE.search(model or ""))
 
-def _today_iso() -> str:
-    from datetime import date
-    return date.today().isoformat()
+@lru_cache(maxsize=32)
+def _system_for_gpt5(system: str) -> str:
+    # Search-first directive ahead of the caller's system text
+    return (_SEARCH_FIRST_DIRECTIVE + ("\n\n" + system if system else "")).strip()
 
-def _default_provoker() -> str:
-    return (f"As of {_today_iso()}, include a citation to an official source "
+@lru_cache(maxsize=1)
+def _provoker_for(day_ordinal: int) -> str:
+    # One string per day: identical provoker bytes for every call that day
+    return (f"As of {date.fromordinal(day_ordinal).isoformat()}, include a citation to an official source "
             f"(e.g., government or standards body) with a working link.")
 
+def _default_provoker() -> str:
+    return _provoker_for(date.today().toordinal())
+
 def _hash_text(s: str) -> str:
-    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:8]
+    # 4-byte digest -> 8 hex chars, no truncation needed
+    return hashlib.blake2b(s.encode("utf-8"), digest_size=4).hexdigest()
 
 def _build_messages(system: Optional[str], als: Optional[str], prompt: str, provoker: Optional[str]) -> List[Dict[str, str]]:
     msgs: List[Dict[str, str]] = []
@@ -59,25 +72,32 @@ def _extract_output(resp: Any) -> List[Any]:
         return out if isinstance(out, list) else []
     return []
 
+_SEARCH_OK_STATUSES = frozenset((None, "ok", "success", "succeeded"))
+
+def _field(o: Any, key: str) -> Any:
+    # SDK output items are pydantic models; raw HTTP items are already dicts
+    return o.get(key) if isinstance(o, dict) else getattr(o, key, None)
+
 def _collect_text_and_search_calls(output_items: List[Any]) -> Dict[str, Any]:
+    # One pass, reading each item's type once; nothing is model_dump()ed
     texts: List[str] = []
-    search_calls: List[Any] = []
+    append_text = texts.append
+    tool_call_count = 0
+    has_reasoning = False
     for o in output_items:
-        typ = getattr(o, "type", None) or (isinstance(o, dict) and o.get("type"))
+        typ = _field(o, "type")
         if typ == "web_search_call":
-            status = getattr(o, "status", None) or (isinstance(o, dict) and o.get("status"))
-            if status in (None, "ok", "success", "succeeded"):
-                search_calls.append(o)
-            continue
-        if typ == "message":
-            content = getattr(o, "content", None) or (isinstance(o, dict) and o.get("content")) or []
-            for c in content:
-                ctype = getattr(c, "type", None) or (isinstance(c, dict) and c.get("type"))
-                if ctype == "output_text":
-                    txt = getattr(c, "text", None) or (isinstance(c, dict) and c.get("text"))
-                    if txt:
-                        texts.append(txt)
-    return {"texts": texts, "tool_call_count": len(search_calls)}
+            if _field(o, "status") in _SEARCH_OK_STATUSES:
+                tool_call_count += 1
+        elif typ == "message":
+            for c in _field(o, "content") or ():
+                if _field(c, "type") == "output_text":
+                    text = _field(c, "text")
+                    if text:
+                        append_text(text)
+        elif typ == "reasoning":
+            has_reasoning = True
+    return {"texts": texts, "tool_call_count": tool_call_count, "has_reasoning": has_reasoning}
 
 # NEW: robust usage extractor (captures reasoning token burn)
 def _extract_usage(resp: Any) -> Dict[str, Optional[int]]:
@@ -106,29 +126,29 @@ def _extract_usage(resp: Any) -> Dict[str, Optional[int]]:
     total_tokens  = _get(usage, "total_tokens")
     # Reasoning tokens can live under output_tokens_details.reasoning_tokens
     reasoning_tokens = _get(usage, "output_tokens_details", "reasoning_tokens")
+    # Prompt-cache hits show up as input_tokens_details.cached_tokens
+    cached_tokens = _get(usage, "input_tokens_details", "cached_tokens")
 
     return {
         "usage_input_tokens": input_tokens,
         "usage_output_tokens": output_tokens,
         "usage_total_tokens": total_tokens,
         "usage_reasoning_tokens": reasoning_tokens,
+        "usage_cached_tokens": cached_tokens,
     }
 
-def run_openai_with_grounding(
-    client: OpenAI,
+def _prepare_grounded_call(
     *,
     model: str,
     mode: GroundingMode,
     prompt: str,
-    system: Optional[str] = None,
-    als: Optional[str] = None,
-    provoker: Optional[str] = None,
-    strict_fail: bool = True,
-    # NEW: caller may override; otherwise we auto-raise for GPT-5 + tools
-    max_output_tokens: Optional[int] = None,
-    # Optional: keep reasoning low for tool runs (reduce burn)
-    reasoning_effort_for_gpt5_tools: Optional[str] = "low",
-) -> Dict[str, Any]:
+    system: Optional[str],
+    als: Optional[str],
+    provoker: Optional[str],
+    max_output_tokens: Optional[int],
+    reasoning_effort_for_gpt5_tools: Optional[str],
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Request kwargs plus the policy context _finalize_grounded_call needs"""
 
     # ---- Request policy (NO mode downgrades) ----
     tools, tool_choice, soft_required = None, None, False
@@ -139,10 +159,10 @@ def run_openai_with_grounding(
     if mode == "UNGROUNDED":
         pass
     elif mode == "PREFERRED":
-        tools = [{"type": "web_search"}]
+        tools = _WEB_SEARCH_TOOLS
         tool_choice, enforcement_mode = "auto", "none"
     else:  # REQUIRED
-        tools = [{"type": "web_search"}]
+        tools = _WEB_SEARCH_TOOLS
         if is_gpt5:
             tool_choice, soft_required, enforcement_mode = "auto", True, "soft"
         else:
@@ -161,8 +181,7 @@ def run_openai_with_grounding(
     
     if is_gpt5 and wants_tools:
         # Add search-first directive to system message for GPT-5
-        system_prefix = _SEARCH_FIRST_DIRECTIVE
-        system_final = (system_prefix + ("\n\n" + system_final if system_final else "")).strip()
+        system_final = _system_for_gpt5(system_final)
         # No user-level provoker for GPT-5
     elif soft_required:
         # Non-GPT-5 models still use provoker if soft-required
@@ -170,36 +189,53 @@ def run_openai_with_grounding(
 
     msgs = _build_messages(system=system_final, als=als, prompt=prompt, provoker=provoker_used)
 
-    # ---- Call API ----
-    def _call() -> Tuple[Any, int]:
-        t0 = time.perf_counter()
-        kwargs: Dict[str, Any] = dict(
-            model=model,
-            input=msgs,
-            tools=tools,
-            tool_choice=tool_choice,
-        )
-        # GPT-5 DOES NOT support temperature/top_p parameters - they cause 400 errors
-        # DO NOT add them for GPT-5 models
-        if effective_max_tokens is not None:
-            kwargs["max_output_tokens"] = effective_max_tokens
-        if is_gpt5 and wants_tools and reasoning_effort_for_gpt5_tools:
-            kwargs["reasoning"] = {"effort": reasoning_effort_for_gpt5_tools}
-        resp = client.responses.create(**kwargs)
-        lat_ms = int((time.perf_counter() - t0) * 1000)
-        return resp, lat_ms
-
-    resp, latency_ms = _call()
+    kwargs: Dict[str, Any] = dict(
+        model=model,
+        input=msgs,
+        tools=tools,
+        tool_choice=tool_choice,
+    )
+    # GPT-5 DOES NOT support temperature/top_p parameters - they cause 400 errors
+    # DO NOT add them for GPT-5 models
+    if effective_max_tokens is not None:
+        kwargs["max_output_tokens"] = effective_max_tokens
+    if is_gpt5 and wants_tools and reasoning_effort_for_gpt5_tools:
+        kwargs["reasoning"] = {"effort": reasoning_effort_for_gpt5_tools}
+
+    ctx = {
+        "model": model,
+        "mode": mode,
+        "wants_tools": wants_tools,
+        "soft_required": soft_required,
+        "enforcement_mode": enforcement_mode,
+        "tool_choice": tool_choice,
+        "provoker_used": provoker_used,
+        "effective_max_tokens": effective_max_tokens,
+    }
+    return kwargs, ctx
+
+def _slim_raw(resp: Any) -> Optional[Dict[str, Any]]:
+    # Response envelope without the output items (text/usage are returned parsed)
+    if hasattr(resp, "model_dump"):
+        return resp.model_dump(exclude={"output"})
+    if isinstance(resp, dict):
+        return {k: v for k, v in resp.items() if k != "output"}
+    return None
+
+def _finalize_grounded_call(
+    resp: Any, latency_ms: int, ctx: Dict[str, Any], strict_fail: bool, include_raw: bool = False
+) -> Dict[str, Any]:
+    """Parse a Responses API result and enforce the grounding invariants"""
+    mode, wants_tools, soft_required = ctx["mode"], ctx["wants_tools"], ctx["soft_required"]
+    provoker_used = ctx["provoker_used"]
+
     output_items = _extract_output(resp)
     usage_stats = _extract_usage(resp)  # NEW
     parsed = _collect_text_and_search_calls(output_items)
     texts, tool_call_count = parsed["texts"], parsed["tool_call_count"]
 
     had_message = bool(texts)
-    budget_starved = (not had_message) and any(
-        ((getattr(o, "type", None) or (isinstance(o, dict) and o.get("type"))) == "reasoning")
-        for o in output_items
-    )
+    budget_starved = (not had_message) and parsed["has_reasoning"]
 
     grounded_effective = tool_call_count > 0
     status, why_not_grounded, error_code = "ok", None, None
@@ -227,12 +263,12 @@ def run_openai_with_grounding(
 
     return {
         "status": status,
-        "model": model,
+        "model": ctx["model"],
         "requested_mode": mode,
-        "enforcement_mode": enforcement_mode,             # "hard" | "soft" | "none"
+        "enforcement_mode": ctx["enforcement_mode"],      # "hard" | "soft" | "none"
         "enforcement_passed": enforcement_passed,          # NEW: explicit enforcement check
         "soft_required": soft_required,
-        "tool_choice_sent": tool_choice,
+        "tool_choice_sent": ctx["tool_choice"],
         "tool_call_count": tool_call_count,
         "grounded_effective": grounded_effective,
         "why_not_grounded": why_not_grounded,
@@ -242,7 +278,62 @@ def run_openai_with_grounding(
         # NEW: usage / burn telemetry
         **usage_stats,
         "budget_starved": budget_starved,
-        "effective_max_output_tokens": effective_max_tokens,
+        "effective_max_output_tokens": ctx["effective_max_tokens"],
         "text": "\n\n".join([t for t in texts if t]).strip(),
-        "raw": resp,  # redact before long-term storage if needed
-    }
\ No newline at end of file
+        # Full SDK objects pin every output item in memory across batch runs
+        "raw": _slim_raw(resp) if include_raw else None,
+    }
+
+def run_openai_with_grounding(
+    client: OpenAI,
+    *,
+    model: str,
+    mode: GroundingMode,
+    prompt: str,
+    system: Optional[str] = None,
+    als: Optional[str] = None,
+    provoker: Optional[str] = None,
+    strict_fail: bool = True,
+    # NEW: caller may override; otherwise we auto-raise for GPT-5 + tools
+    max_output_tokens: Optional[int] = None,
+    # Optional: keep reasoning low for tool runs (reduce burn)
+    reasoning_effort_for_gpt5_tools: Optional[str] = "low",
+    include_raw: bool = False,
+) -> Dict[str, Any]:
+    kwargs, ctx = _prepare_grounded_call(
+        model=model, mode=mode, prompt=prompt, system=system, als=als, provoker=provoker,
+        max_output_tokens=max_output_tokens,
+        reasoning_effort_for_gpt5_tools=reasoning_effort_for_gpt5_tools,
+    )
+
+    # ---- Call API ----
+    t0 = time.monotonic_ns()
+    resp = client.responses.create(**kwargs)
+    latency_ms = (time.monotonic_ns() - t0) // 1_000_000
+    return _finalize_grounded_call(resp, latency_ms, ctx, strict_fail, include_raw)
+
+async def run_openai_with_grounding_async(
+    client: AsyncOpenAI,
+    *,
+    model: str,
+    mode: GroundingMode,
+    prompt: str,
+    system: Optional[str] = None,
+    als: Optional[str] = None,
+    provoker: Optional[str] = None,
+    strict_fail: bool = True,
+    max_output_tokens: Optional[int] = None,
+    reasoning_effort_for_gpt5_tools: Optional[str] = "low",
+    include_raw: bool = False,
+) -> Dict[str, Any]:
+    """run_openai_with_grounding on AsyncOpenAI, so callers can gather many calls"""
+    kwargs, ctx = _prepare_grounded_call(
+        model=model, mode=mode, prompt=prompt, system=system, als=als, provoker=provoker,
+        max_output_tokens=max_output_tokens,
+        reasoning_effort_for_gpt5_tools=reasoning_effort_for_gpt5_tools,
+    )
+
+    t0 = time.monotonic_ns()
+    resp = await client.responses.create(**kwargs)
+    latency_ms = (time.monotonic_ns() - t0) // 1_000_000
+    return _finalize_grounded_call(resp, latency_ms, ctx, strict_fail, include_raw)
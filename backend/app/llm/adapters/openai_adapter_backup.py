@@ -108,6 +108,14 @@ def _collect_text_and_search_calls(output_items: List[Any]) -> Dict[str, Any]:
         "citations": citations,
     }
 
+def _slim_raw(resp: Any) -> Optional[Dict[str, Any]]:
+    # Response envelope without the output items (text/usage are returned parsed)
+    if hasattr(resp, "model_dump"):
+        return resp.model_dump(exclude={"output"})
+    if isinstance(resp, dict):
+        return {k: v for k, v in resp.items() if k != "output"}
+    return None
+
 def run_openai_with_grounding(
     client: OpenAI,
     *,
@@ -121,6 +129,7 @@ def run_openai_with_grounding(
     seed: int = 42,
     temperature: float = 0.0,
     top_p: float = 1.0,
+    include_raw: bool = False,
 ) -> Dict[str, Any]:
     """
     Executes an OpenAI Responses call with grounding behavior per mode and model.
@@ -142,7 +151,7 @@ def run_openai_with_grounding(
           - enforcement_mode: "hard"|"soft"|"none"
           - enforcement_passed: bool
           - meta: Dict with additional telemetry
-          - raw: Any (original response; redact before permanent storage if needed)
+          - raw: response envelope minus output items when include_raw, else None
     """
     soft_required = False
     tools = None
@@ -180,7 +189,7 @@ def run_openai_with_grounding(
     msgs = _build_messages(system=system, als=als, prompt=prompt, provoker=final_provoker)
     
     # Start timing
-    t0 = time.perf_counter()
+    t0 = time.monotonic_ns()
     
     try:
         # Use temperature=1.0 for GPT-5 models (requirement)
@@ -197,7 +206,7 @@ def run_openai_with_grounding(
         )
         
         # Calculate latency
-        latency_ms = int((time.perf_counter() - t0) * 1000)
+        latency_ms = (time.monotonic_ns() - t0) // 1_000_000
         
         # Extract metadata
         system_fingerprint = getattr(resp, "system_fingerprint", None) or (isinstance(resp, dict) and resp.get("system_fingerprint"))
@@ -238,7 +247,7 @@ def run_openai_with_grounding(
         
     except Exception as e:
         # Error handling
-        latency_ms = int((time.perf_counter() - t0) * 1000)
+        latency_ms = (time.monotonic_ns() - t0) // 1_000_000
         
         # Classify error
         error_msg = str(e)
@@ -300,5 +309,5 @@ def run_openai_with_grounding(
             "top_p": top_p,
             "provoker_hash": provoker_hash,
         },
-        "raw": resp,  # consider redacting before persistence
+        "raw": _slim_raw(resp) if include_raw else None,
     }
\ No newline at end of file
@@ -4,14 +4,52 @@ Uses SDK with extra_body for missing features instead of raw HTTP
 Implements fail-closed semantics for grounding requirements
 """
 
+import asyncio
+import hashlib
 import json
 import time
 import logging
 import os
+import random
+import weakref
 import httpx
-from typing import Dict, Any, List, Optional
-from openai import AsyncOpenAI, OpenAI
-from .types import RunRequest, RunResult, GroundingMode
+import numpy as np
+import orjson
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, AsyncIterator, NamedTuple, Tuple, Union
+from openai import (
+    AsyncOpenAI, OpenAI, DefaultAsyncHttpxClient,
+    RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
+)
+from .openai_adapter import _is_gpt5
+from openai.types.responses import Response
+from pydantic import ValidationError
+from .types import RunRequest, RunResult, GroundingMode, structured_model_for
+
+# Optional: aiohttp transport for the async SDK client (pip install "openai[aiohttp]");
+# httpx's own async pool degrades at high concurrency
+try:
+    import httpx_aiohttp  # noqa: F401 - backs openai.DefaultAioHttpClient
+    from openai import DefaultAioHttpClient
+    AIOHTTP_TRANSPORT_AVAILABLE = True
+except ImportError:
+    AIOHTTP_TRANSPORT_AVAILABLE = False
+
+# Optional: client-side JSON Schema validation of structured output (pip install fastjsonschema);
+# without it json_valid only means "parsed"
+try:
+    import fastjsonschema
+    SCHEMA_VALIDATION_AVAILABLE = True
+except ImportError:
+    SCHEMA_VALIDATION_AVAILABLE = False
+
+# Optional: HTTP/2 for the raw /v1/responses client (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401 - enables httpx.AsyncClient(http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -22,83 +60,524 @@ RESPONSES_TEMPERATURE_DEFAULT = 0           # Deterministic for testing
 RESPONSES_TEMPERATURE_GPT5 = 1.0           # GPT-5 requirement
 RESPONSES_MAX_OUTPUT_TOKENS_GPT5_GROUNDED = 1024  # Higher budget for GPT-5 with tools
 
+# Client-side throttling of async Responses calls (stay just under the org limits)
+RESPONSES_MAX_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_MAX_REQUESTS_PER_MINUTE", "500"))
+RESPONSES_MAX_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_MAX_TOKENS_PER_MINUTE", "200000"))
+RESPONSES_MAX_CONCURRENT_REQUESTS = int(os.getenv("OPENAI_MAX_CONCURRENT_REQUESTS", "50"))
+RESPONSES_MAX_RETRIES = 5
+RESPONSES_BACKOFF_MAX_SECONDS = 60
+
+# Transient failures worth retrying; other 4xx errors are raised immediately
+RESPONSES_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+RESPONSES_RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+RESPONSES_RETRYABLE_HTTP_ERRORS = (httpx.TimeoutException, httpx.ConnectError)
+
+# Deterministic (temperature 0) ungrounded results are served from the cache
+RESPONSES_CACHE_TTL = 24 * 60 * 60
+RESPONSES_GROUNDED_CACHE_TTL = 10 * 60  # PREFERRED (web search) answers go stale sooner
+RESPONSES_CACHE_PREFIX = "openai:responses:"
+
+# Opt-in semantic cache: near-duplicate prompts (same model, mode, locale,
+# system text and schema) reuse an earlier result. Never used for REQUIRED.
+SEMANTIC_CACHE_EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = 0.97
+SEMANTIC_CACHE_MAX_ENTRIES = 1000  # per scope, oldest dropped first
+
+# Batch API jobs for non-interactive sweeps (24h window, outside the per-minute limits)
+RESPONSES_BATCH_COMPLETION_WINDOW = "24h"
+RESPONSES_BATCH_FAILED_STATUSES = ("failed", "expired", "cancelled")
+
+# Connection pool for async HTTP (SDK client and the raw /v1/responses path)
+# keepalive_expiry stays under the server's idle timeout so we never reuse a socket it is closing
+RESPONSES_HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=90.0)
+RESPONSES_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+RESPONSES_URL = "https://api.openai.com/v1/responses"
+
+# Pinned tool list: identical tools on every call keep the request prefix
+# byte-identical, so OpenAI's automatic prompt caching can reuse it
+WEB_SEARCH_TOOLS = [{"type": "web_search"}]
+
+# Appended to the user prompt when REQUIRED ran on "auto" without searching
+PROVOKER_TEMPLATE = "\n\nProvide information as of today ({today}), citing an official source URL."
+
+# GroundingMode -> run_openai_with_grounding mode string
+GROUNDING_MODE_NAMES = {
+    GroundingMode.OFF: "UNGROUNDED",
+    GroundingMode.PREFERRED: "PREFERRED",
+    GroundingMode.REQUIRED: "REQUIRED"
+}
+
+# tool_choice:"required" probe results by (model family, API key fingerprint),
+# shared by every adapter instance in the process
+_PROBE_CACHE: Dict[Tuple[str, str], bool] = {}
+
+# Minimal probe request, encoded once; only the model differs between probes
+_PROBE_MODEL_PLACEHOLDER = b'"__MODEL__"'
+_PROBE_BODY_TEMPLATE = orjson.dumps({
+    "model": "__MODEL__",
+    "input": [
+        {"role": "user", "content": [{"type": "input_text", "text": "What is today's date?"}]}
+    ],
+    "tools": WEB_SEARCH_TOOLS,
+    "tool_choice": "required",  # Test if required is supported
+    "temperature": RESPONSES_TEMPERATURE_DEFAULT,
+    "max_output_tokens": RESPONSES_MAX_OUTPUT_TOKENS_MIN  # Use minimum for probe
+})
+
+def _default_response_cache():
+    """The shared Upstash cache, or None where app.cache isn't deployed (caching is then skipped)"""
+    try:
+        from app.cache.upstash_cache import cache
+    except ImportError:
+        logger.info("app.cache not available; Responses result caching disabled")
+        return None
+    return cache
+
+def _api_key_fingerprint(api_key: Optional[str]) -> str:
+    return hashlib.blake2s((api_key or "").encode("utf-8"), digest_size=4).hexdigest()
+
+def _model_family(model_name: str) -> str:
+    # gpt-4o, gpt-4o-mini and dated gpt-4o-2024-08-06 snapshots share one probe
+    return "-".join(model_name.split("-", 2)[:2])
+
+# Pooled connections belong to the event loop that opened them, and sync
+# bridges (langchain_orchestrator_bridge) run each call on a throwaway loop,
+# so shared clients are kept per running loop rather than per process
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Optional[str], AsyncOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def _shared_async_client(api_key: Optional[str]) -> AsyncOpenAI:
+    # One AsyncOpenAI (and so one connection pool) per key on the running loop
+    clients = _ASYNC_CLIENTS.setdefault(asyncio.get_running_loop(), {})
+    if api_key not in clients:
+        http_client_cls = DefaultAioHttpClient if AIOHTTP_TRANSPORT_AVAILABLE else DefaultAsyncHttpxClient
+        clients[api_key] = AsyncOpenAI(
+            api_key=api_key,
+            http_client=http_client_cls(limits=RESPONSES_HTTP_LIMITS, timeout=RESPONSES_HTTP_TIMEOUT)
+        )
+    return clients[api_key]
+
+_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def _shared_http_client() -> httpx.AsyncClient:
+    # Keep-alive connections reused across raw Responses calls on the running
+    # loop instead of a fresh client (and TLS handshake) per request
+    loop = asyncio.get_running_loop()
+    client = _HTTP_CLIENTS.get(loop)
+    if client is None:
+        client = _HTTP_CLIENTS[loop] = httpx.AsyncClient(
+            limits=RESPONSES_HTTP_LIMITS,
+            timeout=RESPONSES_HTTP_TIMEOUT,
+            http2=HTTP2_AVAILABLE
+        )
+    return client
+
+async def aclose_shared_clients():
+    """Close the running loop's shared clients (app shutdown)"""
+    loop = asyncio.get_running_loop()
+    for client in _ASYNC_CLIENTS.pop(loop, {}).values():
+        await client.close()
+    http_client = _HTTP_CLIENTS.pop(loop, None)
+    if http_client is not None:
+        await http_client.aclose()
+
+@lru_cache(maxsize=32)
+def _schema_format_for(schema_json: str) -> Dict[str, Any]:
+    # Built once per distinct schema and shared by every request using it;
+    # the key-sorted JSON keeps extra_body byte-stable. Callers must not mutate it.
+    schema = json.loads(schema_json)
+    return {
+        "text": {
+            "format": {
+                "type": "json_schema",
+                "name": schema.get("name", "structured_output"),
+                "schema": schema.get("schema", schema),
+                "strict": schema.get("strict", True)
+            }
+        }
+    }
+
+@lru_cache(maxsize=1)
+def _provoker_for(day_ordinal: int) -> str:
+    # Formatted once per day rather than on every provoker retry
+    return PROVOKER_TEMPLATE.format(today=date.fromordinal(day_ordinal).isoformat())
+
+@lru_cache(maxsize=32)
+def _grounded_text_format(schema_bytes: bytes) -> Dict[str, Any]:
+    # text.format for the raw Responses path, built once per distinct
+    # RunRequest.schema (key-sorted JSON). Shared - callers must not mutate it.
+    schema = orjson.loads(schema_bytes)
+    schema_def = dict(schema.get("schema", schema))
+    # Ensure it's a valid JSON Schema object
+    schema_def.setdefault("type", "object")
+    schema_def.setdefault("additionalProperties", False)
+    return {
+        "format": {
+            "type": "json_schema",
+            "name": "LocaleProbe",  # name at FORMAT level (not nested under json_schema)
+            "schema": orjson.loads(orjson.dumps(schema_def, option=orjson.OPT_SORT_KEYS)),
+            "strict": schema.get("strict", True)
+        }
+    }
+
+class _OutputScan(NamedTuple):
+    """What the raw Responses path needs from a parsed response body"""
+    items: List[Dict[str, Any]]
+    text: str
+    has_message: bool
+    has_reasoning: bool
+    tool_call_count: int
+    citations: List[Dict[str, str]]
+
+class _TokenBucket:
+    """Async token bucket refilled continuously at per_minute / 60 per second"""
+    
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        # The counters are shared, but an asyncio.Lock belongs to the loop that
+        # first contends it, so each running loop gets its own
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+    
+    @property
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        return lock
+    
+    async def acquire(self, amount: float = 1):
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+    
+    def sync(self, remaining: float):
+        """Never hold more than the server says is left (x-ratelimit-remaining-*)"""
+        self.tokens = min(self.tokens, remaining)
+
+@lru_cache(maxsize=64)
+def _compile_validator(schema_json: str):
+    # fastjsonschema generates a specialised validator function once per distinct schema
+    return fastjsonschema.compile(orjson.loads(schema_json))
+
+def _schema_valid(schema_def: Dict[str, Any], obj: Any) -> bool:
+    """Whether obj satisfies schema_def (always True without fastjsonschema)"""
+    if not SCHEMA_VALIDATION_AVAILABLE:
+        return True
+    try:
+        validate = _compile_validator(orjson.dumps(schema_def, option=orjson.OPT_SORT_KEYS).decode())
+    except fastjsonschema.JsonSchemaDefinitionException as e:
+        logger.warning(f"Schema not compilable, skipping validation: {e}")
+        return True
+    try:
+        validate(obj)
+        return True
+    except fastjsonschema.JsonSchemaValueException as e:
+        logger.warning(f"JSON output does not match schema: {e.message}")
+        return False
+
+def _parse_structured(text: str, schema_def: Dict[str, Any]) -> Tuple[Any, bool]:
+    """
+    (json_obj, json_valid) for structured output. Registered schemas parse and
+    validate in one model_validate_json pass; others go through orjson and
+    _schema_valid. Raises orjson.JSONDecodeError when text isn't JSON at all.
+    """
+    model = structured_model_for(schema_def)
+    if model is not None:
+        try:
+            return model.model_validate_json(text).model_dump(), True
+        except ValidationError:
+            return orjson.loads(text), False
+    obj = orjson.loads(text)
+    return obj, _schema_valid(schema_def, obj)
+
+class _SemanticCache:
+    """In-process nearest-neighbour cache of RunResults by prompt embedding, per scope"""
+    
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._vectors: Dict[tuple, np.ndarray] = {}   # unit-length rows
+        self._results: Dict[tuple, List[RunResult]] = {}
+    
+    def lookup(self, scope: tuple, vector: np.ndarray) -> Optional[tuple]:
+        """(result, similarity) of the closest entry at or above the threshold"""
+        vectors = self._vectors.get(scope)
+        if vectors is None:
+            return None
+        similarities = vectors @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return self._results[scope][best], float(similarities[best])
+    
+    def add(self, scope: tuple, vector: np.ndarray, result: RunResult):
+        vectors = self._vectors.get(scope)
+        vectors = vector[None, :] if vectors is None else np.vstack([vectors, vector])
+        results = self._results.get(scope, []) + [result]
+        self._vectors[scope] = vectors[-self.max_entries:]
+        self._results[scope] = results[-self.max_entries:]
+
+class _LoopState(NamedTuple):
+    """Adapter state bound to one event loop (see OpenAIProductionAdapter._loop_state)"""
+    request_slots: asyncio.Semaphore
+    inflight: Dict[str, asyncio.Future]  # deterministic SDK calls on the wire, by response cache key
+
+class _ThrottledResponses:
+    """Stands in for AsyncOpenAI (client.responses.create) with the adapter's limits applied"""
+    
+    def __init__(self, adapter: "OpenAIProductionAdapter"):
+        self.responses = self
+        self._adapter = adapter
+    
+    async def create(self, **kwargs):
+        return await self._adapter._create_response(**kwargs)
+
 class OpenAIProductionAdapter:
     """
     Production adapter for OpenAI's Responses API
     Uses SDK's extra_body to work around missing text.format parameter
     """
     
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize with API key from environment or parameter"""
-        self.client = OpenAI(api_key=api_key)  # Uses OPENAI_API_KEY env var if not provided
-        self.async_client = AsyncOpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_requests_per_minute: int = RESPONSES_MAX_REQUESTS_PER_MINUTE,
+        max_tokens_per_minute: int = RESPONSES_MAX_TOKENS_PER_MINUTE,
+        max_concurrent_requests: int = RESPONSES_MAX_CONCURRENT_REQUESTS,
+        max_retries: int = RESPONSES_MAX_RETRIES,
+        semantic_cache: bool = False,
+        response_cache=None
+    ):
+        """
+        Initialize with API key from environment or parameter.
+        response_cache: async get(key) / set(key, value, ttl=) store for
+        deterministic results; defaults to the Upstash cache when deployed
+        """
+        self._client: Optional[OpenAI] = None  # sync SDK client, see client
+        self.max_retries = max_retries
+        self._async_client: Optional[AsyncOpenAI] = None  # injected client, see async_client
         self.api_key = api_key or os.environ.get('OPENAI_API_KEY')
+        self._auth_headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        # Async Responses calls go through these (see _throttled_sdk_call); the
+        # concurrency slots are per running loop, see _loop_state
+        self._max_concurrent_requests = max_concurrent_requests
+        self._loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._rpm_bucket = _TokenBucket(max_requests_per_minute)
+        self._tpm_bucket = _TokenBucket(max_tokens_per_minute)
+        self._throttled = _ThrottledResponses(self)
+        
+        self._response_cache = response_cache if response_cache is not None else _default_response_cache()
+        
+        # Near-duplicate prompt reuse for UNGROUNDED / PREFERRED runs (off by default)
+        self._semantic_cache = _SemanticCache() if semantic_cache else None
         
         # Capability flags (will be set by probe)
         self.supports_required_toolchoice = None  # Will probe on first use
     
+    @property
+    def client(self) -> OpenAI:
+        """Sync SDK client, built on first use - async-only callers never pay for it"""
+        if self._client is None:
+            # Sync calls rely on the SDK's own exponential backoff for the same errors
+            self._client = OpenAI(api_key=self.api_key, max_retries=self.max_retries)
+        return self._client
+    
+    @client.setter
+    def client(self, value: OpenAI):
+        self._client = value
+    
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """The running loop's shared AsyncOpenAI for this key, unless one was injected"""
+        if self._async_client is not None:
+            return self._async_client
+        return _shared_async_client(self.api_key)
+    
+    @async_client.setter
+    def async_client(self, value: AsyncOpenAI):
+        self._async_client = value
+    
+    def _loop_state(self) -> _LoopState:
+        """
+        Semaphore and in-flight futures for the running loop. Both bind to one
+        loop, and a long-lived adapter may be driven from a fresh loop per call
+        (langchain_orchestrator_bridge.analyze_with_orchestrator_sync)
+        """
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = self._loop_states[loop] = _LoopState(asyncio.Semaphore(self._max_concurrent_requests), {})
+        return state
+    
+    @property
+    def _request_slots(self) -> asyncio.Semaphore:
+        return self._loop_state().request_slots
+    
+    @property
+    def _inflight(self) -> Dict[str, asyncio.Future]:
+        return self._loop_state().inflight
+    
+    @staticmethod
+    def _require_no_event_loop(method: str):
+        """Blocking SDK calls on the event loop thread would stall every other request"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        raise RuntimeError(f"{method} blocks the event loop; await run_async() instead")
+    
+    @staticmethod
+    def _estimate_tokens(kwargs: Dict[str, Any]) -> int:
+        """Rough request cost for the TPM bucket: ~4 chars per input token plus the output cap"""
+        input_chars = len(json.dumps(kwargs.get("input", ""), default=str))
+        return input_chars // 4 + (kwargs.get("max_output_tokens") or RESPONSES_MAX_OUTPUT_TOKENS_DEFAULT)
+    
+    async def _create_response(self, **kwargs):
+        """async_client.responses.create under _throttled_sdk_call"""
+        return await self._throttled_sdk_call(
+            lambda: self.async_client.responses.create(**kwargs), self._estimate_tokens(kwargs)
+        )
+    
+    async def _throttled_sdk_call(self, call, est_tokens: float):
+        """
+        Await call() throttled by concurrency, RPM and TPM; 429s, 5xx,
+        timeouts and connection errors are retried with exponential backoff
+        and full jitter, up to max_retries times
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._rpm_bucket.acquire()
+            await self._tpm_bucket.acquire(est_tokens)
+            async with self._request_slots:
+                try:
+                    return await call()
+                except RESPONSES_RETRYABLE_ERRORS as e:
+                    if attempt == self.max_retries:
+                        raise
+                    error = e
+            delay = random.uniform(0, min(RESPONSES_BACKOFF_MAX_SECONDS, 2 ** attempt))
+            if isinstance(error, RateLimitError):
+                self._sync_rate_limits(error.response.headers)
+                delay = max(delay, self._retry_after(error.response.headers) or 0)
+            logger.warning(f"OpenAI {type(error).__name__}, retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    def _sync_rate_limits(self, headers):
+        """Pull the RPM/TPM buckets down to OpenAI's reported remaining quota"""
+        for bucket, header in (
+            (self._rpm_bucket, "x-ratelimit-remaining-requests"),
+            (self._tpm_bucket, "x-ratelimit-remaining-tokens")
+        ):
+            value = headers.get(header)
+            if value is not None:
+                try:
+                    bucket.sync(float(value))
+                except ValueError:
+                    pass
+    
     @staticmethod
-    def _extract_usage(response) -> Dict[str, int]:
-        """Extract usage statistics from response, handling complex objects"""
-        usage = {}
-        if hasattr(response, 'usage'):
-            usage_obj = response.usage
-            if hasattr(usage_obj, '__dict__'):
-                for key, value in usage_obj.__dict__.items():
-                    # Only include integer values, skip complex objects
-                    if isinstance(value, int):
-                        usage[key] = value
-                    elif hasattr(value, '__dict__'):
-                        # Handle nested objects like input_tokens_details
-                        for nested_key, nested_value in value.__dict__.items():
-                            if isinstance(nested_value, int):
-                                usage[f"{key}_{nested_key}"] = nested_value
-        return usage
+    def _retry_after(headers) -> Optional[float]:
+        """Seconds from a retry-after header, if present and numeric"""
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+    
+    async def _post_responses(self, body: Dict[str, Any]) -> httpx.Response:
+        """
+        POST a raw Responses body on the shared client under the same throttle as
+        _create_response. 429/5xx responses, timeouts and connection errors are
+        retried: retry-after when the server sends one, otherwise exponential
+        backoff with full jitter. Other statuses (e.g. 400) are returned as-is.
+        """
+        client = _shared_http_client()
+        # Serialized once: the same bytes are re-sent on every retry and sized
+        # for the TPM bucket (whole body, so slightly above _estimate_tokens)
+        content = orjson.dumps(body)
+        est_tokens = len(content) // 4 + (body.get("max_output_tokens") or RESPONSES_MAX_OUTPUT_TOKENS_DEFAULT)
+        for attempt in range(self.max_retries + 1):
+            await self._rpm_bucket.acquire()
+            await self._tpm_bucket.acquire(est_tokens)
+            wait = None
+            async with self._request_slots:
+                try:
+                    response = await client.post(RESPONSES_URL, headers=self._auth_headers, content=content)
+                except RESPONSES_RETRYABLE_HTTP_ERRORS as e:
+                    if attempt == self.max_retries:
+                        raise
+                    reason = type(e).__name__
+                else:
+                    logger.debug("Responses %s over %s", response.status_code, response.http_version)
+                    self._sync_rate_limits(response.headers)
+                    if response.status_code not in RESPONSES_RETRYABLE_STATUSES or attempt == self.max_retries:
+                        return response
+                    reason = f"HTTP {response.status_code}"
+                    wait = self._retry_after(response.headers)
+            delay = wait + random.uniform(0, 1) if wait is not None else random.uniform(0, min(RESPONSES_BACKOFF_MAX_SECONDS, 2 ** attempt))
+            logger.warning(f"OpenAI {reason}, retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    @classmethod
+    def _extract_usage(cls, response) -> Dict[str, int]:
+        """Flat usage for an SDK response; same shape as the HTTP path's _flatten_usage_openai"""
+        usage_obj = getattr(response, 'usage', None)
+        if usage_obj is None:
+            return {}
+        return cls._flatten_usage_openai(usage_obj if isinstance(usage_obj, dict) else usage_obj.model_dump())
     
     async def _probe_required_toolchoice(self, model_name: str = "gpt-4o") -> bool:
         """
         Probe if model supports tool_choice:"required" with web_search
-        One-time check, cached for session
+        One-time check per model family and API key, shared by every adapter in the process
         Note: GPT-5 does NOT support required, but GPT-4o does
         """
-        if self.supports_required_toolchoice is not None:
-            return self.supports_required_toolchoice
-        
         # GPT-5 models don't support tool_choice:"required" with web_search
-        if 'gpt-5' in model_name.lower():
+        is_gpt5 = _is_gpt5(model_name)
+        if is_gpt5:
             self.supports_required_toolchoice = False
             logger.info(f"GPT-5 detected, tool_choice:required not supported")
             return False
         
-        url = "https://api.openai.com/v1/responses"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        probe_key = (_model_family(model_name), _api_key_fingerprint(self.api_key))
+        if probe_key in _PROBE_CACHE:
+            self.supports_required_toolchoice = _PROBE_CACHE[probe_key]
+            return self.supports_required_toolchoice
         
-        # Minimal probe request
-        probe_body = {
-            "model": model_name,
-            "input": [
-                {"role": "user", "content": [{"type": "input_text", "text": "What is today's date?"}]}
-            ],
-            "tools": [{"type": "web_search"}],
-            "tool_choice": "required",  # Test if required is supported
-            "temperature": RESPONSES_TEMPERATURE_GPT5 if 'gpt-5' in model_name.lower() else RESPONSES_TEMPERATURE_DEFAULT,
-            "max_output_tokens": RESPONSES_MAX_OUTPUT_TOKENS_MIN  # Use minimum for probe
-        }
+        probe_body = _PROBE_BODY_TEMPLATE.replace(_PROBE_MODEL_PLACEHOLDER, orjson.dumps(model_name), 1)
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(url, headers=headers, json=probe_body)
-                # If we get 200 or even 429 (rate limit), it means syntax is valid
-                self.supports_required_toolchoice = response.status_code in (200, 429)
-                logger.info(f"Capability probe: tool_choice:required {'supported' if self.supports_required_toolchoice else 'not supported'} (status {response.status_code})")
-                print(f"[PROBE] tool_choice:required support = {self.supports_required_toolchoice} (status {response.status_code})", flush=True)
-                if response.status_code == 400:
-                    error_detail = response.text[:500]
-                    print(f"[PROBE] 400 error: {error_detail}", flush=True)
+            client = _shared_http_client()
+            # Probes count against the same limits as real calls; not retried
+            await self._rpm_bucket.acquire()
+            async with self._request_slots:
+                response = await client.post(
+                    RESPONSES_URL, headers=self._auth_headers, content=probe_body, timeout=10.0
+                )
+            self._sync_rate_limits(response.headers)
+            # If we get 200 or even 429 (rate limit), it means syntax is valid
+            self.supports_required_toolchoice = response.status_code in (200, 429)
+            _PROBE_CACHE[probe_key] = self.supports_required_toolchoice
+            logger.info(f"Capability probe: tool_choice:required {'supported' if self.supports_required_toolchoice else 'not supported'} (status {response.status_code})")
+            if response.status_code == 400:
+                logger.warning("Capability probe 400: %s", response.text[:500])
         except Exception as e:
+            # Not cached: a network blip shouldn't pin "unsupported" for the whole process
             logger.warning(f"Capability probe failed: {e}")
             self.supports_required_toolchoice = False
         
@@ -113,17 +592,14 @@ class OpenAIProductionAdapter:
         - Computes total_tokens if missing (input + output only).
         """
         out: Dict[str, int] = {}
-
-        def walk(prefix: str, val):
+        # Explicit stack rather than a recursive helper: no call per key
+        stack = list(usage_raw.items()) if isinstance(usage_raw, dict) else []
+        while stack:
+            prefix, val = stack.pop()
             if isinstance(val, (int, float)):
                 out[prefix] = int(val)
             elif isinstance(val, dict):
-                for k, v in val.items():
-                    walk(f"{prefix}_{k}" if prefix else k, v)
-
-        if isinstance(usage_raw, dict):
-            for k, v in usage_raw.items():
-                walk(k, v)
+                stack.extend((f"{prefix}_{k}", v) for k, v in val.items())
 
         # Prefer provider's rollup if present; otherwise compute a minimal one
         if "total_tokens" not in out:
@@ -177,19 +653,61 @@ class OpenAIProductionAdapter:
         
         return messages
     
+    @staticmethod
+    def _message_text(item: Dict[str, Any]) -> str:
+        """Text of a raw message item: string content or the first content part"""
+        content = item.get("content")
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list) and content:
+            first_content = content[0]
+            if isinstance(first_content, dict):
+                return first_content.get("text", "")
+            if isinstance(first_content, str):
+                return first_content
+        return ""
+    
+    @classmethod
+    def _scan_output(cls, data: Dict[str, Any]) -> _OutputScan:
+        """
+        One pass over a raw response's output items: first message text
+        (falling back to the top-level output_text), reasoning, web searches
+        and their citations
+        """
+        output_items = data.get("output", []) or []
+        text = ""
+        has_message = has_reasoning = False
+        tool_call_count = 0
+        citations = []
+        for item in output_items:
+            item_type = item.get("type") or ""
+            if item_type == "message":
+                if not has_message:
+                    text = cls._message_text(item)
+                    has_message = True
+            elif item_type == "reasoning":
+                has_reasoning = True
+            elif item_type.startswith("web_search"):
+                tool_call_count += 1
+                for citation in item.get("citations") or ():
+                    citations.append({
+                        'url': citation.get('url', ''),
+                        'title': citation.get('title', ''),
+                        'snippet': citation.get('snippet', '')
+                    })
+        return _OutputScan(
+            output_items, text or data.get("output_text", ""), has_message, has_reasoning, tool_call_count, citations
+        )
+    
+    @staticmethod
+    def _cached_tokens(usage: Dict[str, int]) -> int:
+        """Prompt tokens served from OpenAI's prefix cache (flattened usage)"""
+        return usage.get("input_tokens_details_cached_tokens", 0)
+    
     @staticmethod
     def _build_schema_format(schema: Dict[str, Any]) -> Dict[str, Any]:
         """Build text.format structure for JSON schema enforcement"""
-        return {
-            "text": {
-                "format": {
-                    "type": "json_schema",
-                    "name": schema.get("name", "structured_output"),
-                    "schema": schema.get("schema", schema),
-                    "strict": schema.get("strict", True)
-                }
-            }
-        }
+        return _schema_format_for(json.dumps(schema, sort_keys=True))
     
     async def _http_grounded_with_schema(
         self, 
@@ -199,41 +717,34 @@ class OpenAIProductionAdapter:
         Direct HTTP call to Responses API for grounded + schema requests
         Uses tool_choice:"required" to force web searches
         """
-        print(f"[DEBUG] Entered _http_grounded_with_schema", flush=True)
-        start_time = time.time()
-        
-        url = "https://api.openai.com/v1/responses"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        start_time = time.monotonic_ns()
         
         # Probe capability if needed for REQUIRED mode
         if req.grounding_mode == GroundingMode.REQUIRED:
             supports_required = await self._probe_required_toolchoice(req.model_name)
             if supports_required:
                 tool_choice = "required"
-                print(f"[INFO] Using tool_choice='required' (probe confirmed support)", flush=True)
+                logger.debug("Using tool_choice='required' (probe confirmed support)")
             else:
                 tool_choice = "auto"
-                print(f"[INFO] Using tool_choice='auto' (required not supported, will enforce after)", flush=True)
+                logger.debug("Using tool_choice='auto' (required not supported, will enforce after)")
         else:
             tool_choice = "auto"
         
         # Determine token budget based on model and mode
-        is_gpt5 = 'gpt-5' in req.model_name.lower()
+        is_gpt5 = _is_gpt5(req.model_name)
         needs_grounding = req.grounding_mode in [GroundingMode.PREFERRED, GroundingMode.REQUIRED]
         
         if is_gpt5 and needs_grounding:
             max_output_tokens = RESPONSES_MAX_OUTPUT_TOKENS_GPT5_GROUNDED  # 1024 tokens
-            print(f"[INFO] Using increased token budget for GPT-5 with grounding: {max_output_tokens} tokens", flush=True)
+            logger.debug("Using increased token budget for GPT-5 with grounding: %d tokens", max_output_tokens)
         else:
             max_output_tokens = RESPONSES_MAX_OUTPUT_TOKENS_DEFAULT  # 512 tokens
         
         body = {
             "model": req.model_name,
             "input": self._build_input_messages(req.system_text, req.als_block, req.user_prompt, use_typed_parts=True),
-            "tools": [{"type": "web_search"}],
+            "tools": WEB_SEARCH_TOOLS,
             "tool_choice": tool_choice,
             "temperature": RESPONSES_TEMPERATURE_GPT5 if is_gpt5 else (req.temperature if req.temperature is not None else RESPONSES_TEMPERATURE_DEFAULT),
             "max_output_tokens": max_output_tokens
@@ -242,180 +753,103 @@ class OpenAIProductionAdapter:
         # Add reasoning config for GPT-5 with tools to reduce token consumption
         if is_gpt5 and needs_grounding:
             body["reasoning"] = {"effort": "low"}
-            print(f"[INFO] Added reasoning effort='low' for GPT-5 with tools", flush=True)
+            logger.debug("Added reasoning effort='low' for GPT-5 with tools")
         
         # Add JSON schema if provided
         if req.schema:
-            # Extract the actual schema
-            schema_def = req.schema.get("schema", req.schema)
-            
-            # Ensure it's a valid JSON Schema object
-            if "type" not in schema_def:
-                schema_def["type"] = "object"
-            if "additionalProperties" not in schema_def:
-                schema_def["additionalProperties"] = False
-            
-            body["text"] = {
-                "format": {
-                    "type": "json_schema",
-                    "name": "LocaleProbe",  # name at FORMAT level (not nested under json_schema)
-                    "schema": schema_def,   # the JSON Schema object
-                    "strict": req.schema.get("strict", True)
-                }
-            }
+            body["text"] = _grounded_text_format(orjson.dumps(req.schema, option=orjson.OPT_SORT_KEYS))
+        
+        # Deterministic PREFERRED runs reuse a recent identical result;
+        # REQUIRED always searches afresh
+        cache_key = None
+        if (
+            self._response_cache is not None
+            and body["temperature"] == 0
+            and req.grounding_mode != GroundingMode.REQUIRED
+        ):
+            cache_key = self._grounded_cache_key(req, body["temperature"], max_output_tokens)
+            result = await self._cached_result(cache_key, req)
+            if result:
+                return result
         
         try:
             logger.info(f"HTTP Responses API call: model={req.model_name}, tool_choice={tool_choice}, mode={req.grounding_mode}")
-            print(f"[DEBUG] Making HTTP request with tool_choice={tool_choice}, grounding_mode={req.grounding_mode}", flush=True)
             
             # Make async HTTP request
-            async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
-                response = await client.post(url, headers=headers, json=body)
-                print(f"[DEBUG] HTTP response status: {response.status_code}", flush=True)
-                if response.status_code != 200:
-                    error_detail = response.text[:2000]
-                    logger.error(f"HTTP {response.status_code}: {error_detail}")
-                    print(f"[ERROR] HTTP {response.status_code}: {error_detail}", flush=True)
-                    print(f"[REQUEST BODY] {json.dumps(body)[:1000]}", flush=True)
-                    raise httpx.HTTPStatusError(f"HTTP {response.status_code}: {error_detail}", request=response.request, response=response)
-                data = response.json()
-                print(f"[DEBUG] Response data keys: {list(data.keys())}", flush=True)
+            response = await self._post_responses(body)
+            if response.status_code != 200:
+                error_detail = response.text[:2000]
+                logger.error(f"HTTP {response.status_code}: {error_detail}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Request body: %s", orjson.dumps(body)[:1000].decode(errors='ignore'))
+                raise httpx.HTTPStatusError(f"HTTP {response.status_code}: {error_detail}", request=response.request, response=response)
+            # Parsed whole: usage trails the output items and the text is
+            # schema-validated, so an incremental parse would read it all anyway.
+            # Drop the raw bytes now rather than holding them beside the tree.
+            data = orjson.loads(response.content)
+            del response
             
             # Calculate latency
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = (time.monotonic_ns() - start_time) // 1_000_000
             
             # Parse response - extract text from the message in output items
-            output_items = data.get("output", []) or []
-            output_text = ""
-            
-            # Find the message item which contains the actual response
-            for item in output_items:
-                if item.get("type") == "message":
-                    # The message item should have content
-                    content = item.get("content")
-                    if isinstance(content, str):
-                        output_text = content
-                    elif isinstance(content, list) and len(content) > 0:
-                        # If content is a list, extract text from first item
-                        first_content = content[0]
-                        if isinstance(first_content, dict):
-                            output_text = first_content.get("text", "")
-                        elif isinstance(first_content, str):
-                            output_text = first_content
-                    break
-            
-            # Fallback to checking output_text field if not found
-            if not output_text:
-                output_text = data.get("output_text", "")
-            
-            print(f"[DEBUG] Output text: {output_text[:500] if output_text else 'EMPTY'}", flush=True)
-            print(f"[DEBUG] Output items count: {len(output_items)}", flush=True)
-            if output_items:
-                print(f"[DEBUG] First few items: {json.dumps(output_items[:2], default=str)[:1000]}", flush=True)
+            scan = self._scan_output(data)
+            output_items, output_text = scan.items, scan.text
             
-            # Check for token starvation (reasoning but no message) in GPT-5
-            has_reasoning = any(item.get("type") == "reasoning" for item in output_items)
-            has_message = any(item.get("type") == "message" for item in output_items)
+            logger.debug("Output text: %s", output_text[:500] or "EMPTY")
+            logger.debug("Output items count: %d", len(output_items))
+            if output_items and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("First few items: %s", orjson.dumps(output_items[:2], default=str)[:1000].decode(errors='ignore'))
             
-            if is_gpt5 and has_reasoning and not has_message and max_output_tokens < 2048:
+            # Check for token starvation (reasoning but no message) in GPT-5
+            if is_gpt5 and scan.has_reasoning and not scan.has_message and max_output_tokens < 2048:
                 # Token starvation detected, retry with double the tokens
                 logger.warning(f"Token starvation detected (reasoning but no message), retrying with {max_output_tokens * 2} tokens")
-                print(f"[WARNING] Token starvation detected, retrying with {max_output_tokens * 2} tokens", flush=True)
-                
-                retry_body = body.copy()
-                retry_body["max_output_tokens"] = max_output_tokens * 2
                 
                 # Make second attempt with same mode/tools
-                async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
-                    retry_response = await client.post(url, headers=headers, json=retry_body)
-                    if retry_response.status_code == 200:
-                        data = retry_response.json()
-                        output_items = data.get("output", []) or []
-                        
-                        # Re-extract output text
-                        output_text = ""
-                        for item in output_items:
-                            if item.get("type") == "message":
-                                content = item.get("content")
-                                if isinstance(content, str):
-                                    output_text = content
-                                elif isinstance(content, list) and len(content) > 0:
-                                    first_content = content[0]
-                                    if isinstance(first_content, dict):
-                                        output_text = first_content.get("text", "")
-                                    elif isinstance(first_content, str):
-                                        output_text = first_content
-                                break
-                        
-                        if not output_text:
-                            output_text = data.get("output_text", "")
+                retry_response = await self._post_responses({**body, "max_output_tokens": max_output_tokens * 2})
+                if retry_response.status_code == 200:
+                    data = orjson.loads(retry_response.content)
+                    scan = self._scan_output(data)
+                    output_items, output_text = scan.items, scan.text
                         
-                        print(f"[DEBUG] After retry - Output text: {output_text[:500] if output_text else 'STILL EMPTY'}", flush=True)
-                        print(f"[DEBUG] After retry - Output items count: {len(output_items)}", flush=True)
-            
-            # Count tool calls
-            tool_call_count = sum(
-                1 for item in output_items 
-                if (item.get("type") or "").startswith("web_search")
-            )
+                    logger.debug("After retry - Output text: %s", output_text[:500] or "STILL EMPTY")
+                    logger.debug("After retry - Output items count: %d", len(output_items))
             
+            tool_call_count = scan.tool_call_count
             grounded_effective = tool_call_count > 0
             
             logger.info(f"HTTP response: tool_calls={tool_call_count}, grounded={grounded_effective}, mode={req.grounding_mode}")
             
             # Enforce REQUIRED mode - must have at least one web search
             if req.grounding_mode == GroundingMode.REQUIRED and not grounded_effective:
-                # Only retry with provoker if we had to use "auto" (required not supported)
-                if tool_choice == "auto" and not self.supports_required_toolchoice:
-                    print(f"[INFO] No search with auto, retrying with provoker prompt", flush=True)
+                # Only retry with provoker if this request had to use "auto" (required
+                # not supported). Not supports_required_toolchoice: a concurrent probe
+                # for another model family may have overwritten it meanwhile
+                if tool_choice == "auto":
+                    logger.info("No search with auto, retrying with provoker prompt")
                     
                     # Add provoker to user prompt
-                    import time as time_module
-                    provoker = f"\n\nProvide information as of today ({time_module.strftime('%Y-%m-%d')}), citing an official source URL."
-                    provoker_prompt = req.user_prompt + provoker
+                    provoker_prompt = req.user_prompt + _provoker_for(date.today().toordinal())
                     
                     # Retry with provoker
-                    retry_body = body.copy()
-                    retry_body["input"] = self._build_input_messages(
+                    retry_body = {**body, "input": self._build_input_messages(
                         req.system_text, req.als_block, provoker_prompt, use_typed_parts=True
-                    )
+                    )}
                     
-                    async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
-                        retry_response = await client.post(url, headers=headers, json=retry_body)
-                        if retry_response.status_code == 200:
-                            retry_data = retry_response.json()
-                            retry_items = retry_data.get("output", []) or []
-                            retry_tool_calls = sum(
-                                1 for item in retry_items 
-                                if (item.get("type") or "").startswith("web_search")
-                            )
+                    retry_response = await self._post_responses(retry_body)
+                    if retry_response.status_code == 200:
+                        retry_data = orjson.loads(retry_response.content)
+                        retry_scan = self._scan_output(retry_data)
                             
-                            if retry_tool_calls > 0:
-                                # Success with provoker!
-                                print(f"[INFO] Provoker triggered {retry_tool_calls} searches", flush=True)
-                                data = retry_data  # Use retry response
-                                output_items = retry_items
-                                tool_call_count = retry_tool_calls
-                                grounded_effective = True
-                                
-                                # Re-extract output text
-                                output_text = ""
-                                for item in output_items:
-                                    if item.get("type") == "message":
-                                        content = item.get("content")
-                                        if isinstance(content, str):
-                                            output_text = content
-                                        elif isinstance(content, list) and len(content) > 0:
-                                            first_content = content[0]
-                                            if isinstance(first_content, dict):
-                                                output_text = first_content.get("text", "")
-                                            elif isinstance(first_content, str):
-                                                output_text = first_content
-                                        break
-                                
-                                # Re-extract usage
-                                usage_raw = retry_data.get('usage', {}) or {}
-                                flat_usage = self._flatten_usage_openai(usage_raw)
+                        if retry_scan.tool_call_count > 0:
+                            # Success with provoker!
+                            logger.info("Provoker triggered %d searches", retry_scan.tool_call_count)
+                            data = retry_data  # Use retry response (usage is read from data below)
+                            scan = retry_scan
+                            output_items, output_text = scan.items, scan.text
+                            tool_call_count = scan.tool_call_count
+                            grounded_effective = True
                 
                 # Still no search after retry? Fail
                 if not grounded_effective:
@@ -431,39 +865,25 @@ class OpenAIProductionAdapter:
             json_valid = False
             if req.schema and output_text:
                 try:
-                    json_obj = json.loads(output_text)
-                    json_valid = True
-                except json.JSONDecodeError as e:
+                    json_obj, json_valid = _parse_structured(output_text, body["text"]["format"]["schema"])
+                except orjson.JSONDecodeError as e:
                     logger.warning(f"JSON parsing failed: {e}")
             
-            # Extract citations
-            citations = []
-            for item in output_items:
-                if (item.get("type") or "").startswith("web_search"):
-                    # Try to extract citations if present
-                    if "citations" in item:
-                        for citation in item.get("citations", []):
-                            citations.append({
-                                'url': citation.get('url', ''),
-                                'title': citation.get('title', ''),
-                                'snippet': citation.get('snippet', '')
-                            })
-            
             # Extract and flatten usage with the robust flattener
             usage_raw = data.get('usage', {}) or {}
             flat_usage = self._flatten_usage_openai(usage_raw)
-            print(f"[DEBUG] Raw usage data: {usage_raw}", flush=True)  # Debug
-            print(f"[DEBUG] Flattened usage: {flat_usage}", flush=True)  # Debug
+            logger.debug("Raw usage data: %s", usage_raw)
+            logger.debug("Flattened usage: %s", flat_usage)
             
             # Build result
-            return RunResult(
+            result = RunResult(
                 run_id=req.run_id,
                 provider="openai",
                 model_name=req.model_name,
                 region=None,
                 grounded_effective=grounded_effective,
                 tool_call_count=tool_call_count,
-                citations=citations,
+                citations=scan.citations,
                 json_text=output_text,
                 json_obj=json_obj,
                 json_valid=json_valid,
@@ -476,17 +896,19 @@ class OpenAIProductionAdapter:
                     "seed": req.seed,
                     "top_p": req.top_p,
                     "api": "responses_http",
+                    "cached_tokens": self._cached_tokens(flat_usage),
                     "tool_choice": tool_choice,
                     "grounding_mode": req.grounding_mode.value
                 }
             )
             
+            await self._store_result(cache_key, result, RESPONSES_GROUNDED_CACHE_TTL)
+            
+            return result
+            
         except Exception as e:
             logger.error(f"HTTP Responses API error: {str(e)[:500]}")
-            print(f"[ERROR] Exception type: {type(e).__name__}", flush=True)
-            print(f"[ERROR] Exception details: {str(e)[:1000]}", flush=True)
-            import traceback
-            print(f"[ERROR] Traceback: {traceback.format_exc()[:2000]}", flush=True)
+            logger.debug("HTTP Responses API %s", type(e).__name__, exc_info=True)
             
             # Fail closed for REQUIRED mode
             if req.grounding_mode == GroundingMode.REQUIRED:
@@ -513,7 +935,7 @@ class OpenAIProductionAdapter:
                 json_text="",
                 json_obj=None,
                 json_valid=False,
-                latency_ms=int((time.time() - start_time) * 1000),
+                latency_ms=(time.monotonic_ns() - start_time) // 1_000_000,
                 error=str(e),
                 usage=flat_usage,
                 meta={"api": "responses_http", "failed": True}
@@ -527,26 +949,71 @@ class OpenAIProductionAdapter:
         """Synchronous run method - now uses the new adapter with soft-required logic"""
         from .openai_adapter import run_openai_with_grounding
         
-        # Map GroundingMode enum to string
-        mode_map = {
-            GroundingMode.OFF: "UNGROUNDED",
-            GroundingMode.PREFERRED: "PREFERRED", 
-            GroundingMode.REQUIRED: "REQUIRED"
-        }
-        mode = mode_map.get(req.grounding_mode, "UNGROUNDED")
+        self._require_no_event_loop("run_sync")
         
         # Use the new adapter
         result = run_openai_with_grounding(
             client=self.client,
             model=req.model_name,
-            mode=mode,
+            mode=GROUNDING_MODE_NAMES.get(req.grounding_mode, "UNGROUNDED"),
             prompt=req.user_prompt,
             system=req.system_text,
             als=req.als_block,
             strict_fail=True
         )
+        return self._grounding_run_result(req, result)
+    
+    async def run_batch_async(self, reqs: List[RunRequest]) -> List[RunResult]:
+        """
+        run_sync's soft-required flow for many requests at once: every
+        Responses call is in flight concurrently on the shared AsyncOpenAI
+        client (within the adapter's rate limits) instead of waiting on the
+        previous one. Results keep the order of reqs; a request that fails
+        (retries exhausted, 400, REQUIRED without search) becomes an error
+        RunResult instead of failing the whole sweep.
+        """
+        from .openai_adapter import run_openai_with_grounding_async
         
-        # Map back to RunResult
+        results = await asyncio.gather(*[
+            run_openai_with_grounding_async(
+                self._throttled,
+                model=req.model_name,
+                mode=GROUNDING_MODE_NAMES.get(req.grounding_mode, "UNGROUNDED"),
+                prompt=req.user_prompt,
+                system=req.system_text,
+                als=req.als_block,
+                strict_fail=True
+            )
+            for req in reqs
+        ], return_exceptions=True)
+        return [
+            self._failed_result(req, str(result), {"api": "responses_batch_async"})
+            if isinstance(result, Exception) else self._grounding_run_result(req, result)
+            for req, result in zip(reqs, results)
+        ]
+    
+    @staticmethod
+    def _failed_result(req: RunRequest, error: str, meta: Dict[str, Any]) -> RunResult:
+        """Error RunResult for one request of a batch, so the others still come back"""
+        return RunResult(
+            run_id=req.run_id,
+            provider="openai",
+            model_name=req.model_name,
+            region=None,
+            grounded_effective=False,
+            tool_call_count=0,
+            citations=[],
+            json_text="",
+            json_obj=None,
+            json_valid=False,
+            latency_ms=0,
+            error=error,
+            meta={**meta, "failed": True}
+        )
+    
+    @staticmethod
+    def _grounding_run_result(req: RunRequest, result: Dict[str, Any]) -> RunResult:
+        """Map a run_openai_with_grounding result back to RunResult"""
         return RunResult(
             run_id=req.run_id,
             provider="openai",
@@ -570,112 +1037,92 @@ class OpenAIProductionAdapter:
             }
         )
     
+    def submit_batch(self, reqs: List[RunRequest]) -> str:
+        """
+        Submit reqs as one Batch API job instead of live calls - for ALS x prompt
+        x model sweeps that can wait. Returns the batch id for poll_batch.
+        """
+        lines = []
+        for req in reqs:
+            needs_grounding = req.grounding_mode in (GroundingMode.REQUIRED, GroundingMode.PREFERRED)
+            body = self._build_sdk_kwargs(req, needs_grounding)
+            body.update(body.pop("extra_body", {}))  # batch bodies are raw JSON, no SDK extra_body
+            lines.append(json.dumps({
+                "custom_id": req.run_id,
+                "method": "POST",
+                "url": "/v1/responses",
+                "body": body
+            }))
+        
+        batch_file = self.client.files.create(
+            file=("responses_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/responses",
+            completion_window=RESPONSES_BATCH_COMPLETION_WINDOW
+        )
+        logger.info(f"Submitted Responses batch {batch.id}: {len(reqs)} requests")
+        return batch.id
+    
+    def poll_batch(self, batch_id: str, reqs: List[RunRequest]) -> Optional[List[RunResult]]:
+        """
+        Results of a submit_batch job in the order of reqs, or None while it is
+        still running. Raises RuntimeError if the batch failed, expired or was cancelled.
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in RESPONSES_BATCH_FAILED_STATUSES:
+            raise RuntimeError(f"Responses batch {batch_id} {batch.status}")
+        if batch.status != "completed":
+            return None
+        
+        lines = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    item = orjson.loads(line)
+                    lines[item["custom_id"]] = item
+        
+        results = []
+        for req in reqs:
+            item = lines.get(req.run_id) or {"error": {"message": "missing from batch output"}}
+            response = item.get("response") or {}
+            meta = {"api": "responses_batch", "batch_id": batch_id}
+            try:
+                if item.get("error") or response.get("status_code") != 200:
+                    raise RuntimeError(item.get("error") or response.get("body"))
+                needs_grounding = req.grounding_mode in (GroundingMode.REQUIRED, GroundingMode.PREFERRED)
+                result = self._process_response(
+                    Response.model_validate(response["body"]), req,
+                    self._build_sdk_kwargs(req, needs_grounding), 0, needs_grounding
+                )
+                result.meta.update(meta)
+            except Exception as e:
+                # One bad line must not lose the rest of the batch; REQUIRED failures land here too
+                result = self._failed_result(req, str(e), meta)
+            results.append(result)
+        return results
+    
     def run_sync_legacy(self, req: RunRequest) -> RunResult:
         """Synchronous run method"""
-        start_time = time.time()
+        self._require_no_event_loop("run_sync_legacy")
+        start_time = time.monotonic_ns()
         
         # Determine if grounding is needed
         needs_grounding = req.grounding_mode in (GroundingMode.REQUIRED, GroundingMode.PREFERRED)
         
-        # Build request parameters
-        kwargs = {
-            "model": req.model_name,
-            "input": self._build_input_messages(req.system_text, req.als_block, req.user_prompt),
-            "temperature": 1.0 if 'gpt-5' in req.model_name.lower() else req.temperature,
-        }
-        
-        # Add grounding tools if needed
-        if needs_grounding:
-            kwargs["tools"] = [{"type": "web_search"}]
-            # GPT-5 only supports "auto" with web_search
-            kwargs["tool_choice"] = "auto"
-        
-        # Add seed if provided (only for Chat Completions, not Responses)
-        # Responses API doesn't support seed parameter
-        # if req.seed is not None:
-        #     kwargs["seed"] = req.seed
-        
-        # Add JSON schema via extra_body (SDK workaround)
-        # CRITICAL: GPT-5 cannot use JSON schema AND web_search together
-        # If grounding is needed, skip the schema enforcement
-        if req.schema and not needs_grounding:
-            kwargs["extra_body"] = self._build_schema_format(req.schema)
-        elif req.schema and needs_grounding:
-            logger.warning("GPT-5 limitation: Cannot use JSON schema with web_search grounding")
+        kwargs = self._build_sdk_kwargs(req, needs_grounding)
         
         try:
             # Make the API call
             logger.info(f"Calling OpenAI Responses API: model={req.model_name}, grounding={needs_grounding}")
             response = self.client.responses.create(**kwargs)
             
-            # Calculate latency
-            latency_ms = int((time.time() - start_time) * 1000)
-            
-            # Extract response data
-            output_text = getattr(response, 'output_text', '')
-            output_items = getattr(response, 'output', []) or []
-            
-            # Count tool calls
-            tool_call_count = sum(
-                1 for item in output_items 
-                if getattr(item, 'type', '') == 'web_search_call'
-            )
-            
-            # Check if grounding was effective
-            grounded_effective = tool_call_count > 0
-            
-            # Enforce grounding requirements
-            if req.grounding_mode == GroundingMode.REQUIRED and needs_grounding and not grounded_effective:
-                raise RuntimeError(
-                    f"Grounding REQUIRED but no web search performed. "
-                    f"Model: {req.model_name}, Tool calls: {tool_call_count}"
-                )
-            
-            # Parse JSON if schema was provided
-            json_obj = None
-            json_valid = False
-            if req.schema and output_text:
-                try:
-                    json_obj = json.loads(output_text)
-                    json_valid = True
-                except json.JSONDecodeError as e:
-                    logger.warning(f"JSON parsing failed: {e}")
-                    if req.grounding_mode == GroundingMode.REQUIRED:
-                        raise RuntimeError(f"JSON schema enforced but output invalid: {e}")
-            
-            # Extract citations
-            citations = []
-            for item in output_items:
-                if getattr(item, 'type', '') == 'web_search_call' and hasattr(item, 'citations'):
-                    for citation in getattr(item, 'citations', []):
-                        citations.append({
-                            'url': getattr(citation, 'url', ''),
-                            'title': getattr(citation, 'title', ''),
-                            'snippet': getattr(citation, 'snippet', '')
-                        })
-            
-            # Build result
-            return RunResult(
-                run_id=req.run_id,
-                provider="openai",
-                model_name=req.model_name,
-                region=None,
-                grounded_effective=grounded_effective,
-                tool_call_count=tool_call_count,
-                citations=citations,
-                json_text=output_text,
-                json_obj=json_obj,
-                json_valid=json_valid,
-                latency_ms=latency_ms,
-                error=None,
-                system_fingerprint=getattr(response, 'system_fingerprint', None),
-                usage=self._extract_usage(response),  # SDK response uses old extractor
-                meta={
-                    "temperature": kwargs["temperature"],
-                    "seed": req.seed,
-                    "top_p": req.top_p,
-                    "api": "responses"
-                }
+            return self._process_response(
+                response, req, kwargs, (time.monotonic_ns() - start_time) // 1_000_000, needs_grounding
             )
             
         except Exception as e:
@@ -697,35 +1144,52 @@ class OpenAIProductionAdapter:
                 json_text="",
                 json_obj=None,
                 json_valid=False,
-                latency_ms=int((time.time() - start_time) * 1000),
+                latency_ms=(time.monotonic_ns() - start_time) // 1_000_000,
                 error=str(e),
                 meta={"api": "responses", "failed": True}
             )
     
-    async def run_async(self, req: RunRequest) -> RunResult:
-        """Asynchronous run method"""
-        start_time = time.time()
-        
-        # Determine if grounding is needed
-        needs_grounding = req.grounding_mode in (GroundingMode.REQUIRED, GroundingMode.PREFERRED)
-        
-        # Use HTTP path for grounded requests to force tool usage
-        if needs_grounding:
-            logger.info(f"Using HTTP path for grounded request: model={req.model_name}")
-            print(f"[DEBUG] needs_grounding={needs_grounding}, model={req.model_name}, has_schema={bool(req.schema)}", flush=True)
-            print(f"[DEBUG] Calling HTTP grounded method for {req.model_name}", flush=True)  # Debug
-            return await self._http_grounded_with_schema(req)
-        
-        # Build request parameters
+    @staticmethod
+    def _response_cache_key(kwargs: Dict[str, Any], req: RunRequest) -> str:
+        """Cache key over everything that shapes the model output"""
+        payload = {
+            "model": kwargs["model"],
+            "input": kwargs["input"],
+            "tools": kwargs.get("tools"),
+            "tool_choice": kwargs.get("tool_choice"),
+            "temperature": kwargs["temperature"],
+            "top_p": req.top_p,
+            "seed": req.seed,
+            "schema": kwargs.get("extra_body")
+        }
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+        return RESPONSES_CACHE_PREFIX + digest
+    
+    @staticmethod
+    def _grounded_cache_key(req: RunRequest, temperature: float, max_output_tokens: int) -> str:
+        """Cache key for the raw grounded path (prompt, schema and mode shape the output)"""
+        return RESPONSES_CACHE_PREFIX + "http:" + hashlib.blake2s(orjson.dumps({
+            "model": req.model_name,
+            "system": req.system_text,
+            "als": req.als_block,
+            "prompt": req.user_prompt,
+            "schema": req.schema,
+            "mode": req.grounding_mode.value,
+            "temperature": temperature,
+            "max_output_tokens": max_output_tokens
+        }, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    def _build_sdk_kwargs(self, req: RunRequest, needs_grounding: bool) -> Dict[str, Any]:
+        """responses.create kwargs for the SDK path (run_async, run_stream_async, run_sync_legacy)"""
         kwargs = {
             "model": req.model_name,
             "input": self._build_input_messages(req.system_text, req.als_block, req.user_prompt),
-            "temperature": 1.0 if 'gpt-5' in req.model_name.lower() else req.temperature,
+            "temperature": 1.0 if _is_gpt5(req.model_name) else req.temperature,
         }
         
         # Add grounding tools if needed
         if needs_grounding:
-            kwargs["tools"] = [{"type": "web_search"}]
+            kwargs["tools"] = WEB_SEARCH_TOOLS
             # GPT-5 only supports "auto" with web_search
             kwargs["tool_choice"] = "auto"
         
@@ -742,82 +1206,264 @@ class OpenAIProductionAdapter:
         elif req.schema and needs_grounding:
             logger.warning("GPT-5 limitation: Cannot use JSON schema with web_search grounding")
         
+        return kwargs
+    
+    def _process_response(
+        self,
+        response,
+        req: RunRequest,
+        kwargs: Dict[str, Any],
+        latency_ms: int,
+        needs_grounding: bool
+    ) -> RunResult:
+        """RunResult for a completed SDK Responses object; raises when REQUIRED grounding failed"""
+        output_text = getattr(response, 'output_text', '')
+        output_items = getattr(response, 'output', []) or []
+        usage = self._extract_usage(response)
+        
+        # One pass over the output: count web searches and collect their citations
+        tool_call_count = 0
+        citations = []
+        add_citation = citations.append
+        for item in output_items:
+            if getattr(item, 'type', None) != 'web_search_call':
+                continue
+            tool_call_count += 1
+            for citation in getattr(item, 'citations', None) or ():
+                add_citation({
+                    'url': getattr(citation, 'url', ''),
+                    'title': getattr(citation, 'title', ''),
+                    'snippet': getattr(citation, 'snippet', '')
+                })
+        
+        grounded_effective = tool_call_count > 0
+        
+        if req.grounding_mode == GroundingMode.REQUIRED and needs_grounding and not grounded_effective:
+            raise RuntimeError(
+                f"Grounding REQUIRED but no web search performed. "
+                f"Model: {req.model_name}, Tool calls: {tool_call_count}"
+            )
+        
+        json_obj = None
+        json_valid = False
+        if req.schema and output_text:
+            try:
+                json_obj, json_valid = _parse_structured(output_text, req.schema.get("schema", req.schema))
+            except orjson.JSONDecodeError as e:
+                logger.warning(f"JSON parsing failed: {e}")
+                if req.grounding_mode == GroundingMode.REQUIRED:
+                    raise RuntimeError(f"JSON schema enforced but output invalid: {e}")
+        
+        return RunResult(
+            run_id=req.run_id,
+            provider="openai",
+            model_name=req.model_name,
+            region=None,
+            grounded_effective=grounded_effective,
+            tool_call_count=tool_call_count,
+            citations=citations,
+            json_text=output_text,
+            json_obj=json_obj,
+            json_valid=json_valid,
+            latency_ms=latency_ms,
+            error=None,
+            system_fingerprint=getattr(response, 'system_fingerprint', None),
+            usage=usage,
+            meta={
+                "temperature": kwargs["temperature"],
+                "seed": req.seed,
+                "top_p": req.top_p,
+                "api": "responses",
+                "cached_tokens": self._cached_tokens(usage)
+            }
+        )
+    
+    async def _cached_result(self, cache_key: str, req: RunRequest) -> Optional[RunResult]:
+        """Cached RunResult for cache_key, re-labelled with req's run_id"""
+        if self._response_cache is None:
+            return None
+        cached = await self._response_cache.get(cache_key)
+        if not cached:
+            return None
+        logger.info(f"Responses cache hit: model={req.model_name}")
+        result = RunResult(**cached)
+        result.run_id = req.run_id
+        result.meta = {**result.meta, "cache_hit": True}
+        return result
+    
+    async def _store_result(self, cache_key: Optional[str], result: RunResult, ttl: int):
+        """Cache result under cache_key (no-op without a key or a cache)"""
+        if cache_key and self._response_cache is not None:
+            await self._response_cache.set(cache_key, result.model_dump(mode="json"), ttl=ttl)
+    
+    async def run_async(self, req: RunRequest) -> RunResult:
+        """Asynchronous run method"""
+        # REQUIRED runs need fresh citations; everything else may reuse a near-duplicate
+        if self._semantic_cache is None or req.grounding_mode == GroundingMode.REQUIRED:
+            return await self._run_async(req)
+        
+        scope = (
+            req.model_name,
+            req.grounding_mode.value,
+            req.als_block,
+            req.system_text,
+            json.dumps(req.schema, sort_keys=True) if req.schema else None
+        )
+        try:
+            vector = await self._embed_prompt(req.user_prompt)
+        except Exception as e:
+            # The cache is an optimisation; an embeddings outage must not fail the run
+            logger.warning(f"Semantic cache embedding failed, running uncached: {type(e).__name__}: {e}")
+            return await self._run_async(req)
+        hit = self._semantic_cache.lookup(scope, vector)
+        if hit:
+            result, similarity = hit
+            logger.info(f"Semantic cache hit: model={req.model_name}, similarity={similarity:.3f}")
+            return result.model_copy(update={
+                "run_id": req.run_id,
+                "meta": {**result.meta, "semantic_cache_hit": True, "semantic_similarity": similarity}
+            })
+        
+        result = await self._run_async(req)
+        if not result.error:
+            self._semantic_cache.add(scope, vector, result)
+        return result
+    
+    async def _embed_prompt(self, prompt: str) -> np.ndarray:
+        """Unit-length embedding of the whitespace/case-normalized prompt, under the adapter's throttle"""
+        normalized = " ".join(prompt.lower().split())
+        response = await self._throttled_sdk_call(
+            lambda: self.async_client.embeddings.create(model=SEMANTIC_CACHE_EMBEDDING_MODEL, input=normalized),
+            len(normalized) // 4 + 1
+        )
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    async def _run_async(self, req: RunRequest) -> RunResult:
+        """run_async without the semantic cache"""
+        start_time = time.monotonic_ns()
+        
+        # Determine if grounding is needed
+        needs_grounding = req.grounding_mode in (GroundingMode.REQUIRED, GroundingMode.PREFERRED)
+        
+        # Use HTTP path for grounded requests to force tool usage
+        if needs_grounding:
+            logger.info(f"Using HTTP path for grounded request: model={req.model_name}")
+            return await self._http_grounded_with_schema(req)
+        
+        kwargs = self._build_sdk_kwargs(req, needs_grounding)
+        
+        # Identical deterministic requests return identical output - skip the API
+        cache_key = self._response_cache_key(kwargs, req) if kwargs["temperature"] == 0 else None
+        if cache_key:
+            result = await self._cached_result(cache_key, req)
+            if result:
+                return result
+            
+            # The same request already on the wire (duplicate burst before the
+            # cache is filled): wait for its result instead of calling again
+            call = self._inflight.get(cache_key)
+            if call is None:
+                call = asyncio.ensure_future(
+                    self._run_sdk_call(req, kwargs, needs_grounding, start_time, cache_key)
+                )
+                self._inflight[cache_key] = call
+                call.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+            result = await asyncio.shield(call)
+            if result.run_id != req.run_id:
+                result = result.model_copy(update={
+                    "run_id": req.run_id,
+                    "meta": {**result.meta, "coalesced": True}
+                })
+            return result
+        
+        return await self._run_sdk_call(req, kwargs, needs_grounding, start_time, cache_key)
+    
+    async def _run_sdk_call(
+        self,
+        req: RunRequest,
+        kwargs: Dict[str, Any],
+        needs_grounding: bool,
+        start_time: int,
+        cache_key: Optional[str]
+    ) -> RunResult:
+        """run_async's API call; successful results are stored under cache_key"""
         try:
             # Make the async API call
             logger.info(f"Calling OpenAI Responses API (async): model={req.model_name}, grounding={needs_grounding}")
-            response = await self.async_client.responses.create(**kwargs)
-            
-            # Rest of the logic is identical to sync version
-            latency_ms = int((time.time() - start_time) * 1000)
-            
-            output_text = getattr(response, 'output_text', '')
-            output_items = getattr(response, 'output', []) or []
-            
+            response = await self._create_response(**kwargs)
             
-            tool_call_count = sum(
-                1 for item in output_items 
-                if getattr(item, 'type', '') == 'web_search_call'
+            result = self._process_response(
+                response, req, kwargs, (time.monotonic_ns() - start_time) // 1_000_000, needs_grounding
             )
             
-            grounded_effective = tool_call_count > 0
+            await self._store_result(cache_key, result, RESPONSES_CACHE_TTL)
             
-            if req.grounding_mode == GroundingMode.REQUIRED and needs_grounding and not grounded_effective:
-                raise RuntimeError(
-                    f"Grounding REQUIRED but no web search performed. "
-                    f"Model: {req.model_name}, Tool calls: {tool_call_count}"
-                )
+            return result
             
-            json_obj = None
-            json_valid = False
-            if req.schema and output_text:
-                try:
-                    json_obj = json.loads(output_text)
-                    json_valid = True
-                except json.JSONDecodeError as e:
-                    logger.warning(f"JSON parsing failed: {e}")
-                    if req.grounding_mode == GroundingMode.REQUIRED:
-                        raise RuntimeError(f"JSON schema enforced but output invalid: {e}")
-            
-            citations = []
-            for item in output_items:
-                if getattr(item, 'type', '') == 'web_search_call' and hasattr(item, 'citations'):
-                    for citation in getattr(item, 'citations', []):
-                        citations.append({
-                            'url': getattr(citation, 'url', ''),
-                            'title': getattr(citation, 'title', ''),
-                            'snippet': getattr(citation, 'snippet', '')
-                        })
+        except Exception as e:
+            logger.error(f"OpenAI async API error: {e}")
+            
+            if req.grounding_mode == GroundingMode.REQUIRED:
+                raise
             
             return RunResult(
                 run_id=req.run_id,
                 provider="openai",
                 model_name=req.model_name,
                 region=None,
-                grounded_effective=grounded_effective,
-                tool_call_count=tool_call_count,
-                citations=citations,
-                json_text=output_text,
-                json_obj=json_obj,
-                json_valid=json_valid,
-                latency_ms=latency_ms,
-                error=None,
-                system_fingerprint=getattr(response, 'system_fingerprint', None),
-                usage=self._extract_usage(response),  # SDK response uses old extractor
-                meta={
-                    "temperature": kwargs["temperature"],
-                    "seed": req.seed,
-                    "top_p": req.top_p,
-                    "api": "responses"
-                }
+                grounded_effective=False,
+                tool_call_count=0,
+                citations=[],
+                json_text="",
+                json_obj=None,
+                json_valid=False,
+                latency_ms=(time.monotonic_ns() - start_time) // 1_000_000,
+                error=str(e),
+                meta={"api": "responses", "failed": True}
+            )
+    
+    async def run_stream_async(self, req: RunRequest) -> AsyncIterator[Union[str, RunResult]]:
+        """
+        Streaming variant of run_async's SDK path: yields output text deltas as
+        they arrive, then the RunResult for the completed response last
+        """
+        start_time = time.monotonic_ns()
+        needs_grounding = req.grounding_mode in (GroundingMode.REQUIRED, GroundingMode.PREFERRED)
+        kwargs = self._build_sdk_kwargs(req, needs_grounding)
+        
+        try:
+            logger.info(f"Streaming OpenAI Responses API: model={req.model_name}, grounding={needs_grounding}")
+            stream = await self._create_response(stream=True, **kwargs)
+            
+            response = None
+            search_calls = 0
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                elif event.type == "response.web_search_call.completed":
+                    search_calls += 1
+                elif event.type == "response.completed":
+                    response = event.response
+            
+            if response is None:
+                raise RuntimeError("Response stream ended without response.completed")
+            logger.info(f"Stream complete: model={req.model_name}, web searches={search_calls}")
+            
+            result = self._process_response(
+                response, req, kwargs, (time.monotonic_ns() - start_time) // 1_000_000, needs_grounding
             )
+            result.meta["streamed"] = True
+            yield result
             
         except Exception as e:
-            logger.error(f"OpenAI async API error: {e}")
+            logger.error(f"OpenAI streaming API error: {e}")
             
             if req.grounding_mode == GroundingMode.REQUIRED:
                 raise
             
-            return RunResult(
+            yield RunResult(
                 run_id=req.run_id,
                 provider="openai",
                 model_name=req.model_name,
@@ -828,7 +1474,7 @@ class OpenAIProductionAdapter:
                 json_text="",
                 json_obj=None,
                 json_valid=False,
-                latency_ms=int((time.time() - start_time) * 1000),
+                latency_ms=(time.monotonic_ns() - start_time) // 1_000_000,
                 error=str(e),
-                meta={"api": "responses", "failed": True}
-            )
\ No newline at end of file
+                meta={"api": "responses", "streamed": True, "failed": True}
+            )
@@ -4,7 +4,8 @@ Production-grade type definitions with Pydantic
 """
 
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Type
+import orjson
 from pydantic import BaseModel, Field
 
 class GroundingMode(str, Enum):
@@ -73,4 +74,15 @@ LOCALE_PROBE_SCHEMA = {
     },
     "required": ["vat_percent", "plug", "emergency"],
     "additionalProperties": False
-}
\ No newline at end of file
+}
+
+# Pydantic models for known JSON schemas, keyed by key-sorted schema JSON:
+# adapters parse and validate matching output in one model_validate_json pass
+SCHEMA_MODELS: Dict[bytes, Type[BaseModel]] = {
+    orjson.dumps(LOCALE_PROBE_SCHEMA, option=orjson.OPT_SORT_KEYS): LocaleProbeSchema
+}
+
+def structured_model_for(schema: Dict[str, Any]) -> Optional[Type[BaseModel]]:
+    """Registered model for a JSON schema (wrapped or unwrapped), if any"""
+    schema_def = schema.get("schema", schema)
+    return SCHEMA_MODELS.get(orjson.dumps(schema_def, option=orjson.OPT_SORT_KEYS))
@@ -5,19 +5,24 @@ Following ChatGPT's reference architecture
 """
 
 import os
-import json
+import re
 import time
 import logging
+import orjson
 from typing import Dict, Any, Optional
 import google.auth
 from google import genai
 from google.genai.types import (
     GenerateContentConfig, Tool, GoogleSearch, Schema, Type, HttpOptions
 )
-from .types import RunRequest, RunResult, GroundingMode
+from pydantic import ValidationError
+from .types import RunRequest, RunResult, GroundingMode, structured_model_for
 
 logger = logging.getLogger(__name__)
 
+# JSON body of a markdown code fence, with or without a json language tag
+_CODE_FENCE_RE = re.compile(r'```(?:json)?\s*\n?(.*?)\n?```', re.DOTALL)
+
 class VertexGenAIAdapter:
     """
     Production adapter for Google's Vertex AI Gemini models
@@ -59,11 +64,10 @@ class VertexGenAIAdapter:
         if not s: 
             return s
         
-        import re
         # Check if there's a code fence anywhere in the text
         if "```" in s:
             # Extract JSON from markdown code block
-            match = re.search(r'```(?:json)?\s*\n?(.*?)\n?```', s, re.DOTALL)
+            match = _CODE_FENCE_RE.search(s)
             if match:
                 return match.group(1).strip()
         
@@ -308,10 +312,20 @@ class VertexGenAIAdapter:
             # Clean up any markdown fences
             text = self._strip_code_fences(text)
             
+            # Registered schemas parse and validate in one pass
+            schema_model = structured_model_for(req.schema) if req.schema else None
             try:
-                json_obj = json.loads(text)
-                json_valid = True
-            except json.JSONDecodeError as e:
+                if schema_model is not None:
+                    try:
+                        json_obj = schema_model.model_validate_json(text).model_dump()
+                        json_valid = True
+                    except ValidationError as e:
+                        logger.warning(f"JSON output does not match schema: {e.error_count()} errors")
+                        json_obj = orjson.loads(text)
+                else:
+                    json_obj = orjson.loads(text)
+                    json_valid = True
+            except orjson.JSONDecodeError as e:
                 logger.warning(f"JSON parsing failed: {e}. Text was: {text[:200]}")
                 # For grounded requests, JSON might not be perfect but grounding might have worked
                 if req.schema and not json_valid:
@@ -8,6 +8,7 @@ from typing import Dict, Any, Optional, List
 import asyncio
 import time
 import json
+import orjson
 import requests
 import aiohttp
 from app.config import settings
@@ -135,7 +136,7 @@ Answer only with the requested format."""
                         json_valid = None
                         if enforce_json_schema:
                             try:
-                                json.loads(content) if content else None
+                                orjson.loads(content) if content else None  # validity only; result discarded
                                 json_valid = True
                             except:
                                 json_valid = False
@@ -288,7 +289,7 @@ Answer only with the requested format."""
                 json_valid = None
                 if enforce_json_schema:
                     try:
-                        json.loads(content) if content else None
+                        orjson.loads(content) if content else None  # validity only; result discarded
                         json_valid = True
                     except:
                         json_valid = False
@@ -8,6 +8,7 @@ import asyncio
 import time
 from openai import AsyncOpenAI
 import json
+import orjson
 
 class OpenAIToolsAdapter:
     """
@@ -162,7 +163,7 @@ Do not preface with statements about training data or location—produce the ans
             json_valid = None
             if enforce_json_schema:
                 try:
-                    json.loads(content)
+                    orjson.loads(content)  # validity only; result discarded
                     json_valid = True
                 except:
                     json_valid = False
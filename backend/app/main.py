@@ -1,14 +1,37 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+import logging
+import queue
 
 from app.api import experiments, prompts, entities, metrics, dashboard, tracked_phrases, simple_analysis, real_analysis, embedding_analysis, comprehensive_analysis, pure_beeb, weekly_tracking, entity_extraction_beeb, contestra_v2_analysis, llm_crawlability, concordance_analysis, hybrid_analysis, brand_entity_strength, brand_entity_strength_v2, crawler_monitor, domains, crawler_monitor_v2, bot_analytics, prompt_tracking, prompt_tracking_celery, prompt_tracking_background, prompt_integrity, health, countries, prompter_v7, grounding_test
 from app.database import engine, Base
+from app.llm.adapters.openai_production import aclose_shared_clients
+
+def start_log_listener() -> QueueListener:
+    """
+    Route root log records through a queue so the actual stream writes
+    happen on a background thread instead of the event loop
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:] or [logging.StreamHandler()]
+    for handler in handlers:
+        root.removeHandler(handler)
+    
+    log_queue = queue.Queue(-1)
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
+    log_listener = start_log_listener()
     yield
+    await aclose_shared_clients()
+    log_listener.stop()
 
 app = FastAPI(
     title="AI Rank & Influence Tracker",
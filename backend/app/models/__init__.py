@@ -17,6 +17,7 @@ from .tracked_phrase import (
 from .domain import Domain, BotEvent
 from .bot_stats import DailyBotStats, WeeklyBotTrends, BotProvider
 from .prompt_tracking import PromptTemplate, PromptRun, PromptResult, PromptSchedule
+from .weekly_tracking import WeeklyTrackingPoint
 
 __all__ = [
     'Brand', 'Concept', 'Model', 'Experiment', 'Run',
@@ -24,5 +25,6 @@ __all__ = [
     'Threshold', 'Pivot', 'TrackedPhrase', 'WeeklyMetric',
     'PhraseResult', 'ThresholdResult', 'PivotAnalysis',
     'Domain', 'BotEvent', 'DailyBotStats', 'WeeklyBotTrends', 'BotProvider',
-    'PromptTemplate', 'PromptRun', 'PromptResult', 'PromptSchedule'
+    'PromptTemplate', 'PromptRun', 'PromptResult', 'PromptSchedule',
+    'WeeklyTrackingPoint'
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Float, Date, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Float, Date, Text, JSON, Index, and_
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -50,6 +50,37 @@ class WeeklyMetric(Base):
     tracked_phrase = relationship("TrackedPhrase", back_populates="weekly_metrics")
     entity = relationship("Entity")
     competitor_brand = relationship("Brand", foreign_keys=[competitor_brand_id])
+    
+    __table_args__ = (
+        # Phrase-rankings filters by phrase + week range; INCLUDE lets Postgres
+        # answer it from the index alone
+        Index(
+            "idx_weekly_metric_phrase_week", "tracked_phrase_id", "week_starting",
+            postgresql_include=["competitor_brand_id", "rank_position", "frequency", "weighted_score"]
+        ),
+        Index("idx_weekly_metric_competitor", "competitor_brand_id", "tracked_phrase_id"),
+        # Top-entities reads (B→E rows only) without touching the heap
+        Index(
+            "idx_weekly_metric_entity_frequency", "brand_id", entity_frequency.desc(),
+            postgresql_include=["entity_id", "entity_rank"],
+            postgresql_where=entity_frequency.isnot(None),
+            sqlite_where=entity_frequency.isnot(None)
+        ),
+        # Upsert targets for WeeklyAggregator's two kinds of rows: E→B per
+        # (phrase, competitor, week) and B→E per (entity, week)
+        Index(
+            "ux_weekly_metric_phrase_key", "brand_id", "tracked_phrase_id", "competitor_brand_id", "week_starting",
+            unique=True,
+            postgresql_where=competitor_brand_id.isnot(None),
+            sqlite_where=competitor_brand_id.isnot(None)
+        ),
+        Index(
+            "ux_weekly_metric_entity_key", "brand_id", "entity_id", "week_starting",
+            unique=True,
+            postgresql_where=and_(tracked_phrase_id.is_(None), entity_id.isnot(None)),
+            sqlite_where=and_(tracked_phrase_id.is_(None), entity_id.isnot(None))
+        ),
+    )
 
 class PhraseResult(Base):
     __tablename__ = "phrase_results"
@@ -71,6 +102,11 @@ class PhraseResult(Base):
     # Relationships
     tracked_phrase = relationship("TrackedPhrase", back_populates="phrase_results")
     run = relationship("Run")
+    
+    __table_args__ = (
+        # E→B aggregation filters by phrase + created_at window
+        Index("idx_phrase_result_phrase_created", "tracked_phrase_id", created_at.desc()),
+    )
 
 class ThresholdResult(Base):
     __tablename__ = "threshold_results"
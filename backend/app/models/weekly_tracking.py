@@ -0,0 +1,32 @@
+"""
+Weekly tracking time-series for BEEB analysis
+One row per (brand, vendor, scope, phrase, key, week)
+"""
+
+from sqlalchemy import Column, Integer, SmallInteger, String, Date, UniqueConstraint, CheckConstraint
+
+from app.database import Base
+
+class WeeklyTrackingPoint(Base):
+    """Rank and frequency of an entity or competitor brand for one week"""
+    __tablename__ = "weekly_tracking_points"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    brand_name = Column(String, nullable=False)
+    vendor = Column(String, nullable=False)
+    scope = Column(String, nullable=False)  # 'entity' or 'phrase'
+    phrase = Column(String, nullable=False, default="")  # Empty for entity rows
+    key = Column(String, nullable=False)  # Entity name or competitor brand name
+    week_start = Column(Date, nullable=False)
+    rank = Column(SmallInteger, nullable=False)  # 1-10, where 1 is best
+    frequency = Column(Integer, nullable=False, default=1)  # Number of mentions
+    
+    __table_args__ = (
+        # Upsert target; its leading (brand_name, vendor) columns also serve reads
+        UniqueConstraint(
+            "brand_name", "vendor", "scope", "phrase", "key", "week_start",
+            name="uq_weekly_tracking_point"
+        ),
+        # Ranks are held as uint8 when aggregated
+        CheckConstraint("rank BETWEEN 1 AND 255", name="ck_weekly_tracking_point_rank"),
+    )
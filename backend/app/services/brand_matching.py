@@ -0,0 +1,30 @@
+"""
+Matching our brand against brand names extracted from LLM responses.
+Exact containment first; fuzzy scoring only tolerates variants that are at
+least as long as the brand name, so a fragment of it never counts as ours.
+"""
+
+from typing import Iterable
+from rapidfuzz import fuzz, utils
+
+# Minimum rapidfuzz partial_ratio for a found brand to count as ours
+BRAND_MATCH_CUTOFF = 85
+
+def matches_brand(found: str, brand_names: Iterable[str]) -> bool:
+    """Whether a found brand is one of brand_names (name or alias)."""
+    found_norm = utils.default_process(found)
+    for name in brand_names:
+        if not name:
+            continue
+        if name.lower() in found.lower():
+            return True
+        name_norm = utils.default_process(name)
+        # partial_ratio slides the shorter string over the longer one, so it
+        # only means "our name appears in found" when found is the longer one
+        if (
+            name_norm
+            and len(found_norm) >= len(name_norm)
+            and fuzz.partial_ratio(name_norm, found_norm) >= BRAND_MATCH_CUTOFF
+        ):
+            return True
+    return False
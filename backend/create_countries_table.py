@@ -1,8 +1,6 @@
 """Create countries table for managing supported countries and ALS testing"""
-from sqlalchemy import create_engine, text
-from app.config import settings
-
-engine = create_engine(settings.database_url)
+from sqlalchemy import text
+from app.database import engine
 
 # Create countries table
 with engine.begin() as conn:
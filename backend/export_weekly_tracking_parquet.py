@@ -0,0 +1,78 @@
+"""
+Export weekly_tracking_points to a Parquet dataset for archival / offline analysis
+Each run writes a full snapshot under its own EXPORT_DIR/<run_id>/, partitioned by
+brand_name=/vendor=, with one zstd-compressed file per partition per fetched batch
+Read the latest snapshot back with
+pq.read_table(latest_export_dir(), filters=[("brand_name", "=", ...), ("vendor", "=", ...)])
+Reading EXPORT_DIR itself would count every row once per run
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models import WeeklyTrackingPoint
+
+EXPORT_DIR = Path("data/weekly_tracking_parquet")
+
+SCHEMA = pa.schema([
+    ("brand_name", pa.string()),
+    ("vendor", pa.string()),
+    ("scope", pa.string()),
+    ("phrase", pa.string()),
+    ("key", pa.string()),
+    ("week_start", pa.date32()),
+    ("rank", pa.uint8()),
+    ("frequency", pa.uint32())
+])
+
+def latest_export_dir() -> Path:
+    """Root of the most recent snapshot (run ids sort chronologically)"""
+    runs = sorted(path for path in EXPORT_DIR.iterdir() if path.is_dir()) if EXPORT_DIR.is_dir() else []
+    if not runs:
+        raise FileNotFoundError(f"No weekly tracking exports in {EXPORT_DIR}")
+    return runs[-1]
+
+def export_weekly_tracking_parquet(batch_size: int = 50_000) -> int:
+    """Stream all tracking points into a new snapshot dataset, returns the row count"""
+    columns = [getattr(WeeklyTrackingPoint, field.name) for field in SCHEMA]
+    run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    run_dir = EXPORT_DIR / run_id
+    total = 0
+    
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            select(*columns).execution_options(yield_per=batch_size)
+        )
+        for part, rows in enumerate(result.partitions()):
+            table = pa.Table.from_pylist([row._asdict() for row in rows], schema=SCHEMA)
+            pq.write_to_dataset(
+                table,
+                root_path=str(run_dir),
+                partition_cols=["brand_name", "vendor"],
+                basename_template=f"part-{part}-{{i}}.parquet",
+                compression="zstd",
+                use_dictionary=True
+            )
+            total += table.num_rows
+    finally:
+        db.close()
+    
+    return total
+
+if __name__ == "__main__":
+    print("Exporting weekly tracking points to Parquet...")
+    print("=" * 50)
+    
+    try:
+        count = export_weekly_tracking_parquet()
+        print(f"\n[SUCCESS] Exported {count} points to {latest_export_dir() if count else EXPORT_DIR}")
+    except Exception as e:
+        print(f"\n[ERROR] Export failed: {str(e)}")
+    
+    print("\n" + "=" * 50)
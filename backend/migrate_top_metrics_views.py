@@ -0,0 +1,42 @@
+"""
+Migration script to create the dashboard rollup materialized views
+(mv_top_entities_by_brand / mv_top_brands_by_phrase) on Postgres.
+WeeklyAggregator refreshes them after each aggregation and reads from them
+once they exist; SQLite keeps querying weekly_metrics directly.
+"""
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.core.weekly_aggregator import TOP_METRICS_VIEWS, TOP_METRICS_VIEW_KEYS, TOP_METRICS_VIEW_INDEXES
+
+def create_top_metrics_views():
+    """Create and populate the views that don't exist yet"""
+    if engine.dialect.name != "postgresql":
+        print("[SKIP] Materialized views are Postgres-only")
+        return
+    
+    with engine.begin() as conn:
+        for name, query in TOP_METRICS_VIEWS.items():
+            print(f"Creating {name}...")
+            conn.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {query}"))
+            key = ", ".join(TOP_METRICS_VIEW_KEYS[name])
+            conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{name}_key ON {name} ({key})"))
+            if name in TOP_METRICS_VIEW_INDEXES:
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS idx_{name}_top ON {name} {TOP_METRICS_VIEW_INDEXES[name]}"
+                ))
+            print(f"[OK] {name}")
+
+if __name__ == "__main__":
+    print("Starting top metrics views migration...")
+    print("=" * 50)
+    
+    try:
+        create_top_metrics_views()
+        print("\n[SUCCESS] Migration complete!")
+    except Exception as e:
+        print(f"\n[ERROR] Migration failed: {str(e)}")
+    
+    print("\n" + "=" * 50)
+    print("Migration script finished")
@@ -0,0 +1,59 @@
+"""
+Migration script to add the phrase-rankings and upsert-key indexes to weekly_metrics,
+plus the (tracked_phrase_id, created_at) index the aggregator scans phrase_results by.
+New databases get them from Base.metadata.create_all; run this ONCE on
+existing databases.
+"""
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.models.tracked_phrase import WeeklyMetric, PhraseResult
+
+# Older aggregations could leave several rows per upsert key; keep the newest
+DEDUPE_STATEMENTS = [
+    """
+    DELETE FROM weekly_metrics
+    WHERE competitor_brand_id IS NOT NULL AND id NOT IN (
+        SELECT MAX(id) FROM weekly_metrics
+        WHERE competitor_brand_id IS NOT NULL
+        GROUP BY brand_id, tracked_phrase_id, competitor_brand_id, week_starting
+    )
+    """,
+    """
+    DELETE FROM weekly_metrics
+    WHERE tracked_phrase_id IS NULL AND entity_id IS NOT NULL AND id NOT IN (
+        SELECT MAX(id) FROM weekly_metrics
+        WHERE tracked_phrase_id IS NULL AND entity_id IS NOT NULL
+        GROUP BY brand_id, entity_id, week_starting
+    )
+    """
+]
+
+def add_weekly_metric_indexes():
+    """Create the WeeklyMetric / PhraseResult indexes that don't exist yet"""
+    with engine.begin() as conn:
+        for statement in DEDUPE_STATEMENTS:
+            removed = conn.execute(text(statement)).rowcount
+            print(f"[OK] Removed {removed} duplicate weekly metric rows")
+    
+    indexes = list(WeeklyMetric.__table__.indexes) + list(PhraseResult.__table__.indexes)
+    for index in indexes:
+        if not index.name.startswith(("idx_weekly_metric_", "ux_weekly_metric_", "idx_phrase_result_")):
+            continue
+        print(f"Creating {index.name}...")
+        index.create(bind=engine, checkfirst=True)
+        print(f"[OK] {index.name}")
+
+if __name__ == "__main__":
+    print("Starting weekly_metrics index migration...")
+    print("=" * 50)
+    
+    try:
+        add_weekly_metric_indexes()
+        print("\n[SUCCESS] Migration complete!")
+    except Exception as e:
+        print(f"\n[ERROR] Migration failed: {str(e)}")
+    
+    print("\n" + "=" * 50)
+    print("Migration script finished")
@@ -0,0 +1,66 @@
+"""
+Migration script to import the legacy per-(brand, vendor) weekly tracking
+JSON files from data/weekly_tracking into the weekly_tracking_points table
+Run this ONCE after upgrading; re-running bumps frequencies again
+"""
+
+import json
+from datetime import date
+from pathlib import Path
+
+from app.database import engine, SessionLocal
+from app.models import WeeklyTrackingPoint
+from app.api.weekly_tracking import upsert_tracking_points_stmt
+
+DATA_DIR = Path("data/weekly_tracking")
+
+def json_file_rows(data: dict) -> list:
+    """Flatten one legacy tracking file into weekly_tracking_points rows"""
+    brand_name = data["brand_name"]
+    vendor = data["vendor"]
+    rows = []
+    for entity, data_points in data.get("entity_tracking", {}).items():
+        for p in data_points:
+            rows.append({
+                "brand_name": brand_name, "vendor": vendor, "scope": "entity", "phrase": "",
+                "key": entity, "week_start": date.fromisoformat(p["week_start"]),
+                "rank": p["rank"], "frequency": p.get("frequency", 1)
+            })
+    for phrase, brands_data in data.get("phrase_tracking", {}).items():
+        for brand, data_points in brands_data.items():
+            for p in data_points:
+                rows.append({
+                    "brand_name": brand_name, "vendor": vendor, "scope": "phrase", "phrase": phrase,
+                    "key": brand, "week_start": date.fromisoformat(p["week_start"]),
+                    "rank": p["rank"], "frequency": p.get("frequency", 1)
+                })
+    return rows
+
+def import_weekly_tracking_json():
+    """Import every JSON file in DATA_DIR"""
+    WeeklyTrackingPoint.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        for file_path in sorted(DATA_DIR.glob("*.json")):
+            with open(file_path, 'r') as f:
+                rows = json_file_rows(json.load(f))
+            if rows:
+                db.execute(upsert_tracking_points_stmt(engine.dialect.name, rows))
+            db.commit()
+            print(f"[OK] {file_path.name}: {len(rows)} points")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Starting weekly tracking JSON import...")
+    print("=" * 50)
+    
+    try:
+        import_weekly_tracking_json()
+        print("\n[SUCCESS] Migration complete!")
+    except Exception as e:
+        print(f"\n[ERROR] Migration failed: {str(e)}")
+    
+    print("\n" + "=" * 50)
+    print("Migration script finished")
@@ -1,8 +1,6 @@
 """Populate countries table with initial data"""
-from sqlalchemy import create_engine, text
-from app.config import settings
-
-engine = create_engine(settings.database_url)
+from sqlalchemy import text
+from app.database import engine
 
 with engine.begin() as conn:
     # Insert default supported countries
@@ -11,4 +11,32 @@ if os.name == "nt":
         pass
 
 # Set UTF-8 encoding for all tests
-os.environ["PYTHONUTF8"] = "1"
\ No newline at end of file
+os.environ["PYTHONUTF8"] = "1"
+
+# app.cache (the Upstash client) is deployed separately and isn't in this tree.
+# Stand in an in-memory cache so modules that import it can be collected.
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import app.cache.upstash_cache  # noqa: F401
+except ImportError:
+    class _MemoryCache:
+        """Async get/set with the upstash_cache signature; ttl is ignored"""
+        def __init__(self):
+            self.store = {}
+
+        async def get(self, key):
+            return self.store.get(key)
+
+        async def set(self, key, value, ttl=None):
+            self.store[key] = value
+
+    _cache_pkg = types.ModuleType("app.cache")
+    _cache_pkg.__path__ = []
+    _cache_mod = types.ModuleType("app.cache.upstash_cache")
+    _cache_mod.cache = _MemoryCache()
+    _cache_pkg.upstash_cache = _cache_mod
+    sys.modules.setdefault("app.cache", _cache_pkg)
+    sys.modules.setdefault("app.cache.upstash_cache", _cache_mod)
@@ -0,0 +1,40 @@
+# tests/test_brand_matching.py
+"""
+Brand matching against extracted brand lists
+A found brand counts as ours only when our name appears in it, never the reverse
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.services.brand_matching import matches_brand
+
+@pytest.mark.parametrize("found,brand", [
+    ("Nike", "Nike"),
+    ("nike inc.", "Nike"),
+    ("Nike, Inc.", "Nike"),
+    ("Timeline Nutrition Ltd", "Timeline Nutrition"),
+    ("Timeline-Nutrition", "Timeline Nutrition"),
+])
+def test_found_brand_containing_ours_matches(found, brand):
+    """Our name inside a longer found variant is ours"""
+    assert matches_brand(found, [brand])
+
+@pytest.mark.parametrize("found,brand", [
+    ("Ni", "Nike"),
+    ("Timeline", "Timeline Nutrition"),
+    ("Ave", "Avea"),
+])
+def test_fragment_of_our_brand_does_not_match(found, brand):
+    """A found brand that is only a substring of ours is a competitor"""
+    assert not matches_brand(found, [brand])
+
+def test_any_alias_matches():
+    assert matches_brand("AVEA Life", ["Avea Life", "AVEA"])
+    assert not matches_brand("Adidas", ["Nike", "Nike Inc"])
+
+def test_empty_names_are_ignored():
+    assert not matches_brand("Nike", ["", None])
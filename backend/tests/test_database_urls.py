@@ -0,0 +1,29 @@
+# tests/test_database_urls.py
+"""
+Async engine URLs derived from DATABASE_URL
+Explicit sync drivers map to their async counterparts instead of failing at import
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from app.database import async_url_for
+
+@pytest.mark.parametrize("url,expected", [
+    ("postgresql://u:p@db:5432/app", "postgresql+asyncpg://u:p@db:5432/app"),
+    ("postgresql+psycopg2://u:p@db:5432/app", "postgresql+asyncpg://u:p@db:5432/app"),
+    ("postgresql://u:p@db/app?sslmode=require", "postgresql+asyncpg://u:p@db/app?ssl=require"),
+    ("postgresql+asyncpg://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+    ("sqlite:///./ai_ranker.db", "sqlite+aiosqlite:///./ai_ranker.db"),
+    ("sqlite+pysqlite:///./ai_ranker.db", "sqlite+aiosqlite:///./ai_ranker.db"),
+    ("sqlite+aiosqlite://", "sqlite+aiosqlite://"),
+])
+def test_async_url_for(url, expected):
+    assert async_url_for(make_url(url)).render_as_string(hide_password=False) == expected
+
+def test_unmapped_backend_has_no_async_url():
+    assert async_url_for(make_url("mssql+pyodbc://u:p@dsn")) is None
@@ -0,0 +1,47 @@
+# tests/test_entity_extractor_brands.py
+"""
+BRAND spans from EntityExtractor
+Offsets must index the original text, whichever matcher is in use
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import entity_extractor
+from app.core.entity_extractor import EntityExtractor
+
+BRAND_CACHE = {"acme": 1, "acme corp": 1, "globex": 2}
+
+@pytest.fixture(params=["automaton", "regex"])
+def extractor(request, monkeypatch):
+    """Extractor over BRAND_CACHE without a database or spaCy pipeline"""
+    if request.param == "automaton":
+        pytest.importorskip("ahocorasick")
+    else:
+        monkeypatch.setattr(entity_extractor, "AHOCORASICK_AVAILABLE", False)
+    extractor = EntityExtractor.__new__(EntityExtractor)
+    extractor.brand_cache = dict(BRAND_CACHE)
+    extractor.brand_matcher = extractor._build_brand_matcher()
+    extractor._brand_regex_ci = None
+    return extractor
+
+def _brands(extractor, text):
+    entities = extractor._extract_from_doc(text, SimpleNamespace(ents=[]))
+    return [(e["text"], e["start"], e["end"]) for e in entities if e["label"] == "BRAND"]
+
+def test_longest_match_wins(extractor):
+    text = "Try ACME Corp or Globex."
+    assert _brands(extractor, text) == [("ACME Corp", 4, 13), ("Globex", 17, 23)]
+
+def test_spans_survive_length_changing_lowercase(extractor):
+    """'İ'.lower() is two code points; later spans must still slice the original text"""
+    text = "İstanbul: Acme, then GLOBEX"
+    assert len(text.lower()) != len(text)
+    brands = _brands(extractor, text)
+    assert brands == [("Acme", 10, 14), ("GLOBEX", 21, 27)]
+    assert all(text[start:end] == found for found, start, end in brands)
@@ -0,0 +1,85 @@
+# tests/test_openai_required_grounding.py
+"""
+REQUIRED grounding on the raw Responses path
+Without tool_choice:"required" the adapter falls back to "auto" plus a provoker retry
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from types import SimpleNamespace
+
+import httpx
+import orjson
+import pytest
+
+from app.llm.adapters import openai_production
+from app.llm.adapters.openai_production import OpenAIProductionAdapter
+from app.llm.adapters.types import RunRequest, GroundingMode
+
+MESSAGE = {"type": "message", "content": [{"type": "output_text", "text": '{"vat": "20%"}'}]}
+UNGROUNDED_BODY = {"output": [MESSAGE]}
+GROUNDED_BODY = {"output": [{"type": "web_search_call", "status": "completed"}, MESSAGE]}
+
+class _ScriptedHTTP:
+    """Answers the capability probe with 400 and real calls from a script of bodies"""
+    def __init__(self, bodies, on_call=None):
+        self.bodies = list(bodies)
+        self.sent = []
+        self.on_call = on_call
+
+    async def post(self, url, headers=None, content=None, timeout=None):
+        if timeout is not None:  # capability probe
+            return self._response(400, {"error": {"message": "tool_choice required unsupported"}})
+        self.sent.append(orjson.loads(content))
+        if self.on_call:
+            self.on_call()
+        return self._response(200, self.bodies.pop(0))
+
+    @staticmethod
+    def _response(status, body):
+        payload = orjson.dumps(body)
+        return SimpleNamespace(
+            status_code=status, http_version="HTTP/1.1", content=payload,
+            text=payload.decode(), headers=httpx.Headers()
+        )
+
+def _req() -> RunRequest:
+    return RunRequest(
+        run_id="r1", client_id="c", provider="openai", model_name="gpt-4o",
+        grounding_mode=GroundingMode.REQUIRED, user_prompt="VAT rate?",
+        schema={"name": "x", "schema": {"type": "object"}}
+    )
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setattr(openai_production, "_PROBE_CACHE", {})
+    return OpenAIProductionAdapter(api_key="test-key")
+
+def _use(monkeypatch, http):
+    monkeypatch.setattr(openai_production, "_shared_http_client", lambda: http)
+
+@pytest.mark.asyncio
+async def test_auto_fallback_retries_with_provoker(adapter, monkeypatch):
+    http = _ScriptedHTTP([UNGROUNDED_BODY, GROUNDED_BODY])
+    _use(monkeypatch, http)
+
+    result = await adapter.run_async(_req())
+
+    assert result.grounded_effective and result.tool_call_count == 1
+    assert [body["tool_choice"] for body in http.sent] == ["auto", "auto"]
+
+@pytest.mark.asyncio
+async def test_provoker_not_skipped_by_another_requests_probe(adapter, monkeypatch):
+    """A probe for another model family finishing mid-request flips the shared flag"""
+    def concurrent_probe():
+        adapter.supports_required_toolchoice = True
+
+    http = _ScriptedHTTP([UNGROUNDED_BODY, GROUNDED_BODY], on_call=concurrent_probe)
+    _use(monkeypatch, http)
+
+    result = await adapter.run_async(_req())
+
+    assert result.grounded_effective
+    assert len(http.sent) == 2
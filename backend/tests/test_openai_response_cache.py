@@ -0,0 +1,147 @@
+# tests/test_openai_response_cache.py
+"""
+Deterministic-result caching in OpenAIProductionAdapter
+OFF results live 24h, PREFERRED (web search) 10 minutes, REQUIRED never
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from types import SimpleNamespace
+
+import httpx
+import orjson
+import pytest
+
+from app.llm.adapters import openai_production
+from app.llm.adapters.openai_production import (
+    OpenAIProductionAdapter,
+    RESPONSES_CACHE_TTL,
+    RESPONSES_GROUNDED_CACHE_TTL,
+)
+from app.llm.adapters.types import RunRequest, GroundingMode
+
+GROUNDED_BODY = {
+    "output": [
+        {"type": "web_search_call", "status": "completed"},
+        {"type": "message", "content": [{"type": "output_text", "text": '{"vat": "20%"}'}]}
+    ],
+    "usage": {"input_tokens": 5, "output_tokens": 3}
+}
+
+class _DictCache:
+    """In-memory stand-in for the Upstash cache, recording every write's TTL"""
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+class _FakeHTTP:
+    """Shared raw Responses client answering every POST with GROUNDED_BODY"""
+    def __init__(self):
+        self.posts = 0
+
+    async def post(self, url, headers=None, content=None, timeout=None):
+        self.posts += 1
+        return SimpleNamespace(
+            status_code=200, http_version="HTTP/1.1", content=orjson.dumps(GROUNDED_BODY),
+            text="", headers=httpx.Headers()
+        )
+
+def _req(mode: GroundingMode, prompt: str = "VAT rate?", run_id: str = "r1") -> RunRequest:
+    return RunRequest(
+        run_id=run_id, client_id="c", provider="openai", model_name="gpt-4o",
+        grounding_mode=mode, user_prompt=prompt, schema={"name": "x", "schema": {"type": "object"}}
+    )
+
+@pytest.fixture
+def cache():
+    return _DictCache()
+
+@pytest.fixture
+def adapter(cache):
+    return OpenAIProductionAdapter(api_key="test-key", response_cache=cache)
+
+@pytest.fixture
+def http(monkeypatch):
+    fake = _FakeHTTP()
+    monkeypatch.setattr(openai_production, "_shared_http_client", lambda: fake)
+    monkeypatch.setattr(openai_production, "_PROBE_CACHE", {})
+    return fake
+
+@pytest.fixture
+def sdk_calls(adapter):
+    calls = []
+
+    async def create_response(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(output_text='{"vat": "20%"}', output=[], usage=None)
+
+    adapter._create_response = create_response
+    return calls
+
+def test_response_cache_key_covers_output_shaping_fields(adapter):
+    req = _req(GroundingMode.OFF)
+    kwargs = adapter._build_sdk_kwargs(req, needs_grounding=False)
+    key = adapter._response_cache_key(kwargs, req)
+
+    assert key.startswith(openai_production.RESPONSES_CACHE_PREFIX)
+    assert key == adapter._response_cache_key(dict(kwargs), req)
+    assert key != adapter._response_cache_key({**kwargs, "model": "gpt-4o-mini"}, req)
+    other = _req(GroundingMode.OFF, prompt="Plug type?")
+    assert key != adapter._response_cache_key(adapter._build_sdk_kwargs(other, False), other)
+
+def test_grounded_cache_key_depends_on_mode_and_prompt(adapter):
+    key = adapter._grounded_cache_key(_req(GroundingMode.PREFERRED), 0, 512)
+
+    assert key == adapter._grounded_cache_key(_req(GroundingMode.PREFERRED, run_id="r2"), 0, 512)
+    assert key != adapter._grounded_cache_key(_req(GroundingMode.REQUIRED), 0, 512)
+    assert key != adapter._grounded_cache_key(_req(GroundingMode.PREFERRED, prompt="Other?"), 0, 512)
+    assert key != adapter._grounded_cache_key(_req(GroundingMode.PREFERRED), 0, 1024)
+
+@pytest.mark.asyncio
+async def test_off_results_cached_for_a_day(adapter, cache, sdk_calls):
+    first = await adapter.run_async(_req(GroundingMode.OFF))
+    second = await adapter.run_async(_req(GroundingMode.OFF, run_id="r2"))
+
+    assert len(sdk_calls) == 1
+    assert list(cache.ttls.values()) == [RESPONSES_CACHE_TTL] == [24 * 60 * 60]
+    assert "cache_hit" not in first.meta
+    assert second.meta["cache_hit"] is True
+    assert second.run_id == "r2"
+    assert second.json_obj == first.json_obj
+
+@pytest.mark.asyncio
+async def test_preferred_results_cached_for_ten_minutes(adapter, cache, http):
+    first = await adapter.run_async(_req(GroundingMode.PREFERRED))
+    second = await adapter.run_async(_req(GroundingMode.PREFERRED, run_id="r2"))
+
+    assert http.posts == 1
+    assert list(cache.ttls.values()) == [RESPONSES_GROUNDED_CACHE_TTL] == [10 * 60]
+    assert first.grounded_effective and second.meta["cache_hit"] is True
+
+@pytest.mark.asyncio
+async def test_required_is_never_cached(adapter, cache, http):
+    await adapter.run_async(_req(GroundingMode.REQUIRED))
+    await adapter.run_async(_req(GroundingMode.REQUIRED, run_id="r2"))
+
+    assert http.posts == 3  # one capability probe, then both calls hit the API
+    assert cache.store == {}
+
+@pytest.mark.asyncio
+async def test_runs_uncached_without_a_cache(monkeypatch, http):
+    monkeypatch.setattr(openai_production, "_default_response_cache", lambda: None)
+    adapter = OpenAIProductionAdapter(api_key="test-key")
+
+    await adapter.run_async(_req(GroundingMode.PREFERRED))
+    result = await adapter.run_async(_req(GroundingMode.PREFERRED, run_id="r2"))
+
+    assert http.posts == 2
+    assert "cache_hit" not in result.meta
@@ -0,0 +1,164 @@
+# tests/test_openai_retries.py
+"""
+Retry loops in OpenAIProductionAdapter (_post_responses, _create_response)
+Transient failures are retried up to max_retries (honouring retry-after); other errors are not
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import BadRequestError, InternalServerError, RateLimitError
+
+from app.llm.adapters import openai_production
+from app.llm.adapters.openai_production import OpenAIProductionAdapter
+
+BODY = {"model": "gpt-4o", "input": "VAT rate?", "max_output_tokens": 64}
+RESPONSES_REQUEST = httpx.Request("POST", openai_production.RESPONSES_URL)
+
+def _api_error(cls, status: int, headers=None):
+    response = httpx.Response(status, headers=headers, request=RESPONSES_REQUEST)
+    return cls(f"HTTP {status}", response=response, body=None)
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays requested by the adapter, without actually waiting"""
+    delays = []
+
+    async def sleep(delay, result=None):
+        delays.append(delay)
+        return result
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return delays
+
+@pytest.fixture
+def adapter():
+    return OpenAIProductionAdapter(api_key="test-key", max_retries=2)
+
+def _serve(monkeypatch, *outcomes):
+    """Raw Responses client answering with outcomes in turn (the last one repeats)"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        outcome = outcomes[min(len(requests), len(outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(openai_production, "_shared_http_client", lambda: client)
+    return requests
+
+@pytest.mark.asyncio
+async def test_post_honours_retry_after_on_429(adapter, sleeps, monkeypatch):
+    requests = _serve(monkeypatch, httpx.Response(429, headers={"retry-after": "7"}), httpx.Response(200, json={}))
+
+    response = await adapter._post_responses(BODY)
+
+    assert response.status_code == 200
+    assert len(requests) == 2
+    assert len(sleeps) == 1 and 7 <= sleeps[0] <= 8
+
+@pytest.mark.asyncio
+async def test_post_returns_last_5xx_after_max_retries(adapter, sleeps, monkeypatch):
+    requests = _serve(monkeypatch, httpx.Response(502), httpx.Response(503))
+
+    response = await adapter._post_responses(BODY)
+
+    assert response.status_code == 503
+    assert len(requests) == adapter.max_retries + 1
+    assert len(sleeps) == adapter.max_retries
+
+@pytest.mark.asyncio
+async def test_post_raises_connect_error_after_max_retries(adapter, sleeps, monkeypatch):
+    requests = _serve(monkeypatch, httpx.ConnectError("connection refused"))
+
+    with pytest.raises(httpx.ConnectError):
+        await adapter._post_responses(BODY)
+
+    assert len(requests) == adapter.max_retries + 1
+    assert len(sleeps) == adapter.max_retries
+
+@pytest.mark.asyncio
+async def test_post_recovers_from_connect_error(adapter, sleeps, monkeypatch):
+    requests = _serve(monkeypatch, httpx.ConnectError("connection reset"), httpx.Response(200, json={}))
+
+    response = await adapter._post_responses(BODY)
+
+    assert response.status_code == 200
+    assert len(requests) == 2
+
+@pytest.mark.asyncio
+async def test_post_returns_400_immediately(adapter, sleeps, monkeypatch):
+    requests = _serve(monkeypatch, httpx.Response(400, json={"error": {"message": "bad schema"}}))
+
+    response = await adapter._post_responses(BODY)
+
+    assert response.status_code == 400
+    assert len(requests) == 1
+    assert sleeps == []
+
+def _sdk_raising(adapter, *outcomes):
+    """async_client.responses.create raising/returning outcomes in turn (the last one repeats)"""
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    adapter.async_client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    return calls
+
+@pytest.mark.asyncio
+async def test_sdk_honours_retry_after_on_rate_limit(adapter, sleeps):
+    calls = _sdk_raising(adapter, _api_error(RateLimitError, 429, {"retry-after": "5"}), "ok")
+
+    assert await adapter._create_response(**BODY) == "ok"
+    assert len(calls) == 2
+    assert len(sleeps) == 1 and sleeps[0] >= 5
+
+@pytest.mark.asyncio
+async def test_sdk_raises_5xx_after_max_retries(adapter, sleeps):
+    calls = _sdk_raising(adapter, _api_error(InternalServerError, 500))
+
+    with pytest.raises(InternalServerError):
+        await adapter._create_response(**BODY)
+
+    assert len(calls) == adapter.max_retries + 1
+    assert len(sleeps) == adapter.max_retries
+
+@pytest.mark.asyncio
+async def test_sdk_raises_400_immediately(adapter, sleeps):
+    calls = _sdk_raising(adapter, _api_error(BadRequestError, 400))
+
+    with pytest.raises(BadRequestError):
+        await adapter._create_response(**BODY)
+
+    assert len(calls) == 1
+    assert sleeps == []
+
+def test_sync_rate_limits_clamps_buckets(adapter):
+    adapter._sync_rate_limits(httpx.Headers({
+        "x-ratelimit-remaining-requests": "3",
+        "x-ratelimit-remaining-tokens": "1200"
+    }))
+    assert adapter._rpm_bucket.tokens == 3
+    assert adapter._tpm_bucket.tokens == 1200
+
+    # Never raised above what the bucket already holds; junk values are ignored
+    adapter._sync_rate_limits(httpx.Headers({
+        "x-ratelimit-remaining-requests": "500",
+        "x-ratelimit-remaining-tokens": "n/a"
+    }))
+    assert adapter._rpm_bucket.tokens == 3
+    assert adapter._tpm_bucket.tokens == 1200
@@ -0,0 +1,49 @@
+# tests/test_openai_run_batch_async.py
+"""
+OpenAIProductionAdapter.run_batch_async
+One failing request becomes an error RunResult; the rest of the sweep still comes back
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+from app.llm.adapters import openai_adapter
+from app.llm.adapters.openai_production import OpenAIProductionAdapter
+from app.llm.adapters.types import RunRequest, GroundingMode
+
+def _req(run_id: str, prompt: str) -> RunRequest:
+    return RunRequest(
+        run_id=run_id, client_id="c", provider="openai", model_name="gpt-4o",
+        grounding_mode=GroundingMode.OFF, user_prompt=prompt
+    )
+
+@pytest.mark.asyncio
+async def test_one_failure_does_not_lose_the_batch(monkeypatch):
+    finished = []
+
+    async def run(client, *, prompt, **kwargs):
+        if prompt == "bad":
+            raise RuntimeError("400 invalid_request_error")
+        await asyncio.sleep(0.01)  # still running when the failure is raised
+        finished.append(prompt)
+        return {
+            "text": f"answer to {prompt}", "grounded_effective": False, "tool_call_count": 0,
+            "soft_required": False, "tool_choice_sent": "none", "why_not_grounded": None, "status": "completed"
+        }
+
+    monkeypatch.setattr(openai_adapter, "run_openai_with_grounding_async", run)
+    adapter = OpenAIProductionAdapter(api_key="test-key")
+
+    results = await adapter.run_batch_async([_req("1", "a"), _req("2", "bad"), _req("3", "c")])
+
+    assert [r.run_id for r in results] == ["1", "2", "3"]
+    assert [r.json_text for r in (results[0], results[2])] == ["answer to a", "answer to c"]
+    assert results[0].error is None
+    assert results[1].error == "400 invalid_request_error"
+    assert results[1].meta["failed"] is True
+    assert sorted(finished) == ["a", "c"]
@@ -0,0 +1,106 @@
+# tests/test_openai_semantic_cache.py
+"""
+Near-duplicate prompt reuse (OpenAIProductionAdapter(semantic_cache=True))
+Hits need cosine similarity at or above the threshold within the same scope
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.llm.adapters.openai_production import OpenAIProductionAdapter, _SemanticCache
+from app.llm.adapters.types import RunRequest, RunResult, GroundingMode
+
+SCOPE = ("gpt-4o", "OFF", None, None, None)
+
+def _unit(*components) -> np.ndarray:
+    vector = np.asarray(components, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def _result(run_id: str) -> RunResult:
+    return RunResult(
+        run_id=run_id, provider="openai", model_name="gpt-4o", region=None,
+        grounded_effective=False, tool_call_count=0, citations=[], json_text="Paris",
+        json_obj=None, json_valid=False, latency_ms=0, error=None
+    )
+
+def _req(run_id: str, prompt: str) -> RunRequest:
+    return RunRequest(
+        run_id=run_id, client_id="c", provider="openai", model_name="gpt-4o",
+        grounding_mode=GroundingMode.OFF, user_prompt=prompt
+    )
+
+def test_hit_at_or_above_threshold():
+    cache = _SemanticCache(threshold=0.95)
+    cache.add(SCOPE, _unit(1, 0), _result("1"))
+
+    result, similarity = cache.lookup(SCOPE, _unit(1, 0.1))
+
+    assert result.run_id == "1"
+    assert similarity == pytest.approx(0.995, abs=1e-3)
+
+def test_miss_below_threshold():
+    cache = _SemanticCache(threshold=0.95)
+    cache.add(SCOPE, _unit(1, 0), _result("1"))
+
+    assert cache.lookup(SCOPE, _unit(1, 0.5)) is None  # cosine ~0.894
+
+def test_scopes_are_isolated():
+    cache = _SemanticCache(threshold=0.95)
+    cache.add(SCOPE, _unit(1, 0), _result("1"))
+
+    assert cache.lookup(("gpt-4o", "PREFERRED", None, None, None), _unit(1, 0)) is None
+    assert cache.lookup(("gpt-4o-mini",) + SCOPE[1:], _unit(1, 0)) is None
+
+def test_oldest_entries_evicted_past_max_entries():
+    cache = _SemanticCache(threshold=0.99, max_entries=2)
+    for run_id, vector in (("1", _unit(1, 0, 0)), ("2", _unit(0, 1, 0)), ("3", _unit(0, 0, 1))):
+        cache.add(SCOPE, vector, _result(run_id))
+
+    assert cache.lookup(SCOPE, _unit(1, 0, 0)) is None
+    assert cache.lookup(SCOPE, _unit(0, 1, 0))[0].run_id == "2"
+    assert cache.lookup(SCOPE, _unit(0, 0, 1))[0].run_id == "3"
+
+@pytest.fixture
+def adapter():
+    adapter = OpenAIProductionAdapter(api_key="test-key", semantic_cache=True)
+    adapter.runs = []
+
+    async def run(req):
+        adapter.runs.append(req.run_id)
+        return _result(req.run_id)
+
+    adapter._run_async = run
+    return adapter
+
+@pytest.mark.asyncio
+async def test_near_duplicate_prompt_reuses_result(adapter):
+    async def embed(model, input):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[1.0, 0.0])])
+
+    adapter.async_client = SimpleNamespace(embeddings=SimpleNamespace(create=embed))
+    rpm_before = adapter._rpm_bucket.tokens
+
+    await adapter.run_async(_req("1", "Capital of France?"))
+    second = await adapter.run_async(_req("2", "capital of  france?"))
+
+    assert adapter.runs == ["1"]
+    assert second.run_id == "2" and second.meta["semantic_cache_hit"] is True
+    assert adapter._rpm_bucket.tokens < rpm_before  # embeddings count against the RPM limit
+
+@pytest.mark.asyncio
+async def test_embedding_failure_runs_uncached(adapter):
+    async def embed(model, input):
+        raise ValueError("embeddings unavailable")
+
+    adapter.async_client = SimpleNamespace(embeddings=SimpleNamespace(create=embed))
+
+    result = await adapter.run_async(_req("1", "Capital of France?"))
+
+    assert adapter.runs == ["1"]
+    assert result.error is None
@@ -0,0 +1,91 @@
+# tests/test_openai_shared_clients.py
+"""
+Pooled clients and asyncio primitives shared by OpenAIProductionAdapter
+Connections, semaphores and locks are bound to the loop that uses them, so each event loop gets its own
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from types import SimpleNamespace
+
+from app.llm.adapters import openai_production
+from app.llm.adapters.openai_production import OpenAIProductionAdapter, _TokenBucket, aclose_shared_clients
+
+def test_async_client_shared_within_a_loop():
+    async def clients():
+        a = OpenAIProductionAdapter(api_key="test-key")
+        b = OpenAIProductionAdapter(api_key="test-key")
+        other = OpenAIProductionAdapter(api_key="other-key")
+        pair = (a.async_client, b.async_client, other.async_client)
+        await aclose_shared_clients()
+        return pair
+
+    first, second, other = asyncio.run(clients())
+    assert first is second
+    assert other is not first
+
+def test_async_client_not_reused_across_loops():
+    """Sync bridges run each call on a fresh loop, which must not inherit closed-loop connections"""
+    adapter = OpenAIProductionAdapter(api_key="test-key")
+
+    async def client():
+        return adapter.async_client
+
+    first = asyncio.run(client())
+    second = asyncio.run(client())
+    assert first is not second
+
+def test_aclose_releases_the_loop_clients():
+    async def close():
+        OpenAIProductionAdapter(api_key="test-key").async_client
+        await aclose_shared_clients()
+        return asyncio.get_running_loop() in openai_production._ASYNC_CLIENTS
+
+    assert asyncio.run(close()) is False
+
+def test_injected_async_client_wins():
+    adapter = OpenAIProductionAdapter(api_key="test-key")
+    injected = object()
+    adapter.async_client = injected
+    assert adapter.async_client is injected
+
+def test_http_client_per_loop_and_closed_with_it():
+    async def client():
+        shared = openai_production._shared_http_client()
+        assert openai_production._shared_http_client() is shared
+        await aclose_shared_clients()
+        return shared
+
+    first = asyncio.run(client())
+    second = asyncio.run(client())
+    assert first is not second
+    assert first.is_closed and second.is_closed
+
+def test_contended_burst_on_successive_loops():
+    """One long-lived adapter driven from a fresh loop per call, as the sync orchestrator bridge does"""
+    adapter = OpenAIProductionAdapter(api_key="test-key", max_concurrent_requests=1)
+
+    async def create(**kwargs):
+        await asyncio.sleep(0.01)
+        return kwargs["input"]
+
+    adapter.async_client = SimpleNamespace(responses=SimpleNamespace(create=create))
+
+    async def burst():
+        return await asyncio.gather(*(adapter._create_response(model="gpt-4o", input=str(i)) for i in range(3)))
+
+    assert asyncio.run(burst()) == ["0", "1", "2"]
+    assert asyncio.run(burst()) == ["0", "1", "2"]
+
+def test_token_bucket_contended_on_successive_loops():
+    bucket = _TokenBucket(600)
+
+    async def burst():
+        bucket.tokens = 0  # every acquire waits inside the lock, so the others contend it
+        await asyncio.gather(*(bucket.acquire(0.1) for _ in range(3)))
+
+    asyncio.run(burst())
+    asyncio.run(burst())
@@ -0,0 +1,79 @@
+# tests/test_scorer.py
+"""
+Scorer metrics from the grouped _aggregate query, on SQLite
+A completion counts once however many brand aliases it mentions; avg_rank uses its best rank
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Prompt, Completion, Mention, Entity
+from app.core.scorer import Scorer
+
+BRAND_ID = 1
+RUN_ID = 1
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        _seed(session)
+        yield session
+    engine.dispose()
+
+def _seed(db):
+    db.add_all([
+        Entity(id=BRAND_ID, label="Acme"),
+        Entity(id=2, label="ACME Corp", canonical_id=BRAND_ID),
+        Entity(id=3, label="Acme Inc", canonical_id=BRAND_ID),
+        Entity(id=4, label="Globex"),
+    ])
+    # prompt input_text -> completions, each a list of (entity_id, rank_pos)
+    prompts = [
+        (RUN_ID, "best widgets?", [[(2, 3), (3, 1), (4, 2)], [(4, 1)]]),  # two aliases: one mention, best rank 1
+        (RUN_ID, "best widgets?", [[(3, None)]]),                        # mentioned, but unranked
+        (RUN_ID, "cheap widgets?", [[(2, 4)], []]),
+        (RUN_ID, "cheap widgets?", []),                                  # no completions: ignored
+        (2, "best widgets?", [[(2, 1)]]),                                # another run
+    ]
+    for run_id, text, completions in prompts:
+        prompt = Prompt(run_id=run_id, input_text=text)
+        db.add(prompt)
+        db.flush()
+        for mentions in completions:
+            completion = Completion(prompt_id=prompt.id, text="...")
+            db.add(completion)
+            db.flush()
+            db.add_all([
+                Mention(completion_id=completion.id, entity_id=entity_id, rank_pos=rank)
+                for entity_id, rank in mentions
+            ])
+    db.commit()
+
+def test_mention_rate(db):
+    rate, ci_low, ci_high = Scorer(db).calculate_mention_rate(BRAND_ID, RUN_ID)
+
+    assert rate == pytest.approx(3 / 5)
+    assert ci_low < rate < ci_high
+
+def test_avg_rank_uses_best_ranked_mention_per_completion(db):
+    """Ranks 1 (best of 3 and 1) and 4; the NULL-rank completion is left out"""
+    assert Scorer(db).calculate_avg_rank(BRAND_ID, RUN_ID) == pytest.approx(2.5)
+
+def test_stability_groups_prompts_by_text(db):
+    """Rates 2/3 and 1/2: cv = (1/12) / (7/12)"""
+    assert Scorer(db).calculate_stability(BRAND_ID, RUN_ID) == pytest.approx(1 - 1 / 7)
+
+def test_run_without_mentions(db):
+    scorer = Scorer(db)
+    assert scorer.calculate_mention_rate(BRAND_ID, run_id=99) == (0.0, 0.0, 0.0)
+    assert scorer.calculate_avg_rank(BRAND_ID, run_id=99) == float("inf")
+    assert scorer.calculate_stability(BRAND_ID, run_id=99) == 1.0
@@ -0,0 +1,165 @@
+# tests/test_weekly_aggregator_queries.py
+"""
+Query-count budgets and values for WeeklyAggregator
+Guards against per-phrase / per-row queries creeping back into the aggregation,
+and against PHRASE_METRICS_SQL regressing the metric values it writes
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Brand, TrackedPhrase, PhraseResult, WeeklyMetric
+from app.core.weekly_aggregator import WeeklyAggregator
+
+# Brand-resolution/aggregation SELECT + upsert, with headroom
+PHRASE_METRICS_QUERY_BUDGET = 5
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture
+def statements(engine):
+    """Every SQL statement sent to the database while the test runs"""
+    log = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        log.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield log
+    event.remove(engine, "before_cursor_execute", record)
+
+def _seed(db, phrases: int, results_per_phrase: int) -> int:
+    brand = Brand(name="Acme", aliases=["ACME Corp"])
+    competitors = [Brand(name=f"Competitor {i}", aliases=[]) for i in range(5)]
+    db.add_all([brand, *competitors])
+    db.flush()
+
+    now = datetime.now()
+    for p in range(phrases):
+        phrase = TrackedPhrase(brand_id=brand.id, phrase=f"phrase {p}", is_active=True)
+        db.add(phrase)
+        db.flush()
+        db.add_all([
+            PhraseResult(
+                tracked_phrase_id=phrase.id,
+                run_id=1,
+                brands_found=["acme corp", competitors[r % 5].name, "Unknown"],
+                created_at=now - timedelta(days=r)
+            )
+            for r in range(results_per_phrase)
+        ])
+    db.commit()
+    return brand.id
+
+def _assert_no_repeated_statements(log):
+    """The same SQL differing only in parameters is the N+1 signature"""
+    repeated = {sql: n for sql, n in Counter(log).items() if n > 1}
+    assert not repeated, f"statements issued more than once: {list(repeated)}"
+
+@pytest.mark.parametrize("phrases,results_per_phrase", [(1, 1), (3, 10), (25, 40)])
+def test_phrase_metrics_query_budget(db, statements, phrases, results_per_phrase):
+    """aggregate_phrase_metrics stays within budget however many rows it covers"""
+    brand_id = _seed(db, phrases, results_per_phrase)
+    statements.clear()
+
+    WeeklyAggregator(db).aggregate_phrase_metrics(brand_id)
+
+    assert len(statements) <= PHRASE_METRICS_QUERY_BUDGET, statements
+    _assert_no_repeated_statements(statements)
+    assert db.query(WeeklyMetric).count() > 0
+
+def test_phrase_metrics_query_count_independent_of_size(db, statements):
+    """Ten times the phrases must not mean more queries"""
+    small_brand = _seed(db, phrases=2, results_per_phrase=5)
+    statements.clear()
+    WeeklyAggregator(db).aggregate_phrase_metrics(small_brand)
+    small = len(statements)
+
+    db.query(PhraseResult).delete()
+    db.query(TrackedPhrase).delete()
+    db.query(Brand).delete()
+    db.commit()
+
+    large_brand = _seed(db, phrases=20, results_per_phrase=5)
+    statements.clear()
+    WeeklyAggregator(db).aggregate_phrase_metrics(large_brand)
+
+    assert len(statements) == small, statements
+
+def test_phrase_metrics_rerun_updates_in_place(db, statements):
+    """A second run upserts the same keys instead of adding rows"""
+    brand_id = _seed(db, phrases=3, results_per_phrase=10)
+    aggregator = WeeklyAggregator(db)
+
+    aggregator.aggregate_phrase_metrics(brand_id)
+    first = db.query(WeeklyMetric).count()
+    statements.clear()
+    aggregator.aggregate_phrase_metrics(brand_id)
+
+    assert db.query(WeeklyMetric).count() == first
+    assert len(statements) <= PHRASE_METRICS_QUERY_BUDGET, statements
+
+def test_phrase_metrics_without_results_only_reads(db, statements):
+    """Dormant phrases cost the aggregation SELECT and nothing else"""
+    brand_id = _seed(db, phrases=3, results_per_phrase=0)
+    statements.clear()
+
+    written = WeeklyAggregator(db).aggregate_phrase_metrics(brand_id)
+
+    assert written == 0
+    assert len(statements) == 1, statements
+    assert db.query(WeeklyMetric).count() == 0
+
+def test_phrase_metrics_values(db):
+    """Brand resolution, Monday weeks, frequency, average position and score from the SQL"""
+    acme = Brand(name="Acme", aliases=[])
+    globex = Brand(name="Globex", aliases=["Globex Corp", "Initech"])
+    initech = Brand(name="Initech", aliases=[])  # its name beats Globex's alias
+    db.add_all([acme, globex, initech])
+    db.flush()
+    phrase = TrackedPhrase(brand_id=acme.id, phrase="best widgets", is_active=True)
+    db.add(phrase)
+    db.flush()
+    db.add_all([
+        PhraseResult(tracked_phrase_id=phrase.id, run_id=1, brands_found=brands, created_at=created_at)
+        for brands, created_at in (
+            (["Globex Corp", "Acme", "Initech"], datetime(2025, 3, 10, 9)),   # Monday
+            (["initech", "Unknown", "GLOBEX"], datetime(2025, 3, 16, 18)),    # Sunday, same week
+            (["Globex"], datetime(2025, 3, 18, 12)),                         # next week
+        )
+    ])
+    db.commit()
+
+    WeeklyAggregator(db, as_of=datetime(2025, 3, 20)).aggregate_phrase_metrics(acme.id)
+
+    names = {acme.id: "Acme", globex.id: "Globex", initech.id: "Initech"}
+    metrics = {
+        (str(m.week_starting)[:10], names[m.competitor_brand_id]): (m.frequency, m.rank_position, round(m.weighted_score, 4))
+        for m in db.query(WeeklyMetric).all()
+    }
+    assert metrics == {
+        ("2025-03-10", "Globex"): (2, 2, 0.18),    # positions 1 and 3
+        ("2025-03-10", "Initech"): (2, 2, 0.18),   # positions 3 and 1
+        ("2025-03-10", "Acme"): (1, 2, 0.09),
+        ("2025-03-17", "Globex"): (1, 1, 0.1),
+    }
@@ -0,0 +1,144 @@
+# tests/test_weekly_tracking.py
+"""
+Weekly tracking storage on SQLite
+Upserts bump frequency, GET responses are rebuilt once the data changes,
+and the vectorized per-series stats match a plain mean/variance
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contextlib import asynccontextmanager
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api import weekly_tracking
+from app.api.weekly_tracking import (
+    WeeklyTrackingRequest,
+    get_weekly_tracking,
+    grouped_rank_stats,
+    update_weekly_tracking,
+    upsert_tracking_points,
+)
+from app.database import Base
+from app.models import WeeklyTrackingPoint
+
+@asynccontextmanager
+async def _session():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            yield db
+    finally:
+        await engine.dispose()
+
+@pytest.fixture(autouse=True)
+def empty_tracking_cache(monkeypatch):
+    monkeypatch.setattr(weekly_tracking, "_tracking_cache", weekly_tracking.OrderedDict())
+
+def _update(entity_rankings, brand_rankings=None) -> WeeklyTrackingRequest:
+    return WeeklyTrackingRequest(
+        brand_name="Acme", vendor="openai",
+        entity_rankings=entity_rankings, brand_rankings=brand_rankings or {}
+    )
+
+def _row(key: str, rank: int, week: date = date(2025, 1, 6)) -> dict:
+    return {
+        "brand_name": "Acme", "vendor": "openai", "scope": "entity", "phrase": "",
+        "key": key, "week_start": week, "rank": rank, "frequency": 1
+    }
+
+async def _points(db):
+    return (await db.execute(
+        select(WeeklyTrackingPoint.key, WeeklyTrackingPoint.rank, WeeklyTrackingPoint.frequency)
+        .order_by(WeeklyTrackingPoint.key)
+    )).all()
+
+@pytest.mark.asyncio
+async def test_repeated_point_bumps_frequency():
+    """Same point in the same week: rank is overwritten, frequency counts the updates"""
+    async with _session() as db:
+        await update_weekly_tracking(_update({"vitamins": 3}, {"best supplements": {"Globex": 2}}), db)
+        await update_weekly_tracking(_update({"vitamins": 5}, {"best supplements": {"Globex": 2}}), db)
+
+        assert await _points(db) == [("Globex", 2, 2), ("vitamins", 5, 2)]
+
+@pytest.mark.asyncio
+async def test_duplicate_keys_in_one_payload_land_as_one_row():
+    """Last occurrence wins instead of the batch hitting the same row twice"""
+    async with _session() as db:
+        await upsert_tracking_points(db, [_row("vitamins", 3), _row("health", 4), _row("vitamins", 7)])
+        await db.commit()
+
+        assert await _points(db) == [("health", 4, 1), ("vitamins", 7, 1)]
+
+@pytest.mark.asyncio
+async def test_get_is_cached_until_a_write():
+    async with _session() as db:
+        await update_weekly_tracking(_update({"vitamins": 3}), db)
+        first = await get_weekly_tracking("Acme", "openai", db)
+        assert await get_weekly_tracking("Acme", "openai", db) is first
+
+        await update_weekly_tracking(_update({"vitamins": 1}), db)
+        second = await get_weekly_tracking("Acme", "openai", db)
+
+        assert second is not first
+        assert second.entity_tracking[0].total_frequency == 2
+        assert second.entity_tracking[0].data_points[0].rank == 1
+
+@pytest.mark.asyncio
+async def test_cache_stamp_catches_writes_that_bypass_the_endpoint():
+    """Another worker's upsert never touches this process's cache; the stamp must notice"""
+    async with _session() as db:
+        await upsert_tracking_points(db, [_row("vitamins", 3)])
+        await db.commit()
+        first = await get_weekly_tracking("Acme", "openai", db)
+
+        await upsert_tracking_points(db, [_row("vitamins", 2)])
+        await db.commit()
+        second = await get_weekly_tracking("Acme", "openai", db)
+
+        assert second is not first
+        assert second.entity_tracking[0].total_frequency == 2
+
+@pytest.mark.parametrize("numba", [True, False])
+def test_grouped_rank_stats_match_per_group_mean_and_variance(monkeypatch, numba):
+    if numba and not weekly_tracking.NUMBA_AVAILABLE:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(weekly_tracking, "NUMBA_AVAILABLE", numba)
+    groups = [[2, 1, 1, 2], [9], [255, 1, 128]]
+    ranks = np.array([r for g in groups for r in g], dtype=np.uint8)
+    counts = np.array([len(g) for g in groups])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    means, variances = grouped_rank_stats(ranks, starts, counts)
+
+    np.testing.assert_allclose(means, [np.mean(g) for g in groups])
+    np.testing.assert_allclose(variances, [np.var(g) for g in groups], atol=1e-9)
+
+@pytest.mark.asyncio
+async def test_get_stats_and_top_ten_ordering():
+    """Per-series totals, rounded mean/variance, best 10 by average rank"""
+    weeks = [date(2025, 1, 6), date(2025, 1, 13), date(2025, 1, 20)]
+    series = {f"e{i:02d}": [i + 1, i + 2, i + 4] for i in range(12)}
+    async with _session() as db:
+        await upsert_tracking_points(db, [
+            _row(key, rank, week) for key, ranks in series.items() for week, rank in zip(weeks, ranks)
+        ])
+        await db.commit()
+        tracking = (await get_weekly_tracking("Acme", "openai", db)).entity_tracking
+
+    assert [e.entity for e in tracking] == [f"e{i:02d}" for i in range(10)]
+    first = tracking[0]
+    assert [p.rank for p in first.data_points] == [1, 2, 4]
+    assert first.total_frequency == 3
+    assert first.avg_rank == round(7 / 3, 2)
+    assert first.variance == round(float(np.var([1, 2, 4])), 2)